@@ -1,3 +1,8 @@
 """Connectly backend survey API package."""
 
+import time
+
 __version__ = "0.1.0"
+
+# Start of the import phase of startup, the first thing run by a worker importing the app
+IMPORT_STARTED = time.perf_counter()
@@ -0,0 +1,54 @@
+"""Create the indexes of the survey responses collection.
+
+Creates the unique index on survey_id and user_id, which bulk inserts and campaigns rely
+on, and the compound indexes of the response queries. Existing indexes with the same
+definition are kept, so the command can be run on every deploy.
+
+Usage:
+    python -m app.cli.ensure_indexes [--collection responses]
+"""
+
+import argparse
+import asyncio
+import sys
+from typing import List
+
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.errors import OperationFailure
+
+from ..core.logging import get_logger, setup_logging, shutdown_logging
+from ..dependencies.database import get_database
+from ..repositories.responses_repository import RESPONSE_INDEXES
+
+logger = get_logger(__name__)
+
+
+async def ensure_indexes(collection: AsyncCollection) -> List[str]:
+    """Create the missing response indexes, returning the names of all of them."""
+    return await collection.create_indexes(RESPONSE_INDEXES)
+
+
+async def main(collection_name: str) -> int:
+    """Create the indexes, returning the exit code."""
+    database = await get_database()
+    try:
+        names = await ensure_indexes(database[collection_name])
+    except OperationFailure as e:
+        # Duplicate responses of a user prevent the unique index from being built
+        logger.error("Failed to create the indexes of %s: %s", collection_name, str(e))
+        return 1
+    print(f"Indexes of {collection_name}: {', '.join(names)}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--collection", default="responses", help="Responses collection")
+    args = parser.parse_args()
+
+    setup_logging()
+    try:
+        exit_code = asyncio.run(main(args.collection))
+    finally:
+        shutdown_logging()
+    sys.exit(exit_code)
@@ -0,0 +1,62 @@
+"""Import surveys in bulk from an NDJSON file.
+
+Usage:
+    python -m app.cli.import_surveys surveys.ndjson [--report report.json]
+"""
+
+import argparse
+import asyncio
+import sys
+from typing import AsyncIterator
+
+from ..core.logging import setup_logging, shutdown_logging
+from ..core.process_pool import shutdown_process_pool
+from ..dependencies.database import get_database
+from ..repositories.mongodb import MongoDBSurveyRepository
+from ..services.survey_service import SurveyService
+
+
+async def _read_lines(path: str) -> AsyncIterator[str]:
+    """Iterate over the lines of a file, or stdin when the path is '-'."""
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for line in stream:
+            yield line
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+async def main(path: str, report_path: str) -> int:
+    """Import the surveys and write the report, returning the exit code."""
+    service = SurveyService(MongoDBSurveyRepository(await get_database()))
+    report = await service.import_surveys(_read_lines(path))
+
+    output = report.model_dump_json(indent=2)
+    if report_path == "-":
+        print(output)
+    else:
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(output)
+
+    print(
+        f"{report.total} surveys: {report.created} created, "
+        f"{report.invalid} invalid, {report.failed} failed",
+        file=sys.stderr,
+    )
+    return 0 if report.failed == 0 else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="NDJSON file with one survey per line, or '-' for stdin")
+    parser.add_argument("--report", default="-", help="File for the JSON report (default: stdout)")
+    args = parser.parse_args()
+
+    setup_logging()
+    try:
+        exit_code = asyncio.run(main(args.path, args.report))
+    finally:
+        shutdown_process_pool()
+        shutdown_logging()
+    sys.exit(exit_code)
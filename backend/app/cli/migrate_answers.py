@@ -0,0 +1,77 @@
+"""Migrate stored survey responses from an answers list to answers keyed by question id.
+
+Responses are streamed and updated in unordered bulk writes of --batch-size documents.
+Each update only applies while the answers are still a list, so the migration can be
+stopped and run again, and is safe alongside the API.
+
+Usage:
+    python -m app.cli.migrate_answers [--collection responses] [--batch-size 500]
+"""
+
+import argparse
+import asyncio
+import sys
+from typing import Any, Dict, List
+
+from pymongo import UpdateOne
+from pymongo.asynchronous.collection import AsyncCollection
+
+from ..core.logging import get_logger, setup_logging, shutdown_logging
+from ..dependencies.database import get_database
+from ..models.responses import index_answer_list
+
+logger = get_logger(__name__)
+
+LEGACY_ANSWERS = {"answers": {"$type": "array"}}
+
+
+def build_migration(document: Dict[str, Any]) -> UpdateOne:
+    """Build the update that keys the answers of a stored response by question id."""
+    answers = index_answer_list(document["answers"])
+    return UpdateOne(
+        {"_id": document["_id"], **LEGACY_ANSWERS},
+        {"$set": {"answers": answers, "answer_path": list(answers)}},
+    )
+
+
+async def _flush(collection: AsyncCollection, updates: List[UpdateOne]) -> int:
+    result = await collection.bulk_write(updates, ordered=False)
+    updates.clear()
+    return result.modified_count
+
+
+async def migrate(collection: AsyncCollection, batch_size: int) -> int:
+    """Migrate every response with an answers list, returning how many were updated."""
+    migrated = 0
+    updates = []
+    cursor = collection.find(LEGACY_ANSWERS, {"answers": 1}, batch_size=batch_size)
+    async for document in cursor:
+        updates.append(build_migration(document))
+        if len(updates) >= batch_size:
+            migrated += await _flush(collection, updates)
+            logger.info("Migrated %d responses", migrated)
+    if updates:
+        migrated += await _flush(collection, updates)
+    return migrated
+
+
+async def main(collection_name: str, batch_size: int) -> int:
+    """Run the migration, returning the exit code."""
+    database = await get_database()
+    migrated = await migrate(database[collection_name], batch_size)
+    print(f"{migrated} responses migrated", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--collection", default="responses", help="Responses collection")
+    parser.add_argument("--batch-size", type=int, default=500, help="Documents per bulk write")
+    args = parser.parse_args()
+
+    setup_logging()
+    try:
+        exit_code = asyncio.run(main(args.collection, args.batch_size))
+    finally:
+        shutdown_logging()
+    sys.exit(exit_code)
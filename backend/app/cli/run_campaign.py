@@ -0,0 +1,116 @@
+"""Start a survey for a list of users, messaging them its first question.
+
+The recipients file has one user per line, as "user_id" or "user_id,provider". Running
+the same campaign again resumes it after its last checkpoint. Messages go through the
+local stand-in gateway, which only logs them.
+
+Usage:
+    python -m app.cli.run_campaign SURVEY_ID recipients.csv [--campaign-id ID]
+        [--batch-size 500] [--rate 200] [--latency 0]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import AsyncIterator
+
+from ..core.config import get_settings
+from ..core.logging import setup_logging, shutdown_logging
+from ..dependencies.database import get_database
+from ..dependencies.redis import get_redis_client
+from ..models.campaigns import CampaignProgress, Recipient
+from ..repositories.mongodb import MongoDBResponseRepository, MongoDBSurveyRepository
+from ..repositories.redis import RedisCampaignRepository
+from ..services.campaign_service import CampaignService
+from ..services.outbound_gateway import LocalOutboundGateway
+from ..services.survey_service import SurveyService
+
+settings = get_settings()
+
+
+async def _read_recipients(path: str) -> AsyncIterator[Recipient]:
+    """Stream the recipients of a file, or stdin when the path is '-'."""
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for line in stream:
+            fields = [field.strip() for field in line.split(",")]
+            if not fields[0]:
+                continue
+            if len(fields) > 1 and fields[1]:
+                yield Recipient(user_id=fields[0], provider=fields[1])
+            else:
+                yield Recipient(user_id=fields[0])
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+class _ProgressPrinter:
+    """Prints the progress of the campaign at most once per interval."""
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self._printed_at = 0.0
+
+    def __call__(self, progress: CampaignProgress) -> None:
+        now = time.monotonic()
+        if now - self._printed_at < self.interval and not progress.is_complete:
+            return
+        self._printed_at = now
+        print(
+            f"{progress.offset} read, {progress.created} created, {progress.skipped} skipped, "
+            f"{progress.sent} sent, {progress.failed} failed "
+            f"({progress.messages_per_second:.0f} messages/s)",
+            file=sys.stderr,
+        )
+
+
+async def main(args: argparse.Namespace) -> int:
+    """Run the campaign, returning the exit code."""
+    database = await get_database()
+    try:
+        service = CampaignService(
+            SurveyService(MongoDBSurveyRepository(database)),
+            MongoDBResponseRepository(database),
+            RedisCampaignRepository(get_redis_client()),
+            LocalOutboundGateway(args.latency),
+            args.rate,
+            settings.CAMPAIGN_PROVIDER_RATES,
+            args.batch_size,
+            settings.CAMPAIGN_CONCURRENCY,
+        )
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    campaign_id = args.campaign_id or f"{args.survey_id}:{os.path.basename(args.path)}"
+    progress = await service.run(
+        campaign_id, args.survey_id, _read_recipients(args.path), _ProgressPrinter()
+    )
+    return 0 if progress.failed == 0 else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("survey_id", help="Survey to start")
+    parser.add_argument("path", help="File with one recipient per line, or '-' for stdin")
+    parser.add_argument("--campaign-id", help="Campaign to resume (default: survey and file)")
+    parser.add_argument("--batch-size", type=int, default=settings.CAMPAIGN_BATCH_SIZE)
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=settings.CAMPAIGN_RATE,
+        help="Messages per second over all providers",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds the stand-in gateway takes per message"
+    )
+    arguments = parser.parse_args()
+
+    setup_logging()
+    try:
+        exit_code = asyncio.run(main(arguments))
+    finally:
+        shutdown_logging()
+    sys.exit(exit_code)
@@ -0,0 +1,174 @@
+"""Wire formats of the chat websocket"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import WebSocket
+from pydantic import ValidationError
+
+from .exceptions import BusinessRuleError
+from .metrics import get_metrics
+from ..models.messages import ChatMessage
+from ..models.surveys import Question
+from ..models.types import QuestionType
+
+try:
+    import msgpack
+except ImportError:  # Optional dependency, installed with the msgpack extra
+    msgpack = None
+
+MSGPACK_SUBPROTOCOL = "survey.msgpack.v1"
+
+# Kinds of the frames sent to clients
+WELCOME = "welcome"
+QUESTION = "question"
+ERROR = "error"
+UNAVAILABLE = "unavailable"
+IDLE = "idle"
+GOODBYE = "goodbye"
+
+metrics = get_metrics()
+
+
+def parse_text_message(frame: str) -> Tuple[str, Optional[str]]:
+    """Get the text and client message id of a frame, sent as plain text or a JSON envelope."""
+    if frame.startswith("{"):
+        try:
+            message = ChatMessage.model_validate_json(frame)
+            return message.text, message.message_id
+        except ValidationError:
+            pass
+    return frame, None
+
+
+def format_question(question: Question) -> str:
+    """Format a question as text, with its options numbered."""
+    formatted = question.text + "\n"
+
+    match question.type:
+        case QuestionType.MULTIPLE_CHOICE | QuestionType.RATING:
+            if question.options:
+                formatted += "\nChoose one of:\n"
+                for i, option in enumerate(question.options, 1):
+                    formatted += f"{i}. {option.text}\n"
+            else:
+                formatted += "\n(No options available)"
+
+        case QuestionType.BOOLEAN:
+            formatted += "\nPlease answer with 'yes' or 'no'"
+
+        case QuestionType.DATE:
+            formatted += "\nPlease enter a date (YYYY-MM-DD)"
+
+    return formatted.strip()
+
+
+MESSAGES = {
+    WELCOME: "Welcome to the survey! Please answer the following questions.",
+    GOODBYE: "Thank you for your time. That were all the questions!",
+    UNAVAILABLE: "We couldn't process your answer right now, please send it again in a moment.",
+    IDLE: "Closing the chat due to inactivity. Reconnect to continue where you left off.",
+}
+
+
+class TextChatProtocol:
+    """Plain text frames, used when no subprotocol is negotiated.
+
+    Answers are sent as plain text, or as a JSON envelope {"message_id": ..., "text": ...}.
+    """
+
+    subprotocol: Optional[str] = None
+
+    def __init__(self):
+        self._bytes_sent = metrics.counter("chat.text.bytes_sent")
+
+    async def receive(self, websocket: WebSocket) -> str:
+        """Receive the next frame."""
+        return await websocket.receive_text()
+
+    def parse(self, frame: str) -> Tuple[str, Optional[str]]:
+        """Get the answer and client message id of a frame."""
+        return parse_text_message(frame)
+
+    async def send(
+        self,
+        websocket: WebSocket,
+        kind: str,
+        question: Optional[Question] = None,
+        text: Optional[str] = None,
+        reply_to: Optional[str] = None,
+    ) -> None:
+        """Send a frame of a kind, with the question or error text it carries."""
+        if kind == QUESTION:
+            frame = format_question(question)
+        elif kind == ERROR:
+            frame = f"Error: {text}"
+        else:
+            frame = MESSAGES[kind]
+        self._bytes_sent.inc(len(frame.encode()))
+        await websocket.send_text(frame)
+
+
+class MsgpackChatProtocol:
+    """Binary msgpack frames, negotiated with the survey.msgpack.v1 subprotocol.
+
+    Clients send maps {"text": ..., "message_id": ...}. The server sends maps keyed by
+    single letters: the frame kind "k", a per-connection frame id "i", the client message
+    id it replies to "r", and either the question "q" or the error text "x". Questions
+    are maps of their id "i", type "t", text "x" and options "o", as [id, text] pairs.
+    Clients answer choices with the option id, so they never parse prose. Answers that
+    are a position of the options, counted from 1, select the option at that position.
+    """
+
+    subprotocol = MSGPACK_SUBPROTOCOL
+
+    def __init__(self):
+        self._frame_id = 0
+        self._bytes_sent = metrics.counter("chat.msgpack.bytes_sent")
+
+    async def receive(self, websocket: WebSocket) -> bytes:
+        """Receive the next frame."""
+        return await websocket.receive_bytes()
+
+    def parse(self, frame: bytes) -> Tuple[str, Optional[str]]:
+        """Get the answer and client message id of a frame."""
+        try:
+            message = ChatMessage.model_validate(msgpack.unpackb(frame))
+        except (ValueError, msgpack.UnpackException) as e:
+            raise BusinessRuleError("Invalid message frame") from e
+        return message.text, message.message_id
+
+    @staticmethod
+    def _question(question: Question) -> Dict[str, Any]:
+        packed: Dict[str, Any] = {"i": question.id, "t": question.type.value, "x": question.text}
+        if question.options:
+            options: List[List[str]] = [[option.id, option.text] for option in question.options]
+            packed["o"] = options
+        return packed
+
+    async def send(
+        self,
+        websocket: WebSocket,
+        kind: str,
+        question: Optional[Question] = None,
+        text: Optional[str] = None,
+        reply_to: Optional[str] = None,
+    ) -> None:
+        """Send a frame of a kind, with the question or error text it carries."""
+        self._frame_id += 1
+        frame: Dict[str, Any] = {"k": kind, "i": self._frame_id}
+        if reply_to is not None:
+            frame["r"] = reply_to
+        if question is not None:
+            frame["q"] = self._question(question)
+        if text is not None:
+            frame["x"] = text
+        data = msgpack.packb(frame)
+        self._bytes_sent.inc(len(data))
+        await websocket.send_bytes(data)
+
+
+def select_protocol(websocket: WebSocket) -> Any:
+    """Pick the protocol of a connection from the subprotocols the client offered."""
+    if msgpack is not None and MSGPACK_SUBPROTOCOL in websocket.scope.get("subprotocols", []):
+        return MsgpackChatProtocol()
+    return TextChatProtocol()
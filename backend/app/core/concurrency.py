@@ -0,0 +1,47 @@
+"""Concurrency helpers."""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class KeyedSerialQueue:
+    """Runs jobs concurrently across keys, but one at a time and in order within a key.
+
+    Every job waits for the previous job submitted with the same key, which keeps one
+    serial queue per key without a dedicated consumer task. At most ``max_concurrency``
+    jobs run at once.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self._tails: Dict[Hashable, asyncio.Task] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def pending_keys(self) -> int:
+        """Number of keys with queued or running jobs."""
+        return len(self._tails)
+
+    def submit(self, key: Hashable, job: Callable[[], Awaitable[T]]) -> "asyncio.Task[T]":
+        """Queue a job after the previous jobs of its key."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        task = asyncio.create_task(self._run(self._tails.get(key), job))
+        self._tails[key] = task
+        task.add_done_callback(lambda done: self._release(key, done))
+        return task
+
+    def _release(self, key: Hashable, task: asyncio.Task) -> None:
+        """Forget the key once its last job is done."""
+        if self._tails.get(key) is task:
+            del self._tails[key]
+
+    async def _run(self, previous: Optional[asyncio.Task], job: Callable[[], Awaitable[T]]) -> T:
+        if previous is not None:
+            # Wait for the previous job without inheriting its result or error
+            await asyncio.wait([previous])
+        async with self._semaphore:
+            return await job()
@@ -1,6 +1,7 @@
 """Config module"""
 
 from functools import lru_cache
+from typing import Dict, Optional
 
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
@@ -13,9 +14,99 @@ class Settings(BaseSettings):
     """Application settings."""
 
     REDIS_URL: str = "redis://localhost:6379/0"
+    REDIS_CLUSTER_MODE: bool = False  # REDIS_URL points to a node of a Redis Cluster
     MONGODB_URL: str = "mongodb://localhost:27017/"
     MONGODB_DATABASE: str = "connectly"
 
+    # Mongo connection pools, the OLTP pool serves chat traffic and the reporting pool
+    # serves listings and exports
+    MONGO_OLTP_MAX_POOL_SIZE: int = 100
+    MONGO_OLTP_MIN_POOL_SIZE: int = 10
+    MONGO_OLTP_WAIT_QUEUE_TIMEOUT: float = 1.0  # seconds waiting for a free connection
+    MONGO_REPORTING_URL: Optional[str] = None  # defaults to MONGODB_URL
+    MONGO_REPORTING_MAX_POOL_SIZE: int = 10
+    MONGO_REPORTING_MIN_POOL_SIZE: int = 0
+    MONGO_REPORTING_WAIT_QUEUE_TIMEOUT: float = 10.0
+    MONGO_REPORTING_READ_PREFERENCE: str = "secondaryPreferred"
+    MONGO_REPORTING_OPERATION_TIMEOUT: float = 30.0  # seconds allowed for a reporting call
+
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+    LOG_QUEUE_SIZE: int = 10000  # records buffered before dropping
+    LOG_RATE_LIMITS: Dict[str, float] = {}  # records per second, by logger name prefix
+    LOG_RATE_BURST: int = 20
+    LOG_SAMPLE_RATES: Dict[str, float] = {}  # fraction of records kept, by logger name prefix
+
+    # Workers
+    PROCESS_POOL_WORKERS: Optional[int] = None  # defaults to the number of CPUs
+
+    # Surveys
+    SURVEY_IMPORT_BATCH_SIZE: int = 500  # surveys validated and inserted together
+    SURVEY_VALIDATION_OFFLOAD_THRESHOLD: int = 500  # questions above which validation is offloaded
+    SURVEY_VALIDATION_TIMEOUT: float = 30.0  # seconds allowed for an offloaded validation
+    SURVEY_VALIDATION_MAX_PENDING: int = 4  # offloaded validations running at once per worker
+    SURVEY_CACHE_SIZE: int = 1000  # serialized surveys cached per worker
+    SURVEY_CACHE_TTL: float = 30.0  # seconds a cached survey may be stale on other workers
+    SURVEY_CATALOG_PATH: Optional[str] = None  # memory-mapped catalog shared by the node
+    SURVEY_CATALOG_REFRESH_INTERVAL: float = 30.0  # seconds between catalog rebuilds
+
+    # Warmup of new workers
+    WARMUP_SURVEYS: int = 50  # most active surveys preloaded before reporting ready
+    WARMUP_ACTIVITY_WINDOW: int = 3600  # seconds of recent responses ranking surveys
+    WARMUP_TIMEOUT: float = 30.0  # seconds allowed for warmup before reporting ready anyway
+
+    # Websockets
+    WS_IDLE_TIMEOUT: float = 300.0  # seconds without a client message before closing
+    WS_PING_INTERVAL: float = 20.0  # seconds between server pings
+    WS_PING_TIMEOUT: float = 20.0  # seconds to wait for a pong before closing
+    WS_PER_MESSAGE_DEFLATE: bool = True  # compress frames when the client supports it
+
+    # Messaging gateway
+    GATEWAY_MAX_CONCURRENCY: int = 256  # inbound messages handled at once per worker
+
+    # Rate limits, as messages per second and burst size
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_USER_RATE: float = 1.0
+    RATE_LIMIT_USER_BURST: int = 10
+    RATE_LIMIT_SURVEY_RATE: float = 1000.0
+    RATE_LIMIT_SURVEY_BURST: int = 2000
+    RATE_LIMIT_IP_RATE: float = 20.0
+    RATE_LIMIT_IP_BURST: int = 100
+    RATE_LIMIT_LOCAL_KEYS: int = 10000  # buckets kept by the local pre-filter
+
+    # Sessions
+    SESSION_LEASE_TTL: int = 30  # seconds an active session lives without a heartbeat
+    SESSION_HEARTBEAT_INTERVAL: float = 10.0  # seconds between lease renewals
+    UNACTIVE_SESSION_TTL: int = 600  # seconds an inactive session is kept for resuming
+    SESSION_PROCESSED_MESSAGES: int = 32  # recent client message ids kept for deduplication
+    SESSION_TRUSTED_LOAD: bool = True  # skip validating sessions whose checksums match
+    SESSION_SURVEY_CACHE_SIZE: int = 256  # validated session surveys cached by digest
+
+    # Outbound campaigns
+    CAMPAIGN_BATCH_SIZE: int = 500  # responses created per bulk insert and checkpoint
+    CAMPAIGN_CONCURRENCY: int = 64  # messages sent at once
+    CAMPAIGN_RATE: float = 200.0  # messages per second over all providers
+    CAMPAIGN_PROVIDER_RATES: Dict[str, float] = {}  # messages per second, by provider
+    CAMPAIGN_PROGRESS_TTL: int = 30 * 24 * 3600  # seconds a campaign checkpoint is kept
+
+    # Reminders of sessions left incomplete
+    REMINDER_ENABLED: bool = True
+    REMINDER_DELAY: int = 3600  # seconds after a session goes inactive before reminding
+    REMINDER_SHARDS: int = 16  # sorted sets the pending reminders are spread over
+    REMINDER_BATCH_SIZE: int = 500  # reminders popped per shard at once
+    REMINDER_POLL_INTERVAL: float = 1.0  # seconds between polls when no reminder is due
+
+    # Resilience of Redis and Mongo calls
+    MESSAGE_DEADLINE: float = 5.0  # seconds allowed for all the calls made for a message
+    REDIS_OPERATION_TIMEOUT: float = 0.5  # seconds allowed for a single Redis call
+    MONGO_OPERATION_TIMEOUT: float = 2.0  # seconds allowed for a single Mongo call
+    RETRY_ATTEMPTS: int = 3  # attempts of idempotent calls
+    RETRY_BASE_DELAY: float = 0.05  # seconds, doubled on each retry before jitter
+    RETRY_MAX_DELAY: float = 1.0
+    BREAKER_FAILURE_THRESHOLD: int = 5  # consecutive failed calls before failing fast
+    BREAKER_RESET_TIMEOUT: float = 10.0  # seconds failing fast before probing again
+
     class Config:
         """Pydantic config."""
 
@@ -4,3 +4,7 @@ from zoneinfo import ZoneInfo
 
 # Timezone Constants
 UTC = ZoneInfo("UTC")
+
+# Question ids are field names of the stored answers, which MongoDB would read as paths
+# or operators if they held dots or started with a dollar sign
+QUESTION_ID_PATTERN = r"^[^.$][^.]*$"
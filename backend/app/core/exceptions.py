@@ -1,5 +1,6 @@
 """Exceptions used throughout the application."""
 
+import math
 from typing import Any, Optional
 
 
@@ -43,6 +44,21 @@ class BusinessRuleError(ServiceError):
     """Raised when a business rule is violated."""
 
 
+class TemporarilyUnavailableError(ServiceError):
+    """Raised when a backing store is failing or too slow, and callers should retry later."""
+
+
+class RateLimitExceededError(BusinessRuleError):
+    """Raised when a client exceeds its rate limit."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(
+            f"Too many messages, please try again in {max(1, math.ceil(retry_after))} seconds",
+            {"retry_after": retry_after},
+        )
+
+
 class SurveyNotFoundError(RepositoryError):
     """Raised when a survey is not found."""
 
@@ -1,33 +1,198 @@
 """Logging module"""
 
 import sys
+import copy
+import json
+import time
+import queue
+import atexit
+import random
 import logging
 import logging.handlers
+import threading
+from typing import Dict, Optional, Tuple
 
+from .config import get_settings
+from .metrics import get_metrics
 
-LOG_LEVEL = logging.INFO
+settings = get_settings()
+
+LOG_LEVEL = logging.getLevelName(settings.LOG_LEVEL)
 LOG_FORMAT = logging.Formatter(
     fmt="%(asctime)s | %(levelname)-8s | %(name)s:%(funcName)s:%(lineno)d - %(message)s",
     datefmt="%Y-%m-%d %H:%M:%S",
 )
 
+# Renders tracebacks of queued records
+_TRACEBACKS = logging.Formatter()
+
+metrics = get_metrics()
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Format log records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Format the record as JSON."""
+        entry = {
+            "timestamp": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "function": record.funcName,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+def _match_prefix(name: str, rules: Dict[str, float]) -> Optional[float]:
+    """Get the rule of the longest logger prefix matching the name."""
+    while True:
+        if name in rules:
+            return rules[name]
+        if "." not in name:
+            return rules.get("")
+        name = name.rsplit(".", 1)[0]
+
+
+class RateLimitFilter(logging.Filter):
+    """Limit the records per second of each logger with a token bucket.
+
+    Warnings and errors are never limited.
+    """
+
+    def __init__(self, rates: Dict[str, float], burst: int):
+        super().__init__()
+        self.rates = rates
+        self.burst = burst
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Allow the record if its logger has tokens left."""
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = _match_prefix(record.name, self.rates)
+        if rate is None:
+            return True
+
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(record.name, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated_at) * rate)
+            allowed = tokens >= 1
+            self._buckets[record.name] = (tokens - 1 if allowed else tokens, now)
+
+        if not allowed:
+            metrics.counter("logging.dropped_records.rate_limited").inc()
+        return allowed
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of the records of each logger.
+
+    Warnings and errors are never sampled out.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Allow the record with the sample rate of its logger."""
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = _match_prefix(record.name, self.rates)
+        if rate is None or random.random() < rate:
+            return True
+        metrics.counter("logging.dropped_records.sampled").inc()
+        return False
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that never blocks the caller.
+
+    Records are formatted by the listener thread, and dropped when the queue is full.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Copy the record with its message merged and its traceback rendered.
+
+        As QueueHandler.prepare does, so that queued records neither change with their
+        mutable arguments nor keep traceback frames alive, but without formatting them,
+        which is left to the listener thread.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _TRACEBACKS.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Enqueue the record, dropping it if the queue is full."""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.counter("logging.dropped_records.queue_full").inc()
+
+
+def get_dropped_records() -> int:
+    """Get the number of log records dropped by this worker."""
+    snapshot = metrics.snapshot()
+    return sum(
+        value for name, value in snapshot.items() if name.startswith("logging.dropped_records.")
+    )
+
 
 def setup_logging() -> None:
-    """Configure basic logging with console output."""
+    """Configure logging through a queue, with console output written by a background thread."""
+    global _listener
+
     # Configure root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(LOG_LEVEL)
 
-    # Console Handler
+    # Console Handler, fed by the queue listener
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(LOG_FORMAT)
+    console_handler.setFormatter(JsonFormatter() if settings.LOG_JSON else LOG_FORMAT)
     console_handler.setLevel(LOG_LEVEL)
 
+    # Queue Handler, the only handler called from application code
+    queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+    if settings.LOG_SAMPLE_RATES:
+        queue_handler.addFilter(SamplingFilter(settings.LOG_SAMPLE_RATES))
+    if settings.LOG_RATE_LIMITS:
+        queue_handler.addFilter(RateLimitFilter(settings.LOG_RATE_LIMITS, settings.LOG_RATE_BURST))
+
     # Remove existing handlers to avoid duplicates
+    shutdown_logging()
     root_logger.handlers.clear()
 
     # Add handler
-    root_logger.addHandler(console_handler)
+    root_logger.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(
+        queue_handler.queue, console_handler, respect_handler_level=True
+    )
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush the pending records and stop the logging thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -0,0 +1,112 @@
+"""In-process metrics registry."""
+
+import threading
+from typing import Any, Dict
+
+
+class Counter:
+    """Monotonically increasing counter."""
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        """Increment the counter."""
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        """Current value of the counter."""
+        return self._value
+
+
+class Gauge:
+    """Value that can go up and down."""
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float) -> None:
+        """Set the gauge to a value."""
+        self._value = value
+
+    def inc(self, amount: float = 1) -> None:
+        """Increment the gauge."""
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        """Decrement the gauge."""
+        with self._lock:
+            self._value -= amount
+
+    @property
+    def value(self) -> float:
+        """Current value of the gauge."""
+        return self._value
+
+
+class Histogram:
+    """Summary of observed values: count, sum and max."""
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """Record an observation."""
+        with self._lock:
+            self.count += 1
+            self.sum += value
+            self.max = max(self.max, value)
+
+    @property
+    def value(self) -> Dict[str, float]:
+        """Summary of the observations."""
+        return {"count": self.count, "sum": self.sum, "max": self.max}
+
+
+class MetricsRegistry:
+    """Registry of the metrics of this worker."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, name: str, metric_type: type) -> Any:
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.setdefault(name, metric_type())
+        if not isinstance(metric, metric_type):
+            raise TypeError(f"Metric {name} is not a {metric_type.__name__}")
+        return metric
+
+    def counter(self, name: str) -> Counter:
+        """Get or create a counter."""
+        return self._get_or_create(name, Counter)
+
+    def gauge(self, name: str) -> Gauge:
+        """Get or create a gauge."""
+        return self._get_or_create(name, Gauge)
+
+    def histogram(self, name: str) -> Histogram:
+        """Get or create a histogram."""
+        return self._get_or_create(name, Histogram)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the current value of every metric."""
+        return {name: metric.value for name, metric in sorted(self._metrics.items())}
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Get the metrics registry of this worker."""
+    return _registry
@@ -0,0 +1,21 @@
+"""Process pool for CPU-bound work that must not run on the event loop."""
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from .config import get_settings
+
+settings = get_settings()
+
+
+@lru_cache(maxsize=1)
+def get_process_pool() -> ProcessPoolExecutor:
+    """Get cached process pool instance."""
+    return ProcessPoolExecutor(max_workers=settings.PROCESS_POOL_WORKERS)
+
+
+def shutdown_process_pool() -> None:
+    """Shut down the process pool, if it was ever started."""
+    if get_process_pool.cache_info().currsize:
+        get_process_pool().shutdown(cancel_futures=True)
+        get_process_pool.cache_clear()
@@ -0,0 +1,218 @@
+"""Deadlines, retries and circuit breakers for calls to backing stores."""
+
+import asyncio
+import functools
+import inspect
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple, Type
+
+from .exceptions import TemporarilyUnavailableError
+from .logging import get_logger
+from .metrics import get_metrics
+
+logger = get_logger(__name__)
+
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+@contextmanager
+def deadline(budget: float) -> Iterator[None]:
+    """Bound the time of the calls made in the block, keeping any tighter outer deadline."""
+    expires_at = time.monotonic() + budget
+    current = _deadline.get()
+    if current is not None:
+        expires_at = min(expires_at, current)
+    token = _deadline.set(expires_at)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current deadline, or None without a deadline."""
+    expires_at = _deadline.get()
+    if expires_at is None:
+        return None
+    return expires_at - time.monotonic()
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter."""
+
+    def __init__(self, attempts: int, base_delay: float, max_delay: float):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait after a failed attempt, starting at 1."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """Fails calls fast after consecutive failures, probing again after a reset timeout.
+
+    The state is exported as the gauge ``resilience.<name>.breaker_state``: 0 when
+    closed, 1 when half-open (a single probe call is allowed) and 2 when open.
+    """
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+    _STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        metrics = get_metrics()
+        self._state_gauge = metrics.gauge(f"resilience.{name}.breaker_state")
+        self._rejected = metrics.counter(f"resilience.{name}.rejected")
+        self._state_gauge.set(0)
+
+    @property
+    def state(self) -> str:
+        """Current state of the breaker."""
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def before_call(self) -> None:
+        """Reject the call if the breaker is open, or if half-open with a probe running."""
+        state = self.state
+        self._state_gauge.set(self._STATE_VALUES[state])
+        if state == self.OPEN or (state == self.HALF_OPEN and self._probing):
+            self._rejected.inc()
+            raise TemporarilyUnavailableError(f"{self.name} is unavailable")
+        if state == self.HALF_OPEN:
+            self._probing = True
+
+    def record_success(self) -> None:
+        """Close the breaker after a call that reached the backing store."""
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._state_gauge.set(0)
+
+    def release(self) -> None:
+        """Let another call probe the store, after a probe was cancelled."""
+        self._probing = False
+
+    def record_failure(self) -> None:
+        """Count a failed call, opening the breaker past the threshold or on a failed probe."""
+        self._failures += 1
+        if self._probing or self._failures >= self.failure_threshold:
+            if self._opened_at is None or self._probing:
+                logger.warning("Circuit breaker %s opened", self.name)
+            self._opened_at = self._clock()
+            self._state_gauge.set(2)
+        self._probing = False
+
+
+class ResilientRepository:
+    """Proxy applying deadlines, retries and a circuit breaker to a repository.
+
+    Every coroutine method of the repository gets a timeout, bounded by the current
+    deadline. Methods listed as idempotent are retried with jittered backoff on timeouts
+    and transient errors. Calls that still fail raise TemporarilyUnavailableError, and
+    count towards opening the breaker. Other errors are raised unchanged.
+    """
+
+    def __init__(
+        self,
+        repository: Any,
+        breaker: CircuitBreaker,
+        timeout: float,
+        retry: RetryPolicy,
+        idempotent: Iterable[str],
+        transient_errors: Tuple[Type[BaseException], ...] = (),
+    ):
+        self._repository = repository
+        self._breaker = breaker
+        self._timeout = timeout
+        self._retry = retry
+        self._idempotent = frozenset(idempotent)
+        self._transient_errors = (TimeoutError, *transient_errors)
+        self._methods: Dict[str, Callable] = {}
+        self._retries = get_metrics().counter(f"resilience.{breaker.name}.retries")
+        self._failures = get_metrics().counter(f"resilience.{breaker.name}.failures")
+
+    def __getattr__(self, name: str) -> Any:
+        """Get an attribute of the repository, its coroutine methods wrapped once."""
+        attribute = getattr(self._repository, name)
+        if not inspect.iscoroutinefunction(attribute):
+            return attribute
+        if name not in self._methods:
+
+            @functools.wraps(attribute)
+            async def call(*args, **kwargs):
+                return await self._call(name, attribute, args, kwargs)
+
+            self._methods[name] = call
+        return self._methods[name]
+
+    def _call_timeout(self) -> float:
+        """Timeout of the next attempt, bounded by the current deadline."""
+        remaining = remaining_time()
+        if remaining is None:
+            return self._timeout
+        return min(self._timeout, remaining)
+
+    async def _call(self, name: str, method: Callable, args: tuple, kwargs: dict) -> Any:
+        timeout = self._call_timeout()
+        if timeout <= 0:
+            raise TemporarilyUnavailableError(f"No time left to call {self._breaker.name}.{name}")
+        self._breaker.before_call()
+
+        attempts = self._retry.attempts if name in self._idempotent else 1
+        for attempt in range(1, attempts + 1):
+            try:
+                async with asyncio.timeout(timeout):
+                    result = await method(*args, **kwargs)
+            except self._transient_errors as e:
+                error = e
+            except asyncio.CancelledError:
+                self._breaker.release()
+                raise
+            except Exception:
+                # The store answered, so it is up even if the call failed
+                self._breaker.record_success()
+                raise
+            else:
+                self._breaker.record_success()
+                return result
+
+            delay = self._retry.delay(attempt)
+            remaining = remaining_time()
+            if attempt == attempts or (remaining is not None and remaining <= delay):
+                break
+            self._retries.inc()
+            logger.warning(
+                "Retrying %s.%s after %s (attempt %d)",
+                self._breaker.name,
+                name,
+                type(error).__name__,
+                attempt,
+            )
+            await asyncio.sleep(delay)
+            timeout = self._call_timeout()
+
+        self._failures.inc()
+        self._breaker.record_failure()
+        raise TemporarilyUnavailableError(f"{self._breaker.name}.{name} failed") from error
@@ -0,0 +1,64 @@
+"""Startup phases and readiness of the worker."""
+
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+from .. import IMPORT_STARTED
+from .logging import get_logger
+from .metrics import get_metrics
+
+logger = get_logger(__name__)
+
+
+class Startup:
+    """Timings of the startup phases of this worker, and whether it is ready.
+
+    Each phase is logged and exported as the gauge ``startup.<phase>_seconds``, and the
+    gauge ``startup.ready`` is set once the worker is warm. Durations are counted from the
+    import of the app package.
+    """
+
+    def __init__(self, started: float = IMPORT_STARTED):
+        self.phases: Dict[str, Dict[str, Any]] = {}
+        self.ready = False
+        self._started = started
+
+    def record(self, phase: str, seconds: float, ok: bool = True) -> None:
+        """Record the duration of a phase."""
+        self.phases[phase] = {"seconds": round(seconds, 4), "ok": ok}
+        get_metrics().gauge(f"startup.{phase}_seconds").set(seconds)
+        logger.info("Startup phase %s took %.3fs%s", phase, seconds, "" if ok else " and failed")
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the phase run in the block, recording it as failed if it raises."""
+        started = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.record(name, time.perf_counter() - started, ok)
+
+    def mark_imported(self) -> None:
+        """Record the import phase, from the import of the app package until now."""
+        self.record("import", time.perf_counter() - self._started)
+
+    def mark_ready(self) -> None:
+        """Report the worker as ready, recording the total startup time."""
+        self.record("total", time.perf_counter() - self._started)
+        self.ready = True
+        get_metrics().gauge("startup.ready").set(1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Readiness and timings of the startup phases."""
+        return {"ready": self.ready, "phases": dict(self.phases)}
+
+
+_startup = Startup()
+
+
+def get_startup() -> Startup:
+    """Get the startup state of this worker."""
+    return _startup
@@ -0,0 +1,37 @@
+"""Local token bucket."""
+
+import asyncio
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a fixed rate, up to its capacity."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_acquire(self, cost: float = 1, now: Optional[float] = None) -> bool:
+        """Take tokens if available, without waiting."""
+        self._refill(time.monotonic() if now is None else now)
+        if self.tokens < cost:
+            return False
+        self.tokens -= cost
+        return True
+
+    def wait_time(self, cost: float = 1) -> float:
+        """Seconds until the given tokens are available."""
+        self._refill(time.monotonic())
+        return max(0.0, (cost - self.tokens) / self.rate)
+
+    async def acquire(self, cost: float = 1) -> None:
+        """Take tokens, waiting until they are available."""
+        while not self.try_acquire(cost):
+            await asyncio.sleep(self.wait_time(cost))
@@ -1,22 +1,148 @@
 """Dependencies for database operations"""
 
 from functools import lru_cache
+from typing import Any, Dict, NamedTuple
 
 from pymongo import AsyncMongoClient
 from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.monitoring import ConnectionPoolListener
 
 from app.core.config import get_settings
+from app.core.metrics import get_metrics
 
 settings = get_settings()
 
+# Client profiles, each with its own connection pool
+OLTP = "oltp"
+REPORTING = "reporting"
 
-@lru_cache(maxsize=1)
-def get_mongodb_client() -> AsyncMongoClient:
-    """Get cached MongoDB client instance."""
-    return AsyncMongoClient(settings.MONGODB_URL)
+
+class ClientProfile(NamedTuple):
+    """Connection options of a MongoDB client."""
+
+    url: str
+    max_pool_size: int
+    min_pool_size: int
+    wait_queue_timeout: float
+    read_preference: str
+
+
+def get_client_profiles() -> Dict[str, ClientProfile]:
+    """Get the client profiles from the settings."""
+    return {
+        OLTP: ClientProfile(
+            settings.MONGODB_URL,
+            settings.MONGO_OLTP_MAX_POOL_SIZE,
+            settings.MONGO_OLTP_MIN_POOL_SIZE,
+            settings.MONGO_OLTP_WAIT_QUEUE_TIMEOUT,
+            "primary",
+        ),
+        REPORTING: ClientProfile(
+            settings.MONGO_REPORTING_URL or settings.MONGODB_URL,
+            settings.MONGO_REPORTING_MAX_POOL_SIZE,
+            settings.MONGO_REPORTING_MIN_POOL_SIZE,
+            settings.MONGO_REPORTING_WAIT_QUEUE_TIMEOUT,
+            settings.MONGO_REPORTING_READ_PREFERENCE,
+        ),
+    }
+
+
+class PoolMetricsListener(ConnectionPoolListener):
+    """Exports the utilization of the connection pools of a client profile.
+
+    Gauges ``mongo.<profile>.connections_open``, ``connections_in_use`` and
+    ``checkouts_waiting`` count connections over all the servers of the client, and
+    ``utilization`` is the fraction of the pool size in use. Failed checkouts and the
+    time spent waiting for a connection are recorded too.
+    """
+
+    def __init__(self, profile: str, max_pool_size: int):
+        metrics = get_metrics()
+        self._max_pool_size = max_pool_size
+        self._pools = 0
+        self._open = metrics.gauge(f"mongo.{profile}.connections_open")
+        self._in_use = metrics.gauge(f"mongo.{profile}.connections_in_use")
+        self._waiting = metrics.gauge(f"mongo.{profile}.checkouts_waiting")
+        self._utilization = metrics.gauge(f"mongo.{profile}.utilization")
+        self._checkout_failed = metrics.counter(f"mongo.{profile}.checkout_failed")
+        self._checkout_wait = metrics.histogram(f"mongo.{profile}.checkout_wait_ms")
+
+    def _update_utilization(self) -> None:
+        capacity = self._max_pool_size * max(self._pools, 1)
+        self._utilization.set(self._in_use.value / capacity if capacity else 0.0)
+
+    def pool_created(self, event: Any) -> None:
+        """Count a new pool."""
+        self._pools += 1
+        self._update_utilization()
+
+    def pool_ready(self, event: Any) -> None:
+        """Ignore pools becoming ready."""
+
+    def pool_cleared(self, event: Any) -> None:
+        """Ignore cleared pools, whose connections are closed one by one."""
+
+    def pool_closed(self, event: Any) -> None:
+        """Stop counting a closed pool."""
+        self._pools = max(self._pools - 1, 0)
+        self._update_utilization()
+
+    def connection_created(self, event: Any) -> None:
+        """Count an open connection."""
+        self._open.inc()
+
+    def connection_ready(self, event: Any) -> None:
+        """Ignore connections becoming ready."""
+
+    def connection_closed(self, event: Any) -> None:
+        """Stop counting a closed connection."""
+        self._open.dec()
+
+    def connection_check_out_started(self, event: Any) -> None:
+        """Count a checkout waiting for a connection."""
+        self._waiting.inc()
+
+    def connection_check_out_failed(self, event: Any) -> None:
+        """Count a failed checkout, which is no longer waiting."""
+        self._waiting.dec()
+        self._checkout_failed.inc()
+
+    def connection_checked_out(self, event: Any) -> None:
+        """Count a connection in use, and the time its checkout waited."""
+        self._waiting.dec()
+        self._in_use.inc()
+        if event.duration is not None:
+            self._checkout_wait.observe(event.duration * 1000)
+        self._update_utilization()
+
+    def connection_checked_in(self, event: Any) -> None:
+        """Stop counting a connection returned to its pool."""
+        self._in_use.dec()
+        self._update_utilization()
+
+
+@lru_cache(maxsize=None)
+def get_mongodb_client(profile: str = OLTP) -> AsyncMongoClient:
+    """Get cached MongoDB client instance of a client profile."""
+    options = get_client_profiles()[profile]
+    return AsyncMongoClient(
+        options.url,
+        maxPoolSize=options.max_pool_size,
+        minPoolSize=options.min_pool_size,
+        waitQueueTimeoutMS=int(options.wait_queue_timeout * 1000),
+        readPreference=options.read_preference,
+        appname=f"survey-api-{profile}",
+        event_listeners=[PoolMetricsListener(profile, options.max_pool_size)],
+    )
 
 
 async def get_database() -> AsyncDatabase:
-    """Get database connection from cached client."""
-    client = get_mongodb_client()
+    """Get database connection from the cached OLTP client."""
+    client = get_mongodb_client(OLTP)
+    return client.get_database(settings.MONGODB_DATABASE)
+
+
+async def get_reporting_database() -> AsyncDatabase:
+    """Get database connection from the cached reporting client."""
+    client = get_mongodb_client(REPORTING)
     return client.get_database(settings.MONGODB_DATABASE)
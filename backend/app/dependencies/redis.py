@@ -1,8 +1,9 @@
 """Dependencies for Redis operations"""
 
 from functools import lru_cache
+from typing import Union
 
-from redis.asyncio import Redis
+from redis.asyncio import Redis, RedisCluster
 
 from ..core.config import get_settings
 
@@ -10,11 +11,13 @@ settings = get_settings()
 
 
 @lru_cache(maxsize=1)
-def get_redis_client() -> Redis:
-    """Get cached Redis client instance."""
+def get_redis_client() -> Union[Redis, RedisCluster]:
+    """Get cached Redis client instance, for a single node or a cluster."""
+    if settings.REDIS_CLUSTER_MODE:
+        return RedisCluster.from_url(settings.REDIS_URL, decode_responses=True)
     return Redis.from_url(settings.REDIS_URL, decode_responses=True)
 
 
-def get_redis() -> Redis:
+def get_redis() -> Union[Redis, RedisCluster]:
     """Get Redis connection from cached client."""
     return get_redis_client()
@@ -1,37 +1,127 @@
 """Dependencies for repositories"""
 
-from typing import Annotated
+from functools import lru_cache
+from typing import Annotated, Any, Callable, Optional
 
 from fastapi import Depends
 from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.errors import ConnectionFailure
 from redis.asyncio import Redis
+from redis.exceptions import (
+    ConnectionError as RedisConnectionError,
+    TimeoutError as RedisTimeoutError,
+)
 
+from ..repositories import surveys_repository, responses_repository, session_repository
 from ..repositories.surveys_repository import SurveyRepository
 from ..repositories.responses_repository import ResponseRepository
 from ..repositories.session_repository import SessionRepository
+from ..repositories.reminder_repository import ReminderRepository
+from ..repositories.pools import PoolRoutedRepository
 from ..repositories.mongodb import MongoDBSurveyRepository, MongoDBResponseRepository
 from ..repositories.redis.session_redis_repository import RedisSessionRepository
-from .database import get_database
+from ..repositories.redis.session_codec import SessionCodec
+from ..repositories.redis.reminder_redis_repository import RedisReminderRepository
+from ..core.cache import TTLCache
+from ..core.config import get_settings
+from ..core.resilience import CircuitBreaker, ResilientRepository, RetryPolicy
+from .database import OLTP, REPORTING, get_database, get_reporting_database
 from .redis import get_redis
 
+settings = get_settings()
+
+MONGO_TRANSIENT_ERRORS = (ConnectionFailure,)
+REDIS_TRANSIENT_ERRORS = (RedisConnectionError, RedisTimeoutError)
+
+
+@lru_cache(maxsize=None)
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Get the circuit breaker of a backing store, shared by this worker."""
+    return CircuitBreaker(name, settings.BREAKER_FAILURE_THRESHOLD, settings.BREAKER_RESET_TIMEOUT)
+
+
+@lru_cache(maxsize=1)
+def get_session_codec() -> SessionCodec:
+    """Get the session codec of this worker, which keeps the validated session surveys."""
+    # Surveys are cached by the digest of their content, so they never get stale
+    surveys = TTLCache(settings.SESSION_SURVEY_CACHE_SIZE, float("inf"))
+    return SessionCodec(surveys, settings.SESSION_TRUSTED_LOAD)
+
+
+def get_retry_policy() -> RetryPolicy:
+    """Get the retry policy of idempotent calls."""
+    return RetryPolicy(settings.RETRY_ATTEMPTS, settings.RETRY_BASE_DELAY, settings.RETRY_MAX_DELAY)
+
+
+def _mongo_repository(
+    factory: Callable[[AsyncDatabase], Any],
+    db: AsyncDatabase,
+    reporting_db: AsyncDatabase,
+    module: Any,
+) -> PoolRoutedRepository:
+    """Build a Mongo repository per client profile, routing the module's reporting methods.
+
+    Each profile has its own circuit breaker and timeout, so slow scans on the reporting
+    pool neither time out as chat calls nor open the breaker of chat traffic.
+    """
+    return PoolRoutedRepository(
+        {
+            OLTP: ResilientRepository(
+                factory(db),
+                get_circuit_breaker("mongo"),
+                settings.MONGO_OPERATION_TIMEOUT,
+                get_retry_policy(),
+                module.IDEMPOTENT_METHODS,
+                MONGO_TRANSIENT_ERRORS,
+            ),
+            REPORTING: ResilientRepository(
+                factory(reporting_db),
+                get_circuit_breaker("mongo_reporting"),
+                settings.MONGO_REPORTING_OPERATION_TIMEOUT,
+                get_retry_policy(),
+                module.IDEMPOTENT_METHODS,
+                MONGO_TRANSIENT_ERRORS,
+            ),
+        },
+        dict.fromkeys(module.REPORTING_METHODS, REPORTING),
+        default=OLTP,
+    )
+
 
 async def get_survey_repository(
-    db: Annotated[AsyncDatabase, Depends(get_database)]
+    db: Annotated[AsyncDatabase, Depends(get_database)],
+    reporting_db: Annotated[AsyncDatabase, Depends(get_reporting_database)],
 ) -> SurveyRepository:
     """Get survey repository instance."""
-    return MongoDBSurveyRepository(db)
+    return _mongo_repository(MongoDBSurveyRepository, db, reporting_db, surveys_repository)
 
 
 async def get_response_repository(
-    db: Annotated[AsyncDatabase, Depends(get_database)]
+    db: Annotated[AsyncDatabase, Depends(get_database)],
+    reporting_db: Annotated[AsyncDatabase, Depends(get_reporting_database)],
 ) -> ResponseRepository:
     """Get response repository instance."""
-    return MongoDBResponseRepository(db)
+    return _mongo_repository(MongoDBResponseRepository, db, reporting_db, responses_repository)
 
 
 async def get_session_repository(redis: Annotated[Redis, Depends(get_redis)]) -> SessionRepository:
     """Get session repository instance."""
-    return RedisSessionRepository(redis)
+    return ResilientRepository(
+        RedisSessionRepository(redis, codec=get_session_codec()),
+        get_circuit_breaker("redis"),
+        settings.REDIS_OPERATION_TIMEOUT,
+        get_retry_policy(),
+        session_repository.IDEMPOTENT_METHODS,
+        REDIS_TRANSIENT_ERRORS,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_reminder_repository() -> Optional[ReminderRepository]:
+    """Get the reminder repository of this worker, if reminders are enabled."""
+    if not settings.REMINDER_ENABLED:
+        return None
+    return RedisReminderRepository(get_redis())
 
 
 SurveyRepositoryDep = Annotated[SurveyRepository, Depends(get_survey_repository)]
@@ -1,23 +1,60 @@
 """Dependencies for services"""
 
-from typing import Annotated
+from functools import lru_cache
+from typing import Annotated, Optional
 
 from fastapi import Depends
 
 from ..services.survey_service import SurveyService
 from ..services.response_service import ResponseService
 from ..services.session_service import SessionService
+from ..services.session_heartbeat import SessionHeartbeat
 from ..services.chats_service import ChatsService
+from ..services.gateway_service import GatewayService
+from ..services.rate_limit_service import RateLimitService
+from ..services.warmup_service import WarmupService
+from ..services.survey_catalog_refresher import SurveyCatalogRefresher
+from ..services.reminder_worker import ReminderWorker
+from ..services.outbound_gateway import LocalOutboundGateway
+from ..repositories.redis.session_redis_repository import RedisSessionRepository
+from ..repositories.redis.rate_limit_redis_repository import RedisRateLimitRepository
+from ..repositories.survey_catalog import SurveyCatalog
+from ..core.config import get_settings
+from ..core.cache import TTLCache
+from ..core.concurrency import KeyedSerialQueue
+from ..core.startup import get_startup
+from ..models.surveys import SurveyDocument
+from .database import get_database, get_reporting_database
+from .redis import get_redis_client
 from .repositories import (
     SurveyRepositoryDep,
     ResponseRepositoryDep,
     SessionRepositoryDep,
+    get_reminder_repository,
+    get_response_repository,
+    get_survey_repository,
 )
 
+settings = get_settings()
+
+
+@lru_cache(maxsize=1)
+def get_survey_cache() -> TTLCache[SurveyDocument]:
+    """Get the cached serialized surveys of this worker."""
+    return TTLCache(settings.SURVEY_CACHE_SIZE, settings.SURVEY_CACHE_TTL)
+
+
+@lru_cache(maxsize=1)
+def get_survey_catalog() -> Optional[SurveyCatalog]:
+    """Get the survey catalog of the node, if configured."""
+    if settings.SURVEY_CATALOG_PATH is None:
+        return None
+    return SurveyCatalog(settings.SURVEY_CATALOG_PATH)
+
 
 async def get_survey_service(repository: SurveyRepositoryDep) -> SurveyService:
     """Get survey service instance."""
-    return SurveyService(repository)
+    return SurveyService(repository, cache=get_survey_cache(), catalog=get_survey_catalog())
 
 
 async def get_response_service(
@@ -31,13 +68,31 @@ SurveyServiceDep = Annotated[SurveyService, Depends(get_survey_service)]
 ResponseServiceDep = Annotated[ResponseService, Depends(get_response_service)]
 
 
+@lru_cache(maxsize=1)
+def get_session_heartbeat() -> SessionHeartbeat:
+    """Get the cached session heartbeat of this worker."""
+    return SessionHeartbeat(
+        RedisSessionRepository(get_redis_client()), settings.SESSION_HEARTBEAT_INTERVAL
+    )
+
+
+SessionHeartbeatDep = Annotated[SessionHeartbeat, Depends(get_session_heartbeat)]
+
+
 async def get_session_service(
     session_repository: SessionRepositoryDep,
     survey_service: SurveyServiceDep,
     response_service: ResponseServiceDep,
+    heartbeat: SessionHeartbeatDep,
 ) -> SessionService:
     """Get session service instance."""
-    return SessionService(session_repository, survey_service, response_service)
+    return SessionService(
+        session_repository,
+        survey_service,
+        response_service,
+        heartbeat,
+        reminders=get_reminder_repository(),
+    )
 
 
 SessionServiceDep = Annotated[SessionService, Depends(get_session_service)]
@@ -53,3 +108,88 @@ async def get_chats_service(
 
 
 ChatsServiceDep = Annotated[ChatsService, Depends(get_chats_service)]
+
+
+@lru_cache(maxsize=1)
+def get_message_queue() -> KeyedSerialQueue:
+    """Get the cached per-session message queue of this worker."""
+    return KeyedSerialQueue(settings.GATEWAY_MAX_CONCURRENCY)
+
+
+async def get_gateway_service(
+    session_repository: SessionRepositoryDep,
+    survey_service: SurveyServiceDep,
+    response_service: ResponseServiceDep,
+    queue: Annotated[KeyedSerialQueue, Depends(get_message_queue)],
+) -> GatewayService:
+    """Get gateway service instance."""
+    # Gateway sessions are not held by a connection, so their leases are not renewed
+    session_service = SessionService(
+        session_repository, survey_service, response_service, reminders=get_reminder_repository()
+    )
+    chats_service = ChatsService(survey_service, response_service, session_service)
+    return GatewayService(chats_service, queue)
+
+
+GatewayServiceDep = Annotated[GatewayService, Depends(get_gateway_service)]
+
+
+@lru_cache(maxsize=1)
+def get_rate_limit_service() -> RateLimitService:
+    """Get the cached rate limit service of this worker, which keeps the local buckets."""
+    return RateLimitService(
+        RedisRateLimitRepository(get_redis_client()), settings.RATE_LIMIT_LOCAL_KEYS
+    )
+
+
+RateLimitServiceDep = Annotated[RateLimitService, Depends(get_rate_limit_service)]
+
+
+async def get_warmup_service() -> WarmupService:
+    """Get the warmup service of this worker, built outside of any request."""
+    db = await get_database()
+    reporting_db = await get_reporting_database()
+    redis = get_redis_client()
+    survey_repository = await get_survey_repository(db, reporting_db)
+    response_repository = await get_response_repository(db, reporting_db)
+    return WarmupService(
+        SurveyService(survey_repository, cache=get_survey_cache(), catalog=get_survey_catalog()),
+        ResponseService(response_repository, survey_repository),
+        {
+            "mongo_oltp": lambda: db.command("ping"),
+            "mongo_reporting": lambda: reporting_db.command(
+                "ping", read_preference=reporting_db.read_preference
+            ),
+            "redis": redis.ping,
+        },
+        get_startup(),
+        settings.WARMUP_SURVEYS,
+        settings.WARMUP_ACTIVITY_WINDOW,
+        settings.WARMUP_TIMEOUT,
+    )
+
+
+async def get_survey_catalog_refresher() -> Optional[SurveyCatalogRefresher]:
+    """Get the survey catalog refresher of this worker, if a catalog is configured."""
+    catalog = get_survey_catalog()
+    if catalog is None:
+        return None
+    db = await get_database()
+    survey_repository = await get_survey_repository(db, await get_reporting_database())
+    return SurveyCatalogRefresher(
+        survey_repository, catalog, settings.SURVEY_CATALOG_REFRESH_INTERVAL
+    )
+
+
+def get_reminder_worker() -> Optional[ReminderWorker]:
+    """Get the reminder worker of this worker, if reminders are enabled."""
+    repository = get_reminder_repository()
+    if repository is None:
+        return None
+    # Reminders go through the stand-in gateway until a messaging provider is wired in
+    return ReminderWorker(
+        repository,
+        LocalOutboundGateway(),
+        settings.REMINDER_BATCH_SIZE,
+        settings.REMINDER_POLL_INTERVAL,
+    )
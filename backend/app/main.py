@@ -1,15 +1,55 @@
 """Main module for the survey API."""
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from .core.logging import setup_logging
+from .core.process_pool import shutdown_process_pool
+from .core.startup import get_startup
+from .dependencies.services import (
+    get_reminder_worker,
+    get_session_heartbeat,
+    get_survey_catalog_refresher,
+    get_warmup_service,
+)
 from .routers import surveys, health, chats
 
 # Initialize logging
 setup_logging()
+get_startup().mark_imported()
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    """Start and stop the background tasks of the worker."""
+    heartbeat = get_session_heartbeat()
+    heartbeat.start()
+    catalog_refresher = await get_survey_catalog_refresher()
+    if catalog_refresher is not None:
+        catalog_refresher.start()
+    warmup = await get_warmup_service()
+    warmup.start()
+    reminder_worker = get_reminder_worker()
+    if reminder_worker is not None:
+        reminder_worker.start()
+    try:
+        yield
+    finally:
+        if reminder_worker is not None:
+            await reminder_worker.stop()
+        await warmup.stop()
+        if catalog_refresher is not None:
+            await catalog_refresher.stop()
+        await heartbeat.stop()
+        shutdown_process_pool()
+
 
 app = FastAPI(
-    title="Survey API", description="API for managing surveys and responses", version="1.0.0"
+    title="Survey API",
+    description="API for managing surveys and responses",
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Include routers
@@ -21,4 +61,14 @@ app.include_router(chats, prefix="/api/v1")
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    from .core.config import get_settings
+
+    settings = get_settings()
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        ws_ping_interval=settings.WS_PING_INTERVAL,
+        ws_ping_timeout=settings.WS_PING_TIMEOUT,
+        ws_per_message_deflate=settings.WS_PER_MESSAGE_DEFLATE,
+    )
@@ -0,0 +1,43 @@
+"""Models for outbound survey campaigns"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from ..core.constants import UTC
+
+
+class Recipient(BaseModel):
+    """Model for a user invited to a survey by a campaign, through a messaging provider"""
+
+    user_id: str = Field(..., min_length=1)
+    provider: str = "default"
+
+
+class CampaignProgress(BaseModel):
+    """Model for the checkpointed progress of a campaign
+
+    Recipients up to the offset were read. Those of the last batch are pending until
+    they are messaged, so that a resumed campaign messages them. While their responses
+    are being created, the time the batch was read is kept too.
+    """
+
+    campaign_id: str
+    survey_id: str
+    offset: int = 0
+    created: int = 0  # responses created
+    skipped: int = 0  # recipients who already had a response
+    sent: int = 0
+    failed: int = 0
+    pending: List[Recipient] = []
+    creating_since: Optional[datetime] = None  # set until the pending responses are created
+    is_complete: bool = False
+    started_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+
+    @property
+    def messages_per_second(self) -> float:
+        """Messages sent per second since the campaign started"""
+        elapsed = (self.updated_at - self.started_at).total_seconds()
+        return self.sent / elapsed if elapsed > 0 else 0.0
@@ -0,0 +1,335 @@
+"""Expression language for routing on earlier answers
+
+Expressions reference earlier answers by question id and compare them with literals or
+with other answers, for example ``q3 > 5 and q1 == "yes"``. The grammar is::
+
+    expression := or
+    or         := and ("or" and)*
+    and        := not ("and" not)*
+    not        := "not" not | comparison
+    comparison := operand (("==" | "!=" | "<" | "<=" | ">" | ">=") operand | "in" list)?
+    operand    := question_id | number | string | "true" | "false" | "(" expression ")"
+    list       := "[" operand ("," operand)* "]"
+
+Expressions are type-checked against the answer types of the survey questions and
+compiled into closures, so evaluating one is a handful of dict lookups. Comparisons with
+a question that has not been answered are false.
+"""
+
+import ast
+import operator
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Tuple
+
+from ..core.exceptions import BusinessRuleError
+
+# Answer types, as seen by expressions
+NUMBER = "number"
+TEXT = "text"
+DATE = "date"
+BOOLEAN = "boolean"
+
+DATE_FORMAT = "%Y-%m-%d"
+
+Evaluator = Callable[[Mapping[str, Any]], bool]
+
+
+class AnswerTypes(Mapping[str, str]):
+    """Answer type of each question of a survey, immutable and hashed once.
+
+    Compiled expressions are cached by their answer types, so surveys build this once
+    instead of a hashable copy of their answer types on every compilation.
+    """
+
+    def __init__(self, answer_types: Mapping[str, str]):
+        self._types: Dict[str, str] = dict(answer_types)
+        self._key = frozenset(self._types.items())
+        self._hash = hash(self._key)
+
+    def __getitem__(self, question_id: str) -> str:
+        """Get the answer type of a question."""
+        return self._types[question_id]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the question ids."""
+        return iter(self._types)
+
+    def __len__(self) -> int:
+        """Number of questions."""
+        return len(self._types)
+
+    def __hash__(self) -> int:
+        """Hash of the answer types, computed once."""
+        return self._hash
+
+    def __eq__(self, other: object) -> bool:
+        """Compare with other answer types."""
+        if isinstance(other, AnswerTypes):
+            return self._key == other._key
+        return super().__eq__(other)
+
+
+_MISSING = object()
+_KEYWORDS = {"and", "or", "not", "in", "true", "false"}
+_COMPARISONS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+_ORDERED_TYPES = {NUMBER, DATE}
+# Parentheses and negations an expression may nest, well below the recursion limit
+_MAX_NESTING = 32
+_TOKEN = re.compile(
+    r"\s*(?:"
+    r"(?P<number>-?(?:\d+(?:\.\d*)?|\.\d+))"
+    r"|(?P<string>\"(?:[^\"\\]|\\.)*\"|'(?:[^'\\]|\\.)*')"
+    r"|(?P<op>==|!=|<=|>=|<|>|\(|\)|\[|\]|,)"
+    r"|(?P<name>[A-Za-z_][A-Za-z0-9_]*)"
+    r")"
+)
+
+
+class _Parser:
+    """Recursive-descent parser producing a tuple-based syntax tree."""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.tokens = self._tokenize(source)
+        self.position = 0
+        self.depth = 0
+
+    def error(self, message: str) -> BusinessRuleError:
+        return BusinessRuleError(f"Invalid expression {self.source!r}: {message}")
+
+    def _tokenize(self, source: str) -> List[Tuple[str, str]]:
+        tokens = []
+        position = 0
+        source = source.rstrip()
+        while position < len(source):
+            match = _TOKEN.match(source, position)
+            if match is None or match.end() == position:
+                raise self.error(f"unexpected character at position {position}")
+            kind = match.lastgroup
+            value = match.group(kind)
+            if kind == "name" and value in _KEYWORDS:
+                kind = "keyword"
+            tokens.append((kind, value))
+            position = match.end()
+        return tokens
+
+    def peek(self, value: str) -> bool:
+        return self.position < len(self.tokens) and self.tokens[self.position][1] == value
+
+    def take(self, value: str = None) -> Tuple[str, str]:
+        if self.position >= len(self.tokens):
+            raise self.error("unexpected end of expression")
+        token = self.tokens[self.position]
+        if value is not None and token[1] != value:
+            raise self.error(f"expected {value!r}, got {token[1]!r}")
+        self.position += 1
+        return token
+
+    def parse(self) -> tuple:
+        node = self.parse_or()
+        if self.position < len(self.tokens):
+            raise self.error(f"unexpected {self.tokens[self.position][1]!r}")
+        return node
+
+    def parse_or(self) -> tuple:
+        node = self.parse_and()
+        while self.peek("or"):
+            self.take()
+            node = ("or", node, self.parse_and())
+        return node
+
+    def parse_and(self) -> tuple:
+        node = self.parse_not()
+        while self.peek("and"):
+            self.take()
+            node = ("and", node, self.parse_not())
+        return node
+
+    def nest(self) -> None:
+        self.depth += 1
+        if self.depth > _MAX_NESTING:
+            raise self.error("expression nested too deeply")
+
+    def parse_not(self) -> tuple:
+        if self.peek("not"):
+            self.take()
+            self.nest()
+            node = ("not", self.parse_not())
+            self.depth -= 1
+            return node
+        return self.parse_comparison()
+
+    def parse_comparison(self) -> tuple:
+        left = self.parse_operand()
+        if self.peek("in"):
+            self.take()
+            return ("in", left, self.parse_list())
+        for symbol in _COMPARISONS:
+            if self.peek(symbol):
+                self.take()
+                return ("compare", symbol, left, self.parse_operand())
+        return left
+
+    def parse_list(self) -> tuple:
+        self.take("[")
+        items = [self.parse_operand()]
+        while self.peek(","):
+            self.take()
+            items.append(self.parse_operand())
+        self.take("]")
+        return ("list", items)
+
+    def parse_operand(self) -> tuple:
+        kind, value = self.take()
+        if kind == "number":
+            return ("literal", float(value), NUMBER)
+        if kind == "string":
+            return ("literal", ast.literal_eval(value), TEXT)
+        if value in ("true", "false"):
+            return ("literal", value == "true", BOOLEAN)
+        if kind == "name":
+            return ("answer", value)
+        if value == "(":
+            self.nest()
+            node = self.parse_or()
+            self.take(")")
+            self.depth -= 1
+            return node
+        raise self.error(f"unexpected {value!r}")
+
+
+class _Compiler:
+    """Type-checks a syntax tree and compiles it into closures."""
+
+    def __init__(self, parser: _Parser, answer_types: Mapping[str, str]):
+        self.parser = parser
+        self.answer_types = answer_types
+
+    def type_of(self, node: tuple) -> str:
+        match node:
+            case ("literal", _, literal_type):
+                return literal_type
+            case ("answer", question_id):
+                if question_id not in self.answer_types:
+                    raise self.parser.error(f"question {question_id} not found")
+                return self.answer_types[question_id]
+        return BOOLEAN
+
+    def coerce(self, node: tuple, expected: str) -> tuple:
+        """Convert a literal to the answer type it is compared with."""
+        if node[0] != "literal" or node[2] == expected:
+            return node
+        value = node[1]
+        if node[2] == TEXT and expected == DATE:
+            try:
+                date = datetime.strptime(value, DATE_FORMAT)
+                return ("literal", date.strftime(DATE_FORMAT), DATE)
+            except ValueError as e:
+                raise self.parser.error(f"invalid date {value!r}") from e
+        if node[2] == TEXT and expected == BOOLEAN and value in ("yes", "no"):
+            return ("literal", value == "yes", BOOLEAN)
+        raise self.parser.error(f"cannot compare a {expected} answer with {value!r}")
+
+    def operand(self, node: tuple) -> Callable[[Mapping[str, Any]], Any]:
+        if node[0] == "literal":
+            value = node[1]
+            return lambda answers: value
+        question_id = node[1]
+        return lambda answers: answers.get(question_id, _MISSING)
+
+    def compile(self, node: tuple) -> Evaluator:
+        match node:
+            case ("or", left, right):
+                left, right = self.compile(left), self.compile(right)
+                return lambda answers: left(answers) or right(answers)
+            case ("and", left, right):
+                left, right = self.compile(left), self.compile(right)
+                return lambda answers: left(answers) and right(answers)
+            case ("not", operand):
+                operand = self.compile(operand)
+                return lambda answers: not operand(answers)
+            case ("compare", symbol, left, right):
+                return self.compile_comparison(symbol, left, right)
+            case ("in", left, ("list", items)):
+                return self.compile_membership(left, items)
+        if self.type_of(node) != BOOLEAN:
+            raise self.parser.error("expected a condition")
+        if node[0] == "literal":
+            value = node[1]
+            return lambda answers: value
+        question_id = node[1]
+        return lambda answers: answers.get(question_id) is True
+
+    def compile_comparison(self, symbol: str, left: tuple, right: tuple) -> Evaluator:
+        if left[0] not in ("answer", "literal") or right[0] not in ("answer", "literal"):
+            raise self.parser.error("comparisons must be between answers and literals")
+        left_type, right_type = self.type_of(left), self.type_of(right)
+        if left[0] == "answer":
+            right = self.coerce(right, left_type)
+        elif right[0] == "answer":
+            left = self.coerce(left, right_type)
+        left_type, right_type = self.type_of(left), self.type_of(right)
+        if left_type != right_type:
+            raise self.parser.error(f"cannot compare a {left_type} with a {right_type}")
+        if symbol not in ("==", "!=") and left_type not in _ORDERED_TYPES:
+            raise self.parser.error(f"{left_type} answers only support == and !=")
+
+        compare = _COMPARISONS[symbol]
+        if left[0] == "answer" and right[0] == "literal":
+            # Most conditions compare an answer with a literal, so skip the generic path
+            question_id, value = left[1], right[1]
+            return lambda answers: (
+                (answer := answers.get(question_id, _MISSING)) is not _MISSING
+                and compare(answer, value)
+            )
+
+        left, right = self.operand(left), self.operand(right)
+
+        def evaluate(answers: Mapping[str, Any]) -> bool:
+            left_value, right_value = left(answers), right(answers)
+            if left_value is _MISSING or right_value is _MISSING:
+                return False
+            return compare(left_value, right_value)
+
+        return evaluate
+
+    def compile_membership(self, left: tuple, items: List[tuple]) -> Evaluator:
+        if left[0] != "answer":
+            raise self.parser.error("'in' needs an answer on its left side")
+        answer_type = self.type_of(left)
+        values = set()
+        for item in items:
+            item = self.coerce(item, answer_type)
+            if item[0] != "literal" or item[2] != answer_type:
+                raise self.parser.error(f"'in' lists must contain {answer_type} literals")
+            values.add(item[1])
+        question_id, values = left[1], frozenset(values)
+        return lambda answers: answers.get(question_id, _MISSING) in values
+
+
+@lru_cache(maxsize=4096)
+def _compile_expression(source: str, answer_types: AnswerTypes) -> Evaluator:
+    parser = _Parser(source)
+    compiler = _Compiler(parser, answer_types)
+    evaluate = compiler.compile(parser.parse())
+    return lambda answers: bool(evaluate(answers))
+
+
+def compile_expression(source: str, answer_types: Mapping[str, str]) -> Evaluator:
+    """Compile an expression, type-checked against the answer type of each question id.
+
+    Compiled expressions are cached, so surveys sharing expressions compile them once.
+    Answer types given as AnswerTypes are used as the cache key as they are.
+    """
+    if not isinstance(answer_types, AnswerTypes):
+        answer_types = AnswerTypes(answer_types)
+    return _compile_expression(source, answer_types)
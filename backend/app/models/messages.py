@@ -0,0 +1,53 @@
+"""Models for messages exchanged with messaging providers"""
+
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from .surveys import Question
+
+
+class ChatMessage(BaseModel):
+    """Model for a chat message sent as a JSON envelope, to be processed exactly once."""
+
+    text: str
+    message_id: Optional[str] = Field(default=None, min_length=1, max_length=128)
+
+
+class InboundMessage(BaseModel):
+    """Model for a message received from a user through a provider."""
+
+    user_id: str
+    survey_id: str
+    text: str
+    message_id: Optional[str] = None  # Provider message id, echoed in the reply
+
+
+class InboundMessageBatch(BaseModel):
+    """Model for a batch of inbound messages, in the order they were received."""
+
+    messages: List[InboundMessage] = Field(..., min_length=1, max_length=10000)
+
+
+class InboundReply(BaseModel):
+    """Model for the outcome of handling an inbound message."""
+
+    message: InboundMessage
+    question: Optional[Question] = None
+    error: Optional[str] = None
+    is_complete: bool = False
+
+
+class OutboundMessage(BaseModel):
+    """Model for a message to send to a user through a provider."""
+
+    user_id: str
+    survey_id: str
+    text: str
+    in_reply_to: Optional[str] = None
+
+
+class OutboundMessageBatch(BaseModel):
+    """Model for a batch of outbound messages, in the order of the inbound messages."""
+
+    messages: List[OutboundMessage]
@@ -1,12 +1,13 @@
 """Base models for survey responses."""
 
-from typing import Any, List, Optional
+import hashlib
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, model_validator
 
 from .types import QuestionType
-from ..core.constants import UTC
+from ..core.constants import QUESTION_ID_PATTERN, UTC
 from ..core.exceptions import BusinessRuleError
 
 
@@ -19,6 +20,23 @@ class QuestionResponse(BaseModel):
     next_question_id: Optional[str] = None
 
 
+def index_answer_list(answers: List[Any]) -> Dict[str, Any]:
+    """Key a list of answers by question id, keeping the latest answer of each question.
+
+    Questions keep the position of their first answer, so the keys follow the answer path.
+    """
+    indexed = {}
+    for answer in answers:
+        question_id = answer["question_id"] if isinstance(answer, dict) else answer.question_id
+        indexed[question_id] = answer
+    return indexed
+
+
+def processed_message_key(message_id: str) -> str:
+    """Key a client message id by its digest, so any id is a valid MongoDB field name."""
+    return hashlib.sha256(message_id.encode()).hexdigest()[:32]
+
+
 class SurveyResponse(BaseModel):
     """Base model for survey responses with common fields."""
 
@@ -30,6 +48,75 @@ class SurveyResponse(BaseModel):
     started_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
     completed_at: Optional[datetime] = None
     last_updated_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
-    answers: Optional[List[QuestionResponse]] = None
+    answers: Optional[Dict[str, QuestionResponse]] = None  # Latest answer by question id
+    # Question ids in the order they were first answered, without repeat visits, so that
+    # retried answer updates leave it unchanged
+    answer_path: List[str] = []
+    # Next question id replied to each answered client message, see processed_message_key
+    processed_messages: Dict[str, Optional[str]] = {}
 
     model_config = ConfigDict(populate_by_name=True)
+
+    @model_validator(mode="before")
+    @classmethod
+    def index_legacy_answers(cls, data: Any) -> Any:
+        """Key the answers of responses stored as a list, before they are migrated."""
+        if isinstance(data, dict) and isinstance(data.get("answers"), list):
+            answers = index_answer_list(data["answers"])
+            data = {**data, "answers": answers}
+            data.setdefault("answer_path", list(answers))
+        return data
+
+
+class AnswerSubmission(BaseModel):
+    """Model for an answer submitted in a batch."""
+
+    question_id: Optional[str] = None  # When given, must be the question being answered
+    value: str
+
+
+class AnswerBatch(BaseModel):
+    """Model for an ordered batch of answers."""
+
+    answers: List[AnswerSubmission] = Field(..., min_length=1, max_length=1000)
+
+
+class AnswerBatchResult(BaseModel):
+    """Model for the position reached after applying a batch of answers."""
+
+    accepted: int
+    current_question_id: Optional[str] = None
+    is_complete: bool
+
+
+class ResponseQuery(BaseModel):
+    """Model for the filters of a response query, paged from the most recently updated.
+
+    Ranges include their start and exclude their end. Answer filters match the responses
+    whose answer to the question equals the answer, as validated by the question.
+    """
+
+    survey_id: str
+    is_complete: Optional[bool] = None
+    started_from: Optional[datetime] = None
+    started_until: Optional[datetime] = None
+    completed_from: Optional[datetime] = None
+    completed_until: Optional[datetime] = None
+    question_id: Optional[str] = Field(default=None, pattern=QUESTION_ID_PATTERN)
+    answer: Optional[Any] = None
+    cursor: Optional[str] = None  # Next cursor of the previous page
+    limit: int = Field(default=50, ge=1, le=500)
+
+    @model_validator(mode="after")
+    def check_answer_filter(self) -> "ResponseQuery":
+        """Check that answers are filtered by both a question and an answer."""
+        if (self.question_id is None) != (self.answer is None):
+            raise BusinessRuleError("Answer filters need both a question and an answer")
+        return self
+
+
+class ResponsePage(BaseModel):
+    """Model for a page of responses, with the cursor of the next page if there is one."""
+
+    responses: List[SurveyResponse]
+    next_cursor: Optional[str] = None
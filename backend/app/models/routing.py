@@ -0,0 +1,204 @@
+"""Routing tables compiled from the conditions of a question"""
+
+import re
+from bisect import bisect_right
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from .types import QuestionType, ConditionOperator
+from ..core.exceptions import BusinessRuleError
+
+ORDERED_OPERATORS = {
+    ConditionOperator.EQUALS,
+    ConditionOperator.GREATER_THAN,
+    ConditionOperator.GREATER_THAN_OR_EQUALS,
+    ConditionOperator.LESS_THAN,
+    ConditionOperator.LESS_THAN_OR_EQUALS,
+    ConditionOperator.BETWEEN,
+    ConditionOperator.IN,
+}
+
+
+class Interval(NamedTuple):
+    """Range of answers routed to the same question."""
+
+    lower: Any
+    lower_inclusive: bool
+    upper: Any
+    upper_inclusive: bool
+    next_question_id: str
+
+    @property
+    def key(self) -> Tuple[Any, bool]:
+        """Sort key: by lower bound, inclusive bounds first."""
+        return (self.lower, not self.lower_inclusive)
+
+    def contains(self, value: Any) -> bool:
+        """Check if a value falls in the interval."""
+        above = value > self.lower or (self.lower_inclusive and value == self.lower)
+        below = value < self.upper or (self.upper_inclusive and value == self.upper)
+        return above and below
+
+
+class Domain(NamedTuple):
+    """Ordered domain of the answers of a question type."""
+
+    parse: Callable[[Any], Any]
+    minimum: Any
+    maximum: Any
+
+
+def _parse_number(value: Any) -> float:
+    if isinstance(value, bool):
+        raise ValueError("Booleans are not numbers")
+    return float(value)
+
+
+def _parse_date(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.strptime(value, "%Y-%m-%d")
+
+
+NUMBER_DOMAIN = Domain(_parse_number, float("-inf"), float("inf"))
+DATE_DOMAIN = Domain(_parse_date, datetime.min, datetime.max)
+ORDERED_DOMAINS = {
+    QuestionType.NUMBER: NUMBER_DOMAIN,
+    QuestionType.RATING: NUMBER_DOMAIN,
+    QuestionType.DATE: DATE_DOMAIN,
+}
+
+
+class CompiledRouting:
+    """Routing table compiled from the conditions of a question.
+
+    Ordered answers (numbers, ratings and dates) are routed with a binary search over
+    sorted, non-overlapping intervals. Text answers are routed with a dict lookup for
+    exact values, then with the regex and contains conditions in their declared order.
+    """
+
+    def __init__(
+        self,
+        domain: Optional[Domain] = None,
+        intervals: Optional[List[Interval]] = None,
+        exact: Optional[Dict[str, str]] = None,
+        patterns: Optional[List[Tuple[Callable[[str], bool], str]]] = None,
+    ):
+        self.domain = domain
+        self.intervals = sorted(intervals or [], key=lambda interval: interval.key)
+        self._keys = [interval.key for interval in self.intervals]
+        self.exact = exact or {}
+        self.patterns = patterns or []
+
+    def route(self, value: Any) -> Optional[str]:
+        """Get the next question id for an answer, or None if no condition matches."""
+        if self.domain is not None:
+            try:
+                value = self.domain.parse(value)
+            except (TypeError, ValueError):
+                return None
+            # The only candidate is the interval with the greatest lower bound <= value
+            index = bisect_right(self._keys, (value, False)) - 1
+            if index >= 0 and self.intervals[index].contains(value):
+                return self.intervals[index].next_question_id
+            return None
+
+        text = str(value)
+        if text in self.exact:
+            return self.exact[text]
+        for matches, next_question_id in self.patterns:
+            if matches(text):
+                return next_question_id
+        return None
+
+
+def _interval(condition: Any, domain: Domain) -> List[Interval]:
+    """Convert an ordered condition into the intervals it matches."""
+    parse, minimum, maximum = domain
+    value, target = condition.value, condition.next_question_id
+    match condition.operator:
+        case ConditionOperator.EQUALS:
+            point = parse(value)
+            return [Interval(point, True, point, True, target)]
+        case ConditionOperator.IN:
+            if not isinstance(value, list) or not value:
+                raise ValueError("'in' conditions need a non-empty list of values")
+            return [Interval(parse(v), True, parse(v), True, target) for v in value]
+        case ConditionOperator.GREATER_THAN:
+            return [Interval(parse(value), False, maximum, True, target)]
+        case ConditionOperator.GREATER_THAN_OR_EQUALS:
+            return [Interval(parse(value), True, maximum, True, target)]
+        case ConditionOperator.LESS_THAN:
+            return [Interval(minimum, True, parse(value), False, target)]
+        case ConditionOperator.LESS_THAN_OR_EQUALS:
+            return [Interval(minimum, True, parse(value), True, target)]
+        case ConditionOperator.BETWEEN:
+            if not isinstance(value, list) or len(value) != 2:
+                raise ValueError("'between' conditions need a [lower, upper] pair")
+            lower, upper = parse(value[0]), parse(value[1])
+            if lower > upper:
+                raise ValueError("'between' lower bound is greater than its upper bound")
+            return [Interval(lower, True, upper, True, target)]
+
+
+def _check_overlaps(intervals: List[Interval]) -> None:
+    """Reject intervals that share answers, since routing would be ambiguous."""
+    intervals = sorted(intervals, key=lambda interval: interval.key)
+    for previous, current in zip(intervals, intervals[1:]):
+        if current.lower < previous.upper or (
+            current.lower == previous.upper and current.lower_inclusive and previous.upper_inclusive
+        ):
+            raise BusinessRuleError(
+                f"Conditions for questions {previous.next_question_id} and "
+                f"{current.next_question_id} overlap"
+            )
+
+
+def _compile_ordered(conditions: List[Any], domain: Domain) -> CompiledRouting:
+    intervals = []
+    for condition in conditions:
+        if condition.operator not in ORDERED_OPERATORS:
+            raise BusinessRuleError(f"Operator {condition.operator.value} is not supported")
+        try:
+            intervals.extend(_interval(condition, domain))
+        except (TypeError, ValueError) as e:
+            raise BusinessRuleError(
+                f"Invalid value for {condition.operator.value} condition: {e}"
+            ) from e
+    _check_overlaps(intervals)
+    return CompiledRouting(domain=domain, intervals=intervals)
+
+
+def _compile_text(conditions: List[Any]) -> CompiledRouting:
+    exact: Dict[str, str] = {}
+    patterns = []
+    for condition in conditions:
+        value, target = condition.value, condition.next_question_id
+        match condition.operator:
+            case ConditionOperator.EQUALS | ConditionOperator.IN:
+                values = value if condition.operator == ConditionOperator.IN else [value]
+                if not isinstance(values, list) or not values:
+                    raise BusinessRuleError("'in' conditions need a non-empty list of values")
+                for v in values:
+                    if str(v) in exact and exact[str(v)] != target:
+                        raise BusinessRuleError(f"Conditions for answer {v} conflict")
+                    exact[str(v)] = target
+            case ConditionOperator.REGEX:
+                try:
+                    patterns.append((re.compile(str(value)).search, target))
+                except re.error as e:
+                    raise BusinessRuleError(f"Invalid regex {value}: {e}") from e
+            case ConditionOperator.CONTAINS:
+                needle = str(value).casefold()
+                patterns.append((lambda text, needle=needle: needle in text.casefold(), target))
+            case _:
+                raise BusinessRuleError(f"Operator {condition.operator.value} is not supported")
+    return CompiledRouting(exact=exact, patterns=patterns)
+
+
+def compile_routing(question_type: QuestionType, conditions: List[Any]) -> CompiledRouting:
+    """Compile the conditions of a question into a routing table."""
+    domain = ORDERED_DOMAINS.get(question_type)
+    if domain is not None:
+        return _compile_ordered(conditions, domain)
+    return _compile_text(conditions)
@@ -1,6 +1,6 @@
 """Models for sessions"""
 
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from pydantic import BaseModel
 
@@ -25,3 +25,31 @@ class Session(BaseModel):
     id: SessionId
     survey: Optional[Survey] = None
     response: Optional[SurveyResponse] = None
+    answer_index: Dict[str, Any] = {}  # Latest answer of each question, for expressions
+    # Recent client message ids, oldest first, with the next question id they replied with
+    processed_messages: Dict[str, Optional[str]] = {}
+
+    def record_message(self, message_id: str, next_question_id: Optional[str], limit: int) -> None:
+        """Remember the reply to a client message, forgetting the oldest beyond the limit."""
+        self.processed_messages.pop(message_id, None)
+        self.processed_messages[message_id] = next_question_id
+        while len(self.processed_messages) > limit:
+            del self.processed_messages[next(iter(self.processed_messages))]
+
+    def get_answer_index(self) -> Dict[str, Any]:
+        """Get the answer index, building it from the stored answers on first use."""
+        if not self.answer_index and self.survey is not None and self.response is not None:
+            for answer in (self.response.answers or {}).values():
+                question = self.survey.questions.get(answer.question_id)
+                if question is not None:
+                    self.answer_index[answer.question_id] = question.index_value(
+                        answer.response_value
+                    )
+        return self.answer_index
+
+
+class Reminder(BaseModel):
+    """Reminder of a session left incomplete, due at a Unix timestamp."""
+
+    session_id: SessionId
+    due_at: float
@@ -1,14 +1,30 @@
 """Models for surveys"""
 
-from typing import Any, Dict, List, Optional
+import hashlib
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 from datetime import datetime
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, PrivateAttr, field_serializer
 
-from .types import QuestionType, ConditionOperator
+from .types import QuestionType, ConditionOperator, ImportStatus
+from .routing import CompiledRouting, compile_routing
+from . import expressions
+from ..core.constants import QUESTION_ID_PATTERN
 from ..core.exceptions import BusinessRuleError
 
 
+def _normalize_text(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+
+def _is_number(value: str) -> bool:
+    try:
+        float(value)
+    except ValueError:
+        return False
+    return True
+
+
 class NextQuestionCondition(BaseModel):
     """Model for a next question condition"""
 
@@ -17,6 +33,13 @@ class NextQuestionCondition(BaseModel):
     next_question_id: str
 
 
+class ExpressionCondition(BaseModel):
+    """Model for a next question chosen by an expression over earlier answers"""
+
+    when: str = Field(..., min_length=1, max_length=1000)
+    next_question_id: str
+
+
 class QuestionOption(BaseModel):
     """Model for a question option"""
 
@@ -33,14 +56,19 @@ class QuestionOption(BaseModel):
 class Question(BaseModel):
     """Model for a question"""
 
-    id: str
+    id: str = Field(..., pattern=QUESTION_ID_PATTERN)
     type: QuestionType
     text: str
     options: Optional[List[QuestionOption]] = []
     default_next_question_id: Optional[str] = None
     conditional_next: Optional[List[NextQuestionCondition]] = []
+    expression_next: Optional[List[ExpressionCondition]] = []
     is_terminal: bool = False
 
+    _routing: Optional[CompiledRouting] = PrivateAttr(default=None)
+    _option_index: Optional[Dict[str, QuestionOption]] = PrivateAttr(default=None)
+    _expressions: Optional[List[Tuple[expressions.Evaluator, str]]] = PrivateAttr(default=None)
+
     model_config = ConfigDict(
         json_schema_extra={
             "example": {
@@ -64,39 +92,125 @@ class Question(BaseModel):
 
     def validate_next_questions(self, available_questions: set[str]) -> bool:
         """Validate that all referenced next questions exist"""
+        self._validate_default_next_question(available_questions)
+        for option in self.options or []:
+            self._validate_option_next_questions(option, available_questions)
+
+        for condition in (self.conditional_next or []) + (self.expression_next or []):
+            if condition.next_question_id not in available_questions:
+                raise BusinessRuleError(f"Question {condition.next_question_id} not found")
+
+        return True
+
+    def _validate_default_next_question(self, available_questions: set[str]) -> None:
+        """Validate that the default next question exists, unless the question is terminal"""
         if self.default_next_question_id and not self.is_terminal:
             if self.default_next_question_id not in available_questions:
                 raise BusinessRuleError(f"Question {self.default_next_question_id} not found")
 
-        if self.options:
-            for option in self.options:
-                if option.next_question_id and option.next_question_id not in available_questions:
-                    raise BusinessRuleError(f"Question {option.next_question_id} not found")
-                if option.conditions:
-                    for condition in option.conditions:
-                        if condition.next_question_id not in available_questions:
-                            raise BusinessRuleError(
-                                f"Question {condition.next_question_id} not found"
-                            )
-
-        if self.conditional_next:
-            for condition in self.conditional_next:
-                if condition.next_question_id not in available_questions:
-                    raise BusinessRuleError(f"Question {condition.next_question_id} not found")
+    @staticmethod
+    def _validate_option_next_questions(
+        option: QuestionOption, available_questions: set[str]
+    ) -> None:
+        """Validate that the next questions of an option and of its conditions exist"""
+        if option.next_question_id and option.next_question_id not in available_questions:
+            raise BusinessRuleError(f"Question {option.next_question_id} not found")
+        for condition in option.conditions or []:
+            if condition.next_question_id not in available_questions:
+                raise BusinessRuleError(f"Question {condition.next_question_id} not found")
+
+    def compile_routing(self) -> CompiledRouting:
+        """Compile the conditional next questions into a routing table
+
+        Raises a BusinessRuleError if a condition is invalid or overlaps another one.
+        """
+        self._routing = compile_routing(self.type, self.conditional_next or [])
+        return self._routing
+
+    @property
+    def routing(self) -> CompiledRouting:
+        """Routing table of the conditional next questions, compiled on first use"""
+        if self._routing is None:
+            return self.compile_routing()
+        return self._routing
+
+    @property
+    def option_index(self) -> Dict[str, QuestionOption]:
+        """Options by id, by 1-based position and by normalized text, built on first use
+
+        Positions take precedence over ids, since they are what the prompt shows, and ids
+        over texts, when they collide.
+        """
+        if self._option_index is None:
+            options = self.options or []
+            index = {}
+            for option in options:
+                index.setdefault(_normalize_text(option.text), option)
+            for option in options:
+                index[option.id] = option
+            for position, option in enumerate(options, 1):
+                index[str(position)] = option
+            self._option_index = index
+        return self._option_index
+
+    def match_option(self, response: str) -> Optional[QuestionOption]:
+        """Get the option a reply refers to, by position, id or text"""
+        option = self.option_index.get(response)
+        if option is None:
+            option = self.option_index.get(_normalize_text(response))
+        return option
+
+    def compile_expressions(self, answer_types: Mapping[str, str]) -> None:
+        """Compile the expressions of the question, type-checked against the survey answers"""
+        self._expressions = [
+            (
+                expressions.compile_expression(condition.when, answer_types),
+                condition.next_question_id,
+            )
+            for condition in self.expression_next or []
+        ]
 
-        return True
+    @property
+    def answer_type(self) -> str:
+        """Type of the answers to the question, as seen by expressions"""
+        match self.type:
+            case QuestionType.NUMBER:
+                return expressions.NUMBER
+            case QuestionType.DATE:
+                return expressions.DATE
+            case QuestionType.BOOLEAN:
+                return expressions.BOOLEAN
+            case QuestionType.RATING if self.options and all(
+                _is_number(option.id) for option in self.options
+            ):
+                return expressions.NUMBER
+        return expressions.TEXT
+
+    def index_value(self, value: Any) -> Any:
+        """Normalize a validated answer for the answer index used by expressions"""
+        match self.answer_type:
+            case expressions.NUMBER:
+                return float(value)
+            case expressions.DATE:
+                if isinstance(value, datetime):
+                    return value.strftime(expressions.DATE_FORMAT)
+                return str(value)[:10]
+            case expressions.BOOLEAN:
+                return value if isinstance(value, bool) else value == "yes"
+        return value
 
     def get_validated_response(self, response: str) -> Any:
         """Validate the response against the question conditions"""
         match self.type:
             case QuestionType.MULTIPLE_CHOICE | QuestionType.RATING:
-                if response not in [option.id for option in self.options]:
+                option = self.match_option(response)
+                if option is None:
                     raise BusinessRuleError("Invalid option")
-                return response
+                return option.id
             case QuestionType.BOOLEAN:
                 if response not in ["yes", "no"]:
                     raise BusinessRuleError("Boolean response must be 'yes' or 'no'")
-                return True
+                return response == "yes"
             case QuestionType.DATE:
                 try:
                     datetime.strptime(response, "%Y-%m-%d")
@@ -112,28 +226,51 @@ class Question(BaseModel):
             case _:
                 raise BusinessRuleError("Invalid question type")
 
-    def get_next_question(self, response: str) -> "Question":
-        """Get the next question based on the response"""
+    def get_next_question(
+        self, response: str, answers: Optional[Mapping[str, Any]] = None
+    ) -> "Question":
+        """Get the next question based on the response
+
+        When the answer index is given, expressions over earlier answers are evaluated
+        first. The index must already include the answer to this question.
+        """
         if self.is_terminal:
             return None
 
+        if self.expression_next and answers is not None:
+            next_question_id = self._route_expressions(answers)
+            if next_question_id is not None:
+                return next_question_id
+
         if self.type in [QuestionType.MULTIPLE_CHOICE, QuestionType.RATING, QuestionType.BOOLEAN]:
-            for option in self.options:
-                if option.id == response:
-                    return option.next_question_id
-            return None
+            return self._route_option(response)
 
         if self.conditional_next and len(self.conditional_next) > 0:
-            for condition in self.conditional_next:
-                if (
-                    condition.operator == ConditionOperator.EQUALS
-                    and condition.value == self.get_validated_response(response)
-                ):
-                    return condition.next_question_id
-            return None
+            return self.routing.route(self.get_validated_response(response))
 
         return self.default_next_question_id
 
+    def _route_expressions(self, answers: Mapping[str, Any]) -> Optional[str]:
+        """Get the next question of the first expression matching the answers, if any"""
+        if self._expressions is None:
+            raise BusinessRuleError(f"Expressions of question {self.id} are not compiled")
+        for evaluate, next_question_id in self._expressions:
+            if evaluate(answers):
+                return next_question_id
+        return None
+
+    def _route_option(self, response: str) -> Optional[str]:
+        """Get the next question of the option a reply refers to"""
+        option = self.match_option(response)
+        if option is None:
+            return None
+        if option.next_question_id or not self.conditional_next:
+            return option.next_question_id
+        # Ratings without a next question of their own are routed by value
+        if self.type == QuestionType.RATING:
+            return self.routing.route(option.id)
+        return None
+
 
 class Survey(BaseModel):
     """Model for a survey"""
@@ -143,14 +280,58 @@ class Survey(BaseModel):
     description: str = Field(..., min_length=1, max_length=1000)
     first_question_id: str
     questions: Dict[str, Question]
+    session_lease_ttl: Optional[int] = Field(default=None, ge=1, le=3600)
+
+    _answer_types: Optional[expressions.AnswerTypes] = PrivateAttr(default=None)
+    _json: Optional[str] = PrivateAttr(default=None)
 
     model_config = ConfigDict(populate_by_name=True)
 
+    @field_serializer("questions", mode="wrap")
+    def serialize_questions(self, questions: Mapping[str, Question], handler: Any) -> Any:
+        """Serialize the questions, including those of catalog surveys loaded on demand"""
+        if not isinstance(questions, dict):
+            questions = dict(questions.items())
+        return handler(questions)
+
+    def to_json(self) -> str:
+        """Serialize the survey once, since surveys are not changed after they are loaded"""
+        if self._json is None:
+            self._json = self.model_dump_json(by_alias=True)
+        return self._json
+
+    def cache_json(self, data: str) -> None:
+        """Reuse the JSON of the survey as serialized by to_json, as stored in the catalog"""
+        self._json = data
+
+    def model_copy(
+        self, *, update: Optional[Dict[str, Any]] = None, deep: bool = False
+    ) -> "Survey":
+        """Copy the survey, serializing the copy again since it may differ"""
+        copy = super().model_copy(update=update, deep=deep)
+        copy._json = None
+        return copy
+
     def get_question(self, question_id: str) -> Question:
-        """Get a question by its id"""
+        """Get a question by its id, with its expressions compiled"""
         if question_id not in self.questions:
             raise BusinessRuleError(f"Question {question_id} not found")
-        return self.questions[question_id]
+        question = self.questions[question_id]
+        if question.expression_next and question._expressions is None:
+            question.compile_expressions(self.answer_types)
+        return question
+
+    @property
+    def answer_types(self) -> expressions.AnswerTypes:
+        """Answer type of each question, as seen by expressions, built once per survey"""
+        if self._answer_types is None:
+            self._answer_types = expressions.AnswerTypes(
+                {
+                    question_id: question.answer_type
+                    for question_id, question in self.questions.items()
+                }
+            )
+        return self._answer_types
 
     def validate_survey_flow(self) -> bool:
         """Validate the survey flow:
@@ -159,51 +340,55 @@ class Survey(BaseModel):
         2. No circular references
         3. All question types are valid
         4. Multiple choice questions have options
+        5. Conditional next questions are valid and do not overlap
+        6. Expressions are valid and type-check against the answers they reference
         """
         if self.first_question_id not in self.questions:
             raise BusinessRuleError("First question not found in questions list")
 
+        self._compile_questions()
+        self._check_circular(self.first_question_id, set(), set())
+        return True
+
+    def _compile_questions(self) -> None:
+        """Validate the questions and compile their conditions and expressions"""
         question_ids = set(self.questions.keys())
+        self._answer_types = None
 
         for _, question in self.questions.items():
             question.validate_options()
             question.validate_next_questions(question_ids)
+            question.compile_routing()
+            question.compile_expressions(self.answer_types)
 
-        # Check for circular references
-        visited = set()
-        path = set()
+    def _check_circular(self, question_id: str, visited: set[str], path: set[str]) -> None:
+        """Check for circular references in the questions reachable from a question"""
+        if question_id in path:
+            raise BusinessRuleError(f"Circular reference detected at question {question_id}")
+        if question_id in visited:
+            return
 
-        def check_circular(question_id: str):
-            if question_id in path:
-                raise BusinessRuleError(f"Circular reference detected at question {question_id}")
-            if question_id in visited:
-                return
+        visited.add(question_id)
+        path.add(question_id)
 
-            visited.add(question_id)
-            path.add(question_id)
+        question = self.questions[question_id]
+        if question.is_terminal:
+            path.remove(question_id)
+            return
 
-            question = self.questions[question_id]
-            if question.is_terminal:
-                path.remove(question_id)
-                return
+        # Check all possible next questions
+        if question.default_next_question_id:
+            self._check_circular(question.default_next_question_id, visited, path)
 
-            # Check all possible next questions
-            if question.default_next_question_id:
-                check_circular(question.default_next_question_id)
+        if question.options:
+            for option in question.options:
+                if option.next_question_id:
+                    self._check_circular(option.next_question_id, visited, path)
 
-            if question.options:
-                for option in question.options:
-                    if option.next_question_id:
-                        check_circular(option.next_question_id)
+        for condition in (question.conditional_next or []) + (question.expression_next or []):
+            self._check_circular(condition.next_question_id, visited, path)
 
-            if question.conditional_next:
-                for condition in question.conditional_next:
-                    check_circular(condition.next_question_id)
-
-            path.remove(question_id)
-
-        check_circular(self.first_question_id)
-        return True
+        path.remove(question_id)
 
 
 class SurveyUpdate(BaseModel):
@@ -212,20 +397,24 @@ class SurveyUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
     questions: Optional[Dict[str, Question]] = None
+    session_lease_ttl: Optional[int] = Field(default=None, ge=1, le=3600)
+
+    def merge_questions(self, current_survey: Survey) -> Optional[Survey]:
+        """Get a merged view of the survey if the update changes its questions"""
+        if self.questions is None:
+            return None
+        return Survey(
+            title=current_survey.title,
+            description=current_survey.description,
+            first_question_id=current_survey.first_question_id,
+            questions={**current_survey.questions, **self.questions},
+        )
 
     def validate_partial_update(self, current_survey: Survey) -> bool:
         """Validate that a partial update maintains survey integrity"""
-        if self.questions is not None:
-            # Create a merged view of the survey
-            merged_questions = {**current_survey.questions, **self.questions}
-            temp_survey = Survey(
-                title=current_survey.title,
-                description=current_survey.description,
-                first_question_id=current_survey.first_question_id,
-                questions=merged_questions,
-            )
-            # Validate the merged survey
-            return temp_survey.validate_survey_flow()
+        merged_survey = self.merge_questions(current_survey)
+        if merged_survey is not None:
+            return merged_survey.validate_survey_flow()
         return True
 
 
@@ -233,3 +422,47 @@ class SurveyDB(Survey):
     """Database model for surveys"""
 
     is_active: bool = True
+
+
+class SurveyDocument(BaseModel):
+    """Model for a survey serialized as JSON, with its entity tag"""
+
+    etag: str
+    content: bytes
+
+    @classmethod
+    def from_survey(cls, survey: Survey) -> "SurveyDocument":
+        """Serialize a survey, tagged with a hash of its content"""
+        content = survey.to_json().encode()
+        return cls(etag=f'"{hashlib.sha256(content).hexdigest()[:32]}"', content=content)
+
+
+class SurveyImportResult(BaseModel):
+    """Model for the import result of a single survey"""
+
+    line: int
+    status: ImportStatus
+    survey_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class SurveyImportReport(BaseModel):
+    """Model for the report of a bulk survey import"""
+
+    total: int = 0
+    created: int = 0
+    invalid: int = 0
+    failed: int = 0
+    results: List[SurveyImportResult] = []
+
+    def add(self, result: SurveyImportResult) -> None:
+        """Add the result of a survey to the report."""
+        self.total += 1
+        match result.status:
+            case ImportStatus.CREATED:
+                self.created += 1
+            case ImportStatus.INVALID:
+                self.invalid += 1
+            case ImportStatus.FAILED:
+                self.failed += 1
+        self.results.append(result)
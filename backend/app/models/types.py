@@ -18,3 +18,19 @@ class ConditionOperator(str, Enum):
     """Model for a condition operator"""
 
     EQUALS = "equals"
+    GREATER_THAN = "gt"
+    GREATER_THAN_OR_EQUALS = "gte"
+    LESS_THAN = "lt"
+    LESS_THAN_OR_EQUALS = "lte"
+    BETWEEN = "between"
+    IN = "in"
+    REGEX = "regex"
+    CONTAINS = "contains"
+
+
+class ImportStatus(str, Enum):
+    """Model for the status of an imported item"""
+
+    CREATED = "created"
+    INVALID = "invalid"
+    FAILED = "failed"
@@ -3,5 +3,15 @@
 from .surveys_repository import SurveyRepository
 from .responses_repository import ResponseRepository
 from .session_repository import SessionRepository
+from .rate_limit_repository import RateLimitRepository
+from .campaign_repository import CampaignRepository
+from .reminder_repository import ReminderRepository
 
-__all__ = ["SurveyRepository", "ResponseRepository", "SessionRepository"]
+__all__ = [
+    "SurveyRepository",
+    "ResponseRepository",
+    "SessionRepository",
+    "RateLimitRepository",
+    "CampaignRepository",
+    "ReminderRepository",
+]
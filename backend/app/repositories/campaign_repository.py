@@ -0,0 +1,18 @@
+"""Campaign repository"""
+
+from typing import Optional, Protocol
+
+from ..models.campaigns import CampaignProgress
+
+# Methods that can be retried safely
+IDEMPOTENT_METHODS = frozenset({"get_progress", "save_progress"})
+
+
+class CampaignRepository(Protocol):
+    """Interface for campaign repository."""
+
+    async def get_progress(self, campaign_id: str) -> Optional[CampaignProgress]:
+        """Get the last checkpoint of a campaign, if it was started."""
+
+    async def save_progress(self, progress: CampaignProgress) -> None:
+        """Checkpoint the progress of a campaign."""
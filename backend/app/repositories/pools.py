@@ -0,0 +1,28 @@
+"""Routing of repository calls to the connection pool of a client profile"""
+
+from typing import Any, Mapping
+
+
+class PoolRoutedRepository:
+    """Proxy sending each repository method to the repository of its client profile.
+
+    Repositories are built once per client profile, each on the database of its own
+    client. Methods listed in the routes go to the repository of their profile, and
+    every other method goes to the repository of the default profile.
+    """
+
+    def __init__(self, repositories: Mapping[str, Any], routes: Mapping[str, str], default: str):
+        missing = {default, *routes.values()} - set(repositories)
+        if missing:
+            raise ValueError(f"No repository for profiles {sorted(missing)}")
+        self._repositories = dict(repositories)
+        self._routes = dict(routes)
+        self._default = default
+
+    def profile_of(self, name: str) -> str:
+        """Client profile serving a method."""
+        return self._routes.get(name, self._default)
+
+    def __getattr__(self, name: str) -> Any:
+        """Get a method from the repository of the profile serving it."""
+        return getattr(self._repositories[self.profile_of(name)], name)
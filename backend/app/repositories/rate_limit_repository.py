@@ -0,0 +1,14 @@
+"""Rate limit repository"""
+
+from typing import Dict, Protocol, Tuple
+
+
+class RateLimitRepository(Protocol):
+    """Interface for rate limit repository."""
+
+    async def consume(self, buckets: Dict[str, Tuple[float, float]], cost: float = 1) -> float:
+        """Atomically take tokens from every bucket, given as key: (rate, capacity).
+
+        Tokens are only taken if all buckets have enough of them. Returns 0 when the
+        tokens were taken, otherwise the seconds to wait before retrying.
+        """
@@ -1,5 +1,13 @@
 """Repository for managing sessions in Redis."""
 
 from .session_redis_repository import RedisSessionRepository
+from .rate_limit_redis_repository import RedisRateLimitRepository
+from .campaign_redis_repository import RedisCampaignRepository
+from .reminder_redis_repository import RedisReminderRepository
 
-__all__ = ["RedisSessionRepository"]
+__all__ = [
+    "RedisSessionRepository",
+    "RedisRateLimitRepository",
+    "RedisCampaignRepository",
+    "RedisReminderRepository",
+]
@@ -0,0 +1,40 @@
+"""Campaign Redis repository"""
+
+from typing import Optional, Union
+
+from redis.asyncio import Redis, RedisCluster
+
+from ..campaign_repository import CampaignRepository
+from ...models.campaigns import CampaignProgress
+from ...core.config import get_settings
+
+settings = get_settings()
+
+CAMPAIGN_PREFIX = "campaign:"
+
+
+class RedisCampaignRepository(CampaignRepository):
+    """Redis implementation of campaign repository, storing each checkpoint as JSON."""
+
+    def __init__(
+        self,
+        redis_client: Union[Redis, RedisCluster],
+        progress_ttl: int = settings.CAMPAIGN_PROGRESS_TTL,
+    ):
+        self.redis = redis_client
+        self.progress_ttl = progress_ttl
+
+    async def get_progress(self, campaign_id: str) -> Optional[CampaignProgress]:
+        """Get the last checkpoint of a campaign, if it was started."""
+        data = await self.redis.get(f"{CAMPAIGN_PREFIX}{campaign_id}")
+        if data is None:
+            return None
+        return CampaignProgress.model_validate_json(data)
+
+    async def save_progress(self, progress: CampaignProgress) -> None:
+        """Checkpoint the progress of a campaign."""
+        await self.redis.setex(
+            f"{CAMPAIGN_PREFIX}{progress.campaign_id}",
+            self.progress_ttl,
+            progress.model_dump_json(),
+        )
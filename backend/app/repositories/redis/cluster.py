@@ -0,0 +1,19 @@
+"""Helpers for keys stored on a Redis Cluster"""
+
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+from redis.crc import key_slot
+
+
+def hash_tag(*parts: str) -> str:
+    """Build a hash tag, so that keys sharing it are stored on the same cluster slot."""
+    return "{" + ":".join(parts) + "}"
+
+
+def group_by_slot(keys: Iterable[str]) -> Dict[int, List[str]]:
+    """Group keys by cluster slot, keeping their order within each slot."""
+    groups = defaultdict(list)
+    for key in keys:
+        groups[key_slot(key.encode())].append(key)
+    return dict(groups)
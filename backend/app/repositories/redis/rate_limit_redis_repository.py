@@ -0,0 +1,88 @@
+"""Rate limit Redis repository"""
+
+import asyncio
+from typing import Dict, Tuple, Union
+
+from redis.asyncio import Redis, RedisCluster
+
+from .cluster import group_by_slot
+from ..rate_limit_repository import RateLimitRepository
+from ...core.config import get_settings
+
+settings = get_settings()
+
+# Constants for Redis keys
+RATE_LIMIT_PREFIX = "rate_limit:"
+
+# Token buckets stored as hashes of tokens and last refill time. Every bucket is checked
+# and refilled first, so tokens are only taken when all of them allow it.
+# KEYS: bucket keys. ARGV: cost, then the rate and capacity of each bucket.
+TOKEN_BUCKET_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local cost = tonumber(ARGV[1])
+local tokens = {}
+local retry_after = 0
+
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[2 * i])
+    local capacity = tonumber(ARGV[2 * i + 1])
+    local bucket = redis.call('HMGET', key, 'tokens', 'updated_at')
+    local available = tonumber(bucket[1]) or capacity
+    local updated_at = tonumber(bucket[2]) or now
+    available = math.min(capacity, available + math.max(0, now - updated_at) * rate)
+    if available < cost then
+        retry_after = math.max(retry_after, (cost - available) / rate)
+    end
+    tokens[i] = available
+end
+
+if retry_after == 0 then
+    for i, key in ipairs(KEYS) do
+        local rate = tonumber(ARGV[2 * i])
+        local capacity = tonumber(ARGV[2 * i + 1])
+        redis.call('HSET', key, 'tokens', tokens[i] - cost, 'updated_at', now)
+        redis.call('EXPIRE', key, math.ceil(capacity / rate) + 1)
+    end
+end
+
+return tostring(retry_after)
+"""
+
+
+class RedisRateLimitRepository(RateLimitRepository):
+    """Redis implementation of rate limit repository.
+
+    In cluster mode, buckets on different slots cannot be updated by the same script, so
+    the script runs once per slot, concurrently. Tokens are then only taken atomically
+    from the buckets of a slot: a bucket may be charged even if a bucket on another slot
+    rejects the message.
+    """
+
+    def __init__(
+        self,
+        redis_client: Union[Redis, RedisCluster],
+        cluster_mode: bool = settings.REDIS_CLUSTER_MODE,
+    ):
+        self.redis = redis_client
+        self.cluster_mode = cluster_mode
+        self._script = redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def _consume(self, buckets: Dict[str, Tuple[float, float]], cost: float) -> float:
+        args = [cost]
+        for rate, capacity in buckets.values():
+            args.extend((rate, capacity))
+        return float(await self._script(keys=list(buckets), args=args))
+
+    async def consume(self, buckets: Dict[str, Tuple[float, float]], cost: float = 1) -> float:
+        """Take tokens from every bucket, with a single script call per cluster slot."""
+        buckets = {f"{RATE_LIMIT_PREFIX}{key}": limits for key, limits in buckets.items()}
+        if not self.cluster_mode:
+            return await self._consume(buckets, cost)
+        retry_after = await asyncio.gather(
+            *(
+                self._consume({key: buckets[key] for key in keys}, cost)
+                for keys in group_by_slot(buckets).values()
+            )
+        )
+        return max(retry_after)
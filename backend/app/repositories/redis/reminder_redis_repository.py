@@ -0,0 +1,98 @@
+"""Reminder Redis repository"""
+
+import asyncio
+import json
+import zlib
+from typing import List, Union
+
+from redis.asyncio import Redis, RedisCluster
+
+from .cluster import hash_tag
+from ..reminder_repository import ReminderRepository
+from ...models.sessions import Reminder, SessionId
+from ...core.config import get_settings
+
+settings = get_settings()
+
+# Constants for Redis keys
+REMINDERS_PREFIX = "reminders:"
+
+# Pops the reminders due by a time from a shard. ZRANGEBYSCORE from -inf returns the
+# lowest ranks of the set, so they are removed by rank without listing them again.
+# KEYS: shard key. ARGV: time, maximum number of reminders.
+POP_DUE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'WITHSCORES', 'LIMIT', 0, ARGV[2])
+if #due > 0 then
+    redis.call('ZREMRANGEBYRANK', KEYS[1], 0, #due / 2 - 1)
+end
+return due
+"""
+
+
+class RedisReminderRepository(ReminderRepository):
+    """Redis implementation of reminder repository.
+
+    Reminders are members of sorted sets scored by due time, so scheduling, cancelling
+    and popping each cost O(log n). Sessions are spread over shards by a hash of their
+    id, each shard a set of its own, on its own cluster slot, so that no single key
+    holds every pending reminder and workers pop the shards concurrently.
+    """
+
+    def __init__(
+        self,
+        redis_client: Union[Redis, RedisCluster],
+        shards: int = settings.REMINDER_SHARDS,
+    ):
+        self.redis = redis_client
+        self.shards = shards
+        self._pop_due = redis_client.register_script(POP_DUE_SCRIPT)
+
+    def _shard_key(self, shard: int) -> str:
+        return f"{REMINDERS_PREFIX}{hash_tag(str(shard))}"
+
+    def _member(self, session_id: SessionId) -> str:
+        return json.dumps([session_id.survey_id, session_id.user_id])
+
+    def _key(self, member: str) -> str:
+        return self._shard_key(zlib.crc32(member.encode()) % self.shards)
+
+    async def schedule(self, session_id: SessionId, due_at: float) -> None:
+        """Schedule the reminder of a session, replacing any reminder already scheduled."""
+        member = self._member(session_id)
+        await self.redis.zadd(self._key(member), {member: due_at})
+
+    async def cancel(self, session_id: SessionId) -> None:
+        """Cancel the reminder of a session, if any."""
+        member = self._member(session_id)
+        await self.redis.zrem(self._key(member), member)
+
+    async def _pop_shard(self, shard: int, now: float, limit: int) -> List[Reminder]:
+        due = await self._pop_due(keys=[self._shard_key(shard)], args=[now, limit])
+        reminders = []
+        for member, score in zip(due[::2], due[1::2]):
+            survey_id, user_id = json.loads(member)
+            reminders.append(
+                Reminder(
+                    session_id=SessionId(user_id=user_id, survey_id=survey_id),
+                    due_at=float(score),
+                )
+            )
+        return reminders
+
+    async def pop_due(self, now: float, limit: int) -> List[Reminder]:
+        """Remove and return reminders due by now, at most limit from each shard.
+
+        Each shard is popped atomically by a script, so concurrent workers never get the
+        same reminder.
+        """
+        shards = await asyncio.gather(
+            *(self._pop_shard(shard, now, limit) for shard in range(self.shards))
+        )
+        return [reminder for reminders in shards for reminder in reminders]
+
+    async def count_pending(self) -> int:
+        """Count the reminders scheduled."""
+        counts = await asyncio.gather(
+            *(self.redis.zcard(self._shard_key(shard)) for shard in range(self.shards))
+        )
+        return sum(counts)
@@ -0,0 +1,102 @@
+"""Encoding of the sessions stored in Redis"""
+
+import hashlib
+import json
+
+from ...core.cache import TTLCache
+from ...core.logging import get_logger
+from ...core.metrics import get_metrics
+from ...models.responses import SurveyResponse
+from ...models.sessions import Session, SessionId
+from ...models.surveys import Survey
+
+logger = get_logger(__name__)
+metrics = get_metrics()
+
+# Sessions are stored as a header line followed by the survey JSON and the JSON of the
+# rest of the session: "s1:<survey digest>:<rest digest>:<survey length>\n<survey><rest>"
+ENVELOPE_PREFIX = "s1:"
+
+
+def _digest(data: str) -> str:
+    return hashlib.blake2b(data.encode(), digest_size=16).hexdigest()
+
+
+class SessionCodec:
+    """Encodes sessions with checksums, so that trusted loads can skip validation.
+
+    A session read back with matching checksums was written by this code, so its survey
+    is taken from a cache of validated surveys keyed by digest, which every session of
+    the survey shares, and the session itself is constructed without validation. The
+    response is still validated, since JSON does not keep its dates. Sessions whose
+    checksums do not match, or stored as plain JSON, are fully validated.
+    """
+
+    def __init__(self, surveys: TTLCache[Survey], trusted: bool = True):
+        self.surveys = surveys
+        self.trusted = trusted
+
+    def encode(self, session: Session) -> str:
+        """Encode a session, caching its survey by digest.
+
+        The survey is serialized once per survey object, see Survey.to_json.
+        """
+        survey_json = ""
+        if session.survey is not None:
+            survey_json = session.survey.to_json()
+        rest_json = json.dumps(
+            session.model_dump(mode="json", exclude_none=True, exclude={"survey"})
+        )
+        survey_digest = _digest(survey_json)
+        if session.survey is not None:
+            self.surveys.set(survey_digest, session.survey)
+        header = f"{ENVELOPE_PREFIX}{survey_digest}:{_digest(rest_json)}:{len(survey_json)}"
+        return f"{header}\n{survey_json}{rest_json}"
+
+    def decode(self, data: str) -> Session:
+        """Decode a session, trusting it when its checksums match.
+
+        Raises an error if the session cannot be decoded.
+        """
+        if not data.startswith(ENVELOPE_PREFIX):
+            return Session.model_validate(json.loads(data))
+
+        header, _, payload = data.partition("\n")
+        _, survey_digest, rest_digest, survey_length = header.split(":")
+        survey_json, rest_json = payload[: int(survey_length)], payload[int(survey_length) :]
+
+        if self.trusted:
+            if _digest(survey_json) == survey_digest and _digest(rest_json) == rest_digest:
+                try:
+                    session = self._construct(survey_digest, survey_json, rest_json)
+                    metrics.counter("sessions.decode.trusted").inc()
+                    return session
+                except Exception as e:
+                    logger.warning("Trusted load of a session failed: %s", str(e))
+            else:
+                metrics.counter("sessions.decode.checksum_mismatches").inc()
+                logger.warning("Session checksum mismatch, validating it")
+
+        metrics.counter("sessions.decode.validated").inc()
+        fields = json.loads(rest_json)
+        if survey_json:
+            fields["survey"] = json.loads(survey_json)
+        return Session.model_validate(fields)
+
+    def _construct(self, survey_digest: str, survey_json: str, rest_json: str) -> Session:
+        """Build a session from checked data, validating only what is not cached."""
+        survey = None
+        if survey_json:
+            survey = self.surveys.get(survey_digest)
+            if survey is None:
+                survey = Survey.model_validate_json(survey_json)
+                self.surveys.set(survey_digest, survey)
+        fields = json.loads(rest_json)
+        response = fields.get("response")
+        return Session.model_construct(
+            id=SessionId.model_construct(**fields["id"]),
+            survey=survey,
+            response=SurveyResponse.model_validate(response) if response is not None else None,
+            answer_index=fields.get("answer_index", {}),
+            processed_messages=fields.get("processed_messages", {}),
+        )
@@ -1,46 +1,95 @@
 """Session Redis repository"""
 
-import json
-from typing import Optional
+from typing import Dict, Optional, Tuple, Union
 
-from redis.asyncio import Redis
+from redis.asyncio import Redis, RedisCluster
 
+from .cluster import hash_tag
+from .session_codec import SessionCodec
 from ..session_repository import SessionRepository
 from ...models.sessions import SessionId, Session
+from ...core.cache import TTLCache
+from ...core.config import get_settings
 from ...core.logging import get_logger
 
 logger = get_logger(__name__)
+settings = get_settings()
 
 # Constants for Redis keys
 ACTIVE_SESSION_PREFIX = "active_session:"
 INACTIVE_SESSION_PREFIX = "inactive_session:"
-SESSION_TTL = 3600  # 1 hour in seconds
-UNACTIVE_SESSION_TTL = 600  # 10 minute in seconds
+# Held by the active key of a claimed session until its first copy is stored
+CLAIMED_PLACEHOLDER = "claimed"
+
+# Returns {1, active} if the session is active, otherwise moves the inactive copy, if any,
+# to the active key with the lease TTL and returns {0, inactive}. Without any copy, the
+# active key is claimed with a placeholder, so a concurrent claim sees the session active
+CLAIM_SESSION_SCRIPT = """
+local active = redis.call('GET', KEYS[1])
+if active then
+    return {1, active}
+end
+local inactive = redis.call('GET', KEYS[2])
+if not inactive then
+    redis.call('SET', KEYS[1], ARGV[2], 'NX', 'EX', ARGV[1])
+    return {0}
+end
+redis.call('SET', KEYS[1], inactive, 'EX', ARGV[1])
+redis.call('DEL', KEYS[2])
+return {0, inactive}
+"""
 
 
 class RedisSessionRepository(SessionRepository):
-    """Redis implementation of session repository."""
-
-    def __init__(self, redis_client: Redis):
+    """Redis implementation of session repository.
+
+    In cluster mode, the keys of a session share a hash tag, so they are stored on the
+    same slot and can be claimed together by a script. Sessions are encoded with
+    checksums by the codec, see SessionCodec.
+    """
+
+    def __init__(
+        self,
+        redis_client: Union[Redis, RedisCluster],
+        session_ttl: int = settings.SESSION_LEASE_TTL,
+        unactive_session_ttl: int = settings.UNACTIVE_SESSION_TTL,
+        cluster_mode: bool = settings.REDIS_CLUSTER_MODE,
+        codec: Optional[SessionCodec] = None,
+    ):
         self.redis = redis_client
+        self.session_ttl = session_ttl
+        self.unactive_session_ttl = unactive_session_ttl
+        self.cluster_mode = cluster_mode
+        self.codec = codec or SessionCodec(
+            TTLCache(settings.SESSION_SURVEY_CACHE_SIZE, float("inf")),
+            settings.SESSION_TRUSTED_LOAD,
+        )
+        self._claim_session = redis_client.register_script(CLAIM_SESSION_SCRIPT)
+
+    def _get_session_key(self, session_id: SessionId) -> str:
+        """Get the part of the Redis keys identifying a session."""
+        if self.cluster_mode:
+            return hash_tag(session_id.user_id, session_id.survey_id)
+        return f"{session_id.user_id}:{session_id.survey_id}"
 
     def _get_active_key(self, session_id: SessionId) -> str:
         """Get Redis key for active session."""
-        return f"{ACTIVE_SESSION_PREFIX}{session_id.user_id}:{session_id.survey_id}"
+        return f"{ACTIVE_SESSION_PREFIX}{self._get_session_key(session_id)}"
 
     def _get_inactive_key(self, session_id: SessionId) -> str:
         """Get Redis key for inactive session."""
-        return f"{INACTIVE_SESSION_PREFIX}{session_id.user_id}:{session_id.survey_id}"
+        return f"{INACTIVE_SESSION_PREFIX}{self._get_session_key(session_id)}"
 
     def _serialize_session(self, session: Session) -> str:
-        """Serialize session to JSON string."""
-        return json.dumps(session.model_dump(mode="json", exclude_none=True))
+        """Serialize session to a string."""
+        return self.codec.encode(session)
 
     def _deserialize_session(self, session_data: str) -> Optional[Session]:
-        """Deserialize session from JSON string."""
+        """Deserialize session from a string, the claim placeholder having no session."""
+        if session_data == CLAIMED_PLACEHOLDER:
+            return None
         try:
-            data = json.loads(session_data)
-            return Session.model_validate(data)
+            return self.codec.decode(session_data)
         except Exception as e:
             logger.error("Failed to deserialize session: %s", str(e), exc_info=True)
             return None
@@ -53,6 +102,19 @@ class RedisSessionRepository(SessionRepository):
             return self._deserialize_session(session_data)
         return None
 
+    async def claim_session(
+        self, session_id: SessionId, ttl: Optional[int] = None
+    ) -> Tuple[bool, Optional[Session]]:
+        """Claim the lease of a session with a single script call."""
+        result = await self._claim_session(
+            keys=[self._get_active_key(session_id), self._get_inactive_key(session_id)],
+            args=[ttl or self.session_ttl, CLAIMED_PLACEHOLDER],
+        )
+        was_active = bool(result[0])
+        if len(result) > 1 and result[1]:
+            return was_active, self._deserialize_session(result[1])
+        return was_active, None
+
     async def get_unactive_session(self, session_id: SessionId) -> Optional[Session]:
         """Get an inactive session by ID."""
         key = self._get_inactive_key(session_id)
@@ -66,11 +128,26 @@ class RedisSessionRepository(SessionRepository):
         key = self._get_inactive_key(session_id)
         await self.redis.delete(key)
 
-    async def set_active_session(self, session_id: SessionId, session: Session) -> None:
+    async def set_active_session(
+        self, session_id: SessionId, session: Session, ttl: Optional[int] = None
+    ) -> None:
         """Set a session as active."""
         key = self._get_active_key(session_id)
         session_data = self._serialize_session(session)
-        await self.redis.setex(key, SESSION_TTL, session_data)
+        await self.redis.setex(key, ttl or self.session_ttl, session_data)
+
+    async def renew_active_sessions(self, leases: Dict[SessionId, int]) -> int:
+        """Renew the TTL of several active sessions in a single pipeline.
+
+        On a cluster, the pipeline is split by the client into one batch per node.
+        """
+        if not leases:
+            return 0
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for session_id, ttl in leases.items():
+                pipe.expire(self._get_active_key(session_id), ttl)
+            results = await pipe.execute()
+        return sum(1 for renewed in results if renewed)
 
     async def delete_active_session(self, session_id: SessionId) -> None:
         """Delete an active session."""
@@ -81,4 +158,4 @@ class RedisSessionRepository(SessionRepository):
         """Set a session as unactive."""
         key = self._get_inactive_key(session_id)
         session_data = self._serialize_session(session)
-        await self.redis.setex(key, UNACTIVE_SESSION_TTL, session_data)
+        await self.redis.setex(key, self.unactive_session_ttl, session_data)
@@ -0,0 +1,24 @@
+"""Reminder repository"""
+
+from typing import List, Protocol
+
+from ..models.sessions import Reminder, SessionId
+
+# Methods that can be retried safely
+IDEMPOTENT_METHODS = frozenset({"schedule", "cancel", "count_pending"})
+
+
+class ReminderRepository(Protocol):
+    """Interface for reminder repository."""
+
+    async def schedule(self, session_id: SessionId, due_at: float) -> None:
+        """Schedule the reminder of a session, replacing any reminder already scheduled."""
+
+    async def cancel(self, session_id: SessionId) -> None:
+        """Cancel the reminder of a session, if any."""
+
+    async def pop_due(self, now: float, limit: int) -> List[Reminder]:
+        """Remove and return reminders due by now, each returned to a single caller."""
+
+    async def count_pending(self) -> int:
+        """Count the reminders scheduled."""
@@ -1,8 +1,179 @@
 """Responses repository"""
 
-from typing import List, Optional, Protocol
+import base64
+import binascii
+import json
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Protocol, Tuple
 
-from ..models.responses import SurveyResponse, QuestionResponse
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from ..models.responses import (
+    SurveyResponse,
+    QuestionResponse,
+    ResponseQuery,
+    processed_message_key,
+)
+from ..core.constants import QUESTION_ID_PATTERN, UTC
+
+# Methods that can be retried safely, since answers are set by question id and bulk
+# inserts skip the users that already have a response
+IDEMPOTENT_METHODS = frozenset(
+    {
+        "insert_many",
+        "find_by_survey_and_user",
+        "find_by_survey_and_users",
+        "add_question_response",
+        "add_question_responses",
+        "find_by_id",
+        "find_by_survey",
+        "find_page",
+        "most_active_surveys",
+    }
+)
+
+# Scans served by the reporting connection pool, away from chat traffic
+REPORTING_METHODS = frozenset({"find_by_survey", "find_page", "most_active_surveys"})
+
+# Unique index of the responses, one per survey and user. It is required: bulk inserts
+# rely on it to skip the users that already have a response, so that campaigns run again
+# do not create duplicates. It is created with the others by app.cli.ensure_indexes.
+RESPONSE_USER_INDEX = IndexModel(
+    [("survey_id", ASCENDING), ("user_id", ASCENDING)], unique=True, name="survey_user"
+)
+
+# Response queries are sorted by last update then id, newest first, which pages resume
+# from as a keyset
+RESPONSE_QUERY_SORT = [("last_updated_at", DESCENDING), ("_id", DESCENDING)]
+
+# Indexes of the response queries, with equality filters first and the sort after them,
+# so that pages are read in order without sorting. They only cover the survey, completion
+# and sort fields: date ranges and answers are filtered on the documents once fetched.
+RESPONSE_QUERY_INDEXES = [
+    IndexModel(
+        [("survey_id", ASCENDING), *RESPONSE_QUERY_SORT],
+        name="survey_updated",
+    ),
+    IndexModel(
+        [("survey_id", ASCENDING), ("is_complete", ASCENDING), *RESPONSE_QUERY_SORT],
+        name="survey_complete_updated",
+    ),
+]
+
+# Every index of the responses, created by app.cli.ensure_indexes
+RESPONSE_INDEXES = [RESPONSE_USER_INDEX, *RESPONSE_QUERY_INDEXES]
+
+
+def _answer_field(question_id: str) -> str:
+    """Get the field of the answer to a question, rejecting ids MongoDB would misread.
+
+    Raises a ValueError if the question id holds a dot or starts with a dollar sign.
+    """
+    if not re.match(QUESTION_ID_PATTERN, question_id):
+        raise ValueError(f"Invalid question id: {question_id!r}")
+    return f"answers.{question_id}"
+
+
+def build_answers_update(
+    question_responses: List[QuestionResponse],
+    next_question_id: Optional[str] = None,
+    is_complete: bool = False,
+    message_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Build the MongoDB update that stores answers keyed by question id.
+
+    Answers are set by question id, so retried or re-answered questions replace their
+    previous answer, and the answer path only gains the question ids it does not have:
+    it holds first visits only, not the questions answered again. The client message
+    answered, if any, is recorded by the same update, see build_answers_filter.
+
+    Raises a ValueError if a question id is not a valid field name.
+    """
+    now = datetime.now(UTC)
+    question_ids = list(dict.fromkeys(qr.question_id for qr in question_responses))
+    fields = {
+        _answer_field(question_response.question_id): question_response.model_dump()
+        for question_response in question_responses
+    }
+    fields.update(
+        current_question_id=next_question_id, is_complete=is_complete, last_updated_at=now
+    )
+    if is_complete:
+        fields["completed_at"] = now
+    if message_id is not None:
+        fields[f"processed_messages.{processed_message_key(message_id)}"] = next_question_id
+    return {
+        "$set": fields,
+        "$addToSet": {"answer_path": {"$each": question_ids}},
+    }
+
+
+def build_answers_filter(response_id: Any, message_id: Optional[str] = None) -> Dict[str, Any]:
+    """Build the MongoDB filter of an answers update to a response.
+
+    With a client message id, the filter only matches while the message is not recorded,
+    so a message is answered once even if the session did not record it.
+    """
+    conditions = {"_id": response_id}
+    if message_id is not None:
+        conditions[f"processed_messages.{processed_message_key(message_id)}"] = {"$exists": False}
+    return conditions
+
+
+def encode_response_cursor(response: SurveyResponse) -> str:
+    """Encode the position of a response in a query, for the next page to resume after it."""
+    position = json.dumps([response.last_updated_at.isoformat(), response.id])
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+def decode_response_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode the last update and id of the response a page resumes after.
+
+    Raises a ValueError if the cursor is invalid.
+    """
+    try:
+        last_updated_at, response_id = json.loads(base64.urlsafe_b64decode(cursor))
+        return datetime.fromisoformat(last_updated_at), str(response_id)
+    except (binascii.Error, TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _date_range(start: Optional[datetime], end: Optional[datetime]) -> Dict[str, datetime]:
+    bounds = {}
+    if start is not None:
+        bounds["$gte"] = start
+    if end is not None:
+        bounds["$lt"] = end
+    return bounds
+
+
+def build_response_query(query: ResponseQuery) -> Dict[str, Any]:
+    """Build the MongoDB filter of a response query, to sort with RESPONSE_QUERY_SORT.
+
+    Raises a ValueError if the cursor or the question id is invalid.
+    """
+    conditions: Dict[str, Any] = {"survey_id": query.survey_id}
+    if query.is_complete is not None:
+        conditions["is_complete"] = query.is_complete
+    started_at = _date_range(query.started_from, query.started_until)
+    if started_at:
+        conditions["started_at"] = started_at
+    completed_at = _date_range(query.completed_from, query.completed_until)
+    if completed_at:
+        conditions["completed_at"] = completed_at
+    if query.question_id is not None:
+        conditions[f"{_answer_field(query.question_id)}.response_value"] = query.answer
+    if query.cursor is not None:
+        last_updated_at, response_id = decode_response_cursor(query.cursor)
+        if ObjectId.is_valid(response_id):
+            response_id = ObjectId(response_id)
+        conditions["$or"] = [
+            {"last_updated_at": {"$lt": last_updated_at}},
+            {"last_updated_at": last_updated_at, "_id": {"$lt": response_id}},
+        ]
+    return conditions
 
 
 class ResponseRepository(Protocol):
@@ -11,20 +182,52 @@ class ResponseRepository(Protocol):
     async def insert(self, response: SurveyResponse) -> SurveyResponse:
         """Insert a new survey response."""
 
+    async def insert_many(self, responses: List[SurveyResponse]) -> List[SurveyResponse]:
+        """Insert several responses in an unordered batch, returning those inserted.
+
+        Responses of users that already have one for the survey are skipped, relying on
+        the unique index on survey_id and user_id.
+        """
+
     async def find_by_survey_and_user(self, survey_id: str, user_id: str) -> List[SurveyResponse]:
         """Find all responses for a survey and user."""
 
+    async def find_by_survey_and_users(
+        self, survey_id: str, user_ids: List[str]
+    ) -> List[SurveyResponse]:
+        """Find the responses of several users to a survey, with RESPONSE_USER_INDEX."""
+
     async def add_question_response(
         self,
         response_id: str,
         question_response: QuestionResponse,
         next_question_id: Optional[str] = None,
         is_complete: bool = False,
+        message_id: Optional[str] = None,
     ) -> Optional[SurveyResponse]:
-        """Add a new question response to a survey response."""
+        """Set the answer to a question of a survey response, see build_answers_update.
+
+        Updates the response matching build_answers_filter, and returns None when there
+        is none, as when the client message was already answered.
+        """
+
+    async def add_question_responses(
+        self,
+        response_id: str,
+        question_responses: List[QuestionResponse],
+        next_question_id: Optional[str] = None,
+        is_complete: bool = False,
+    ) -> Optional[SurveyResponse]:
+        """Set the answers to several questions in a single update, see build_answers_update."""
 
     async def find_by_id(self, response_id: str) -> Optional[SurveyResponse]:
         """Find a survey response by its id."""
 
     async def find_by_survey(self, survey_id: str) -> List[SurveyResponse]:
         """Find all survey responses for a survey."""
+
+    async def find_page(self, query: ResponseQuery, limit: int) -> List[SurveyResponse]:
+        """Find up to limit responses matching a query, see build_response_query."""
+
+    async def most_active_surveys(self, since: datetime, limit: int) -> List[str]:
+        """Ids of the surveys with the most responses updated since a time, busiest first."""
@@ -1,9 +1,22 @@
 """Session repository"""
 
-from typing import Optional, Protocol
+from typing import Dict, Optional, Protocol, Tuple
 
 from ..models.sessions import SessionId, Session
 
+# Methods that can be retried safely. Claims are not, since they move the inactive copy.
+IDEMPOTENT_METHODS = frozenset(
+    {
+        "get_active_session",
+        "get_unactive_session",
+        "delete_unactive_session",
+        "set_active_session",
+        "renew_active_sessions",
+        "set_unactive_session",
+        "delete_active_session",
+    }
+)
+
 
 class SessionRepository(Protocol):
     """Interface for session repository."""
@@ -11,14 +24,29 @@ class SessionRepository(Protocol):
     async def get_active_session(self, session_id: SessionId) -> Optional[Session]:
         """Get an active session by ID."""
 
+    async def claim_session(
+        self, session_id: SessionId, ttl: Optional[int] = None
+    ) -> Tuple[bool, Optional[Session]]:
+        """Claim the lease of a session in a single round trip.
+
+        Returns whether the session was already active, with its active copy. Otherwise the
+        inactive copy, if any, is made active with the given lease TTL and returned. A
+        session without any copy is claimed too, and has no active copy until it is set.
+        """
+
     async def get_unactive_session(self, session_id: SessionId) -> Optional[Session]:
         """Get an inactive session by ID."""
 
     async def delete_unactive_session(self, session_id: SessionId) -> None:
         """Delete an inactive session."""
 
-    async def set_active_session(self, session_id: SessionId, session: Session) -> None:
-        """Set a session as active."""
+    async def set_active_session(
+        self, session_id: SessionId, session: Session, ttl: Optional[int] = None
+    ) -> None:
+        """Set a session as active, optionally overriding its lease TTL."""
+
+    async def renew_active_sessions(self, leases: Dict[SessionId, int]) -> int:
+        """Renew the lease of several active sessions, returning how many still exist."""
 
     async def set_unactive_session(self, session_id: SessionId, session: Session) -> None:
         """Set a session as unactive."""
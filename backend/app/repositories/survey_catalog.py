@@ -0,0 +1,186 @@
+"""Survey catalog, a memory-mapped file of compiled surveys shared by the workers of a node"""
+
+import json
+import mmap
+import os
+import struct
+import time
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from ..core.logging import get_logger
+from ..models.surveys import Question, Survey, SurveyDocument
+
+logger = get_logger(__name__)
+
+# File layout: magic, header with the build time and the index length, JSON index of
+# the offsets of every blob, then the blobs: the metadata of each survey without its
+# questions, its JSON document and the JSON of each of its questions
+MAGIC = b"SURVEYCATALOG1\n"
+HEADER = struct.Struct("<dI")
+
+Span = Tuple[int, int]
+
+
+def write_survey_catalog(
+    path: str, surveys: Iterable[Survey], built_at: Optional[float] = None
+) -> int:
+    """Write the catalog of some surveys, atomically replacing the previous one.
+
+    The build time must be taken before the surveys are read, so that surveys changed
+    while they are read stay invalidated, see SurveyCatalog.invalidate. It defaults to
+    the current time. Returns the number of surveys written.
+    """
+    blobs = bytearray()
+    index: Dict[str, Any] = {}
+
+    def add(blob: bytes) -> Span:
+        blobs.extend(blob)
+        return len(blobs) - len(blob), len(blob)
+
+    for survey in surveys:
+        document = SurveyDocument.from_survey(survey)
+        meta = survey.model_dump(mode="json", exclude={"questions"}, exclude_none=True)
+        index[survey.id] = {
+            "meta": add(json.dumps(meta).encode()),
+            "document": add(document.content),
+            "etag": document.etag,
+            "questions": {
+                question_id: add(question.model_dump_json().encode())
+                for question_id, question in survey.questions.items()
+            },
+        }
+
+    index_blob = json.dumps(index).encode()
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(MAGIC)
+        file.write(HEADER.pack(time.time() if built_at is None else built_at, len(index_blob)))
+        file.write(index_blob)
+        file.write(blobs)
+        file.flush()
+        os.fsync(file.fileno())
+    # Readers holding the previous file keep their mapping until they reopen the new one
+    os.replace(temp_path, path)
+    return len(index)
+
+
+class CatalogQuestions(Mapping):
+    """Questions of a catalog survey, validated from the mapped file on first access."""
+
+    def __init__(self, buffer: mmap.mmap, base: int, spans: Dict[str, Span]):
+        self._buffer = buffer
+        self._base = base
+        self._spans = spans
+        self._questions: Dict[str, Question] = {}
+
+    def __getitem__(self, question_id: str) -> Question:
+        """Get a question, validating it on first access."""
+        question = self._questions.get(question_id)
+        if question is None:
+            offset, length = self._spans[question_id]
+            start = self._base + offset
+            question = Question.model_validate_json(self._buffer[start : start + length])
+            self._questions[question_id] = question
+        return question
+
+    def __contains__(self, question_id: object) -> bool:
+        """Check if the survey has a question, without loading it."""
+        return question_id in self._spans
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the question ids."""
+        return iter(self._spans)
+
+    def __len__(self) -> int:
+        """Get the number of questions."""
+        return len(self._spans)
+
+
+class SurveyCatalog:
+    """Reader of the survey catalog of the node.
+
+    The file is mapped read-only, so the pages of the catalog are shared by every worker.
+    Surveys are built from their metadata with questions validated on demand, and are
+    reused until the file is replaced, which is checked at most every check_interval
+    seconds. Surveys changed by this worker are skipped until a newer catalog is built.
+    """
+
+    def __init__(self, path: str, check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.built_at = 0.0
+        self._buffer: Optional[mmap.mmap] = None
+        self._base = 0
+        self._index: Dict[str, Any] = {}
+        self._surveys: Dict[str, Survey] = {}
+        self._invalidated: Dict[str, float] = {}
+        self._file_id: Optional[Tuple[int, int]] = None
+        self._checked_at = float("-inf")
+
+    def _open(self) -> None:
+        """Map the current catalog file, if it was replaced since it was last mapped."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        file_id = (stat.st_ino, stat.st_mtime_ns)
+        if file_id == self._file_id:
+            return
+
+        # Invalid files are not checked again until they are replaced
+        self._file_id = file_id
+        with open(self.path, "rb") as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if buffer[: len(MAGIC)] != MAGIC:
+            buffer.close()
+            logger.warning("Ignoring invalid survey catalog %s", self.path)
+            return
+        built_at, index_length = HEADER.unpack_from(buffer, len(MAGIC))
+        index_start = len(MAGIC) + HEADER.size
+        self._index = json.loads(buffer[index_start : index_start + index_length])
+        self._base = index_start + index_length
+        self._buffer = buffer
+        self._surveys = {}
+        self.built_at = built_at
+        logger.info("Mapped survey catalog of %d surveys", len(self._index))
+
+    def _entry(self, survey_id: str) -> Optional[Dict[str, Any]]:
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            self._open()
+        if self.built_at <= self._invalidated.get(survey_id, 0.0):
+            return None
+        return self._index.get(survey_id)
+
+    def _read(self, span: Span) -> bytes:
+        offset, length = span
+        return self._buffer[self._base + offset : self._base + offset + length]
+
+    def get_survey(self, survey_id: str) -> Optional[Survey]:
+        """Get a survey from the catalog, or None if it is not there."""
+        entry = self._entry(survey_id)
+        if entry is None:
+            return None
+        survey = self._surveys.get(survey_id)
+        if survey is None:
+            meta = json.loads(self._read(entry["meta"]))
+            questions = CatalogQuestions(self._buffer, self._base, entry["questions"])
+            # The catalog is written from validated surveys, whose document is their JSON
+            survey = Survey.model_construct(**meta, questions=questions)
+            survey.cache_json(self._read(entry["document"]).decode())
+            self._surveys[survey_id] = survey
+        return survey
+
+    def get_document(self, survey_id: str) -> Optional[SurveyDocument]:
+        """Get the JSON document of a survey from the catalog, or None if it is not there."""
+        entry = self._entry(survey_id)
+        if entry is None:
+            return None
+        return SurveyDocument(etag=entry["etag"], content=self._read(entry["document"]))
+
+    def invalidate(self, survey_id: str) -> None:
+        """Skip a survey changed by this worker until the catalog is rebuilt."""
+        self._invalidated[survey_id] = time.time()
+        self._surveys.pop(survey_id, None)
@@ -4,6 +4,12 @@ from typing import List, Optional, Protocol
 
 from ..models.surveys import SurveyDB
 
+# Methods that can be retried safely
+IDEMPOTENT_METHODS = frozenset({"find_by_id", "find_active", "update", "soft_delete"})
+
+# Scans served by the reporting connection pool, away from chat traffic
+REPORTING_METHODS = frozenset({"find_active"})
+
 
 class SurveyRepository(Protocol):
     """Interface for survey repository."""
@@ -11,6 +17,9 @@ class SurveyRepository(Protocol):
     async def insert(self, survey: SurveyDB) -> SurveyDB:
         """Insert a new survey."""
 
+    async def insert_many(self, surveys: List[SurveyDB]) -> List[SurveyDB]:
+        """Insert several surveys in a single batched write, returning them in order."""
+
     async def find_by_id(self, survey_id: str) -> Optional[SurveyDB]:
         """Find a survey by ID."""
 
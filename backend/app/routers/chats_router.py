@@ -1,14 +1,57 @@
 """Chats router"""
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, WebSocketException, status
+import asyncio
+from typing import Any, Optional, Tuple
+
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    WebSocket,
+    WebSocketDisconnect,
+    WebSocketException,
+    status,
+)
 
-from ..dependencies.services import ChatsServiceDep
+from ..dependencies.services import ChatsServiceDep, GatewayServiceDep, RateLimitServiceDep
+from ..models.messages import (
+    InboundMessageBatch,
+    InboundReply,
+    OutboundMessage,
+    OutboundMessageBatch,
+)
+from ..models.responses import AnswerBatch, AnswerBatchResult
 from ..models.sessions import SessionId
 from ..models.surveys import Question
-from ..models.types import QuestionType
-from ..core.exceptions import BusinessRuleError
+from ..services.chats_service import ChatsService
+from ..services.rate_limit_service import RateLimitService
+from ..core.exceptions import (
+    BusinessRuleError,
+    ResourceConflictError,
+    ResourceNotFoundError,
+    ServiceError,
+)
+from ..core.common_responses import (
+    combine_responses,
+    conflict_response,
+    not_found_response,
+    server_error_responses,
+    validation_responses,
+)
+from ..core.config import get_settings
+from ..core.metrics import get_metrics
+from ..core.resilience import deadline
 from ..core.logging import get_logger
-
+from ..core.chat_protocols import (
+    ERROR,
+    GOODBYE,
+    IDLE,
+    MESSAGES,
+    QUESTION,
+    UNAVAILABLE,
+    WELCOME,
+    format_question,
+    select_protocol,
+)
 
 chats_router = APIRouter(
     prefix="/respond",
@@ -17,39 +60,46 @@ chats_router = APIRouter(
 
 
 logger = get_logger(__name__)
+settings = get_settings()
+active_connections = get_metrics().gauge("chat.connections.active")
 
 
-def _format_question(question: Question) -> str:
-    formatted = question.text + "\n"
-
-    match question.type:
-        case QuestionType.MULTIPLE_CHOICE | QuestionType.RATING:
-            if question.options:
-                formatted += "\nChoose one of:\n"
-                for i, option in enumerate(question.options, 1):
-                    formatted += f"{i}. {option.text}\n"
-            else:
-                formatted += "\n(No options available)"
-
-        case QuestionType.BOOLEAN:
-            formatted += "\nPlease answer with 'yes' or 'no'"
+def _reply_text(reply: InboundReply) -> str:
+    if reply.error is not None:
+        return f"Error: {reply.error}"
+    if reply.is_complete:
+        return MESSAGES[GOODBYE]
+    return format_question(reply.question)
 
-        case QuestionType.DATE:
-            formatted += "\nPlease enter a date (YYYY-MM-DD)"
 
-    return formatted.strip()
-
-
-def _goodbye_message() -> str:
-    return "Thank you for your time. That were all the questions!"
-
-
-def _error_message(error: BusinessRuleError) -> str:
-    return f"Error: {error.message}"
-
-
-def _welcome_message() -> str:
-    return "Welcome to the survey! Please answer the following questions."
+async def _handle_frame(
+    websocket: WebSocket,
+    protocol: Any,
+    frame: Any,
+    session_id: SessionId,
+    client_ip: Optional[str],
+    question: Question,
+    chats_service: ChatsService,
+    rate_limit_service: RateLimitService,
+) -> Tuple[Optional[Question], Optional[str]]:
+    """Answer a frame of a chat connection with its client message id.
+
+    Returns the next question, None once the survey is complete, and the message id.
+    Errors are sent to the client, which is asked the same question again.
+    """
+    message_id = None
+    try:
+        await rate_limit_service.check(session_id.user_id, session_id.survey_id, client_ip)
+        message, message_id = protocol.parse(frame)
+        with deadline(settings.MESSAGE_DEADLINE):
+            question = await chats_service.handle_message(session_id, message, message_id)
+    except BusinessRuleError as e:
+        await protocol.send(websocket, ERROR, text=e.message, reply_to=message_id)
+    except ServiceError as e:
+        # Keep the connection, the client can resend the answer once stores recover
+        logger.error("Failed to handle chat message: %s", e.message)
+        await protocol.send(websocket, UNAVAILABLE, reply_to=message_id)
+    return question, message_id
 
 
 @chats_router.websocket("/survey/{survey_id}/user/{user_id}")
@@ -58,33 +108,141 @@ async def websocket_endpoint(
     user_id: str,
     survey_id: str,
     chats_service: ChatsServiceDep,
+    rate_limit_service: RateLimitServiceDep,
 ):
-    """Web socket endpoint for chat interactions."""
+    """Web socket endpoint for chat interactions.
+
+    Connections idle for longer than WS_IDLE_TIMEOUT are closed, which deactivates
+    their session. Dead peers are detected earlier by the server ping/pong frames.
+
+    Answers are sent as plain text, or as a JSON envelope {"message_id": ..., "text": ...}.
+    Clients offering the survey.msgpack.v1 subprotocol exchange structured msgpack frames
+    instead, see MsgpackChatProtocol. Clients that resend an answer after reconnecting get
+    the same reply, and the answer is stored once.
+    """
+    session_id = SessionId(user_id=user_id, survey_id=survey_id)
+    protocol = select_protocol(websocket)
+    connected = False
     try:
-        session_id = SessionId(user_id=user_id, survey_id=survey_id)
+        client_ip = websocket.client.host if websocket.client else None
         question = await chats_service.connect(session_id)
-        await websocket.accept()
+        connected = True
+        active_connections.inc()
+        await websocket.accept(subprotocol=protocol.subprotocol)
 
-        await websocket.send_text(_welcome_message())
+        await protocol.send(websocket, WELCOME)
 
+        message_id = None
         while True:
-            await websocket.send_text(_format_question(question))
-            message = await websocket.receive_text()
+            await protocol.send(websocket, QUESTION, question=question, reply_to=message_id)
             try:
-                question = await chats_service.handle_message(session_id, message)
-
-                if question is None:
-                    await websocket.send_text(_goodbye_message())
-                    await websocket.close()
-                    break
-
-            except BusinessRuleError as e:
-                await websocket.send_text(_error_message(e))
-                continue
+                frame = await asyncio.wait_for(
+                    protocol.receive(websocket), timeout=settings.WS_IDLE_TIMEOUT
+                )
+            except TimeoutError:
+                logger.info("WebSocket idle for %s seconds, closing", settings.WS_IDLE_TIMEOUT)
+                await protocol.send(websocket, IDLE)
+                await websocket.close(code=status.WS_1000_NORMAL_CLOSURE, reason="Idle timeout")
+                break
+
+            question, message_id = await _handle_frame(
+                websocket,
+                protocol,
+                frame,
+                session_id,
+                client_ip,
+                question,
+                chats_service,
+                rate_limit_service,
+            )
+            if question is None:
+                await protocol.send(websocket, GOODBYE, reply_to=message_id)
+                await websocket.close()
+                break
 
     except WebSocketDisconnect:
         logger.info("WebSocket disconnected")
     except BusinessRuleError as e:
         raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason=e.message) from e
     finally:
-        await chats_service.disconnect(session_id)
+        # Rejected connections must not deactivate the session held by another one
+        if connected:
+            active_connections.dec()
+            await chats_service.disconnect(session_id)
+
+
+@chats_router.post(
+    "/survey/{survey_id}/user/{user_id}/answers",
+    response_model=AnswerBatchResult,
+    responses=combine_responses(
+        not_found_response("Survey"),
+        validation_responses,
+        conflict_response("Session already active"),
+        server_error_responses,
+    ),
+)
+async def submit_answers(
+    user_id: str,
+    survey_id: str,
+    batch: AnswerBatch,
+    chats_service: ChatsServiceDep,
+):
+    """
+    Submit an ordered batch of answers, as collected by an offline client.
+
+    The whole batch is validated against the survey flow before anything is stored, and
+    then applied at once. Answers may carry the id of the question they answer, so that
+    clients that drifted from the server position are rejected.
+
+    Raises:
+        404: Survey not found
+        400: Invalid answer; nothing is stored
+        409: Session is active on a websocket
+        500: Internal server error
+    """
+    try:
+        session_id = SessionId(user_id=user_id, survey_id=survey_id)
+        response = await chats_service.submit_answers(session_id, batch.answers)
+        return AnswerBatchResult(
+            accepted=len(batch.answers),
+            current_question_id=response.current_question_id,
+            is_complete=response.is_complete,
+        )
+    except ResourceNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.message) from e
+    except ResourceConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=e.message) from e
+    except BusinessRuleError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.message) from e
+    except ServiceError as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)) from e
+
+
+@chats_router.post(
+    "/webhook/messages",
+    response_model=OutboundMessageBatch,
+    responses=validation_responses,
+)
+async def receive_messages(batch: InboundMessageBatch, gateway_service: GatewayServiceDep):
+    """
+    Receive a batch of inbound messages from a messaging provider.
+
+    Messages of different users are handled concurrently, while the messages of each
+    user and survey are handled in the order they were received. The reply to every
+    message is returned in bulk, in the order of the inbound messages.
+
+    Raises:
+        500: Internal server error
+    """
+    replies = await gateway_service.handle_messages(batch.messages)
+    return OutboundMessageBatch(
+        messages=[
+            OutboundMessage(
+                user_id=reply.message.user_id,
+                survey_id=reply.message.survey_id,
+                text=_reply_text(reply),
+                in_reply_to=reply.message.message_id,
+            )
+            for reply in replies
+        ]
+    )
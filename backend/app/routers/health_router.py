@@ -1,8 +1,12 @@
 """Health router"""
 
-from typing import Dict
+from typing import Any, Dict
 
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from ..core.metrics import get_metrics
+from ..core.startup import get_startup
 
 health_router = APIRouter(
     prefix="/health",
@@ -19,3 +23,26 @@ async def health_check() -> Dict[str, str]:
         Dict with status of the application.
     """
     return {"status": "ok"}
+
+
+@health_router.get("/ready")
+async def readiness() -> JSONResponse:
+    """
+    Readiness of the worker, which is ready once warmed up.
+
+    Returns:
+        Startup phase timings, with status 503 until the worker is ready.
+    """
+    startup = get_startup()
+    return JSONResponse(startup.snapshot(), status_code=200 if startup.ready else 503)
+
+
+@health_router.get("/metrics")
+async def metrics() -> Dict[str, Any]:
+    """
+    Metrics of the worker serving the request.
+
+    Returns:
+        Dict with the current value of every metric.
+    """
+    return get_metrics().snapshot()
@@ -1,11 +1,14 @@
 """Surveys router"""
 
-from typing import List
+from datetime import datetime
+from typing import Annotated, AsyncIterator, List, Optional
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response, status
 
-from ..models.surveys import Survey, SurveyUpdate
-from ..dependencies.services import SurveyServiceDep
+from ..core.constants import QUESTION_ID_PATTERN
+from ..models.responses import ResponsePage, ResponseQuery
+from ..models.surveys import Survey, SurveyUpdate, SurveyImportReport
+from ..dependencies.services import ResponseServiceDep, SurveyServiceDep
 from ..core.exceptions import (
     ServiceError,
     ResourceNotFoundError,
@@ -50,6 +53,55 @@ async def create_survey(survey: Survey, service: SurveyServiceDep):
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)) from e
 
 
+async def _iter_lines(request: Request) -> AsyncIterator[bytes]:
+    """Iterate over the lines of a streamed request body, left undecoded.
+
+    Only the bytes of each new chunk are searched for line ends, so long lines are read
+    in linear time. Lines are decoded with the survey they hold, see validate_survey_json.
+    """
+    buffer = bytearray()
+    async for chunk in request.stream():
+        searched = len(buffer)
+        buffer += chunk
+        start = 0
+        end = buffer.find(b"\n", searched)
+        while end != -1:
+            yield bytes(buffer[start:end])
+            start = end + 1
+            end = buffer.find(b"\n", start)
+        del buffer[:start]
+    if buffer:
+        yield bytes(buffer)
+
+
+@surveys_router.post(
+    "/import",
+    response_model=SurveyImportReport,
+    responses=validation_responses,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/x-ndjson": {"schema": {"type": "string"}}},
+        }
+    },
+)
+async def import_surveys(request: Request, service: SurveyServiceDep):
+    """
+    Import surveys in bulk from an NDJSON stream, one survey per line.
+
+    Surveys are validated in parallel and valid ones are inserted in batches. The report
+    contains the result of every line; invalid surveys do not prevent the others from
+    being created.
+
+    Raises:
+        500: Internal server error
+    """
+    try:
+        return await service.import_surveys(_iter_lines(request))
+    except ServiceError as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)) from e
+
+
 @surveys_router.get("/", response_model=List[Survey])
 async def list_surveys(service: SurveyServiceDep):
     """
@@ -66,18 +118,45 @@ async def list_surveys(service: SurveyServiceDep):
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)) from e
 
 
-@surveys_router.get("/{survey_id}", response_model=Survey, responses=not_found_response("Survey"))
-async def get_survey(survey_id: str, service: SurveyServiceDep):
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check an If-None-Match header against an entity tag, with weak comparison."""
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag for candidate in if_none_match.split(",")
+    )
+
+
+@surveys_router.get(
+    "/{survey_id}",
+    response_model=Survey,
+    responses=combine_responses(
+        not_found_response("Survey"),
+        {status.HTTP_304_NOT_MODIFIED: {"description": "Survey not modified"}},
+    ),
+)
+async def get_survey(
+    survey_id: str,
+    service: SurveyServiceDep,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+):
     """
     Get a specific survey by ID.
 
+    The response carries an ETag derived from the survey content. Requests whose
+    If-None-Match header matches it get an empty 304 response.
+
     Raises:
         404: Survey not found
         400: Invalid survey ID
         500: Internal server error
     """
     try:
-        return await service.get_survey(survey_id)
+        document = await service.get_survey_document(survey_id)
+        headers = {"ETag": document.etag, "Cache-Control": "no-cache"}
+        if if_none_match and _etag_matches(if_none_match, document.etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=document.content, media_type="application/json", headers=headers)
     except ResourceNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.message) from e
     except BusinessRuleError as e:
@@ -135,3 +214,55 @@ async def delete_survey(survey_id: str, service: SurveyServiceDep):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.message) from e
     except ServiceError as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)) from e
+
+
+@surveys_router.get(
+    "/{survey_id}/responses",
+    response_model=ResponsePage,
+    responses=combine_responses(not_found_response("Survey"), validation_responses),
+)
+async def query_responses(
+    survey_id: str,
+    service: ResponseServiceDep,
+    is_complete: Optional[bool] = None,
+    started_from: Optional[datetime] = None,
+    started_until: Optional[datetime] = None,
+    completed_from: Optional[datetime] = None,
+    completed_until: Optional[datetime] = None,
+    question_id: Annotated[Optional[str], Query(pattern=QUESTION_ID_PATTERN)] = None,
+    answer: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Annotated[int, Query(ge=1, le=500)] = 50,
+):
+    """
+    Query the responses to a survey, most recently updated first.
+
+    Responses can be filtered by completion, by ranges of their start and completion
+    times, and by their answer to a question. Pages carry the cursor of the next page,
+    if there is one.
+
+    Raises:
+        404: Survey not found
+        400: Invalid filters, cursor or survey ID
+        500: Internal server error
+    """
+    try:
+        query = ResponseQuery(
+            survey_id=survey_id,
+            is_complete=is_complete,
+            started_from=started_from,
+            started_until=started_until,
+            completed_from=completed_from,
+            completed_until=completed_until,
+            question_id=question_id,
+            answer=answer,
+            cursor=cursor,
+            limit=limit,
+        )
+        return await service.query_responses(query)
+    except ResourceNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.message) from e
+    except BusinessRuleError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.message) from e
+    except ServiceError as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)) from e
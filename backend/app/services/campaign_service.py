@@ -0,0 +1,235 @@
+"""Service for starting surveys for lists of users."""
+
+import asyncio
+from datetime import datetime
+from typing import AsyncIterable, Callable, Dict, List, Mapping, Optional, Set
+
+from .outbound_gateway import OutboundGateway
+from .survey_service import SurveyService
+from ..repositories.campaign_repository import CampaignRepository
+from ..repositories.responses_repository import ResponseRepository
+from ..models.campaigns import CampaignProgress, Recipient
+from ..models.messages import OutboundMessage
+from ..models.responses import SurveyResponse
+from ..models.surveys import Survey
+from ..core.chat_protocols import MESSAGES, WELCOME, format_question
+from ..core.constants import UTC
+from ..core.exceptions import BusinessRuleError
+from ..core.logging import get_logger
+from ..core.metrics import get_metrics
+from ..core.token_bucket import TokenBucket
+
+logger = get_logger(__name__)
+metrics = get_metrics()
+
+
+def _as_utc(moment: datetime) -> datetime:
+    """Make a time read back from MongoDB, which drops the time zone, comparable."""
+    return moment if moment.tzinfo is not None else moment.replace(tzinfo=UTC)
+
+
+def _rate_limit(name: str, rate: float) -> TokenBucket:
+    """Bucket of a rate limit, holding at least one message so slow rates still send.
+
+    Raises a ValueError if the rate is not positive.
+    """
+    if rate <= 0:
+        raise ValueError(f"Campaign {name} must be positive, got {rate}")
+    return TokenBucket(rate, max(1.0, rate))
+
+
+class CampaignService:
+    """Starts a survey for a stream of recipients, messaging them its first question.
+
+    Recipients are read in batches: the responses of a batch are created with a single
+    bulk insert, then the batch is messaged within a global rate limit and the limit of
+    each provider. Progress is checkpointed before the insert, after it and after the
+    messages, so that a campaign run again resumes with its last batch. Responses the
+    insert created before a crash are found by their start time, so their users are
+    messaged too. Recipients of the last batch may be messaged twice, with the same
+    idempotency key.
+
+    The responses collection must have the unique RESPONSE_USER_INDEX, which the bulk
+    insert relies on to skip the users that already have a response.
+    """
+
+    def __init__(
+        self,
+        survey_service: SurveyService,
+        response_repository: ResponseRepository,
+        campaign_repository: CampaignRepository,
+        gateway: OutboundGateway,
+        rate: float,
+        provider_rates: Mapping[str, float],
+        batch_size: int,
+        concurrency: int,
+    ):
+        self.survey_service = survey_service
+        self.response_repository = response_repository
+        self.campaign_repository = campaign_repository
+        self.gateway = gateway
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self._rate_limit = _rate_limit("rate", rate)
+        self._provider_limits: Dict[str, TokenBucket] = {
+            provider: _rate_limit(f"rate of {provider}", provider_rate)
+            for provider, provider_rate in provider_rates.items()
+        }
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def run(
+        self,
+        campaign_id: str,
+        survey_id: str,
+        recipients: AsyncIterable[Recipient],
+        report: Optional[Callable[[CampaignProgress], None]] = None,
+    ) -> CampaignProgress:
+        """Run a campaign, or resume it from its last checkpoint, returning its progress."""
+        survey = await self.survey_service.get_survey(survey_id)
+        first_question = survey.get_question(survey.first_question_id)
+        text = f"{MESSAGES[WELCOME]}\n\n{format_question(first_question)}"
+
+        progress = await self.campaign_repository.get_progress(campaign_id)
+        if progress is None:
+            progress = CampaignProgress(campaign_id=campaign_id, survey_id=survey_id)
+        elif progress.survey_id != survey_id:
+            raise BusinessRuleError(f"Campaign {campaign_id} is for survey {progress.survey_id}")
+        elif progress.offset:
+            logger.info("Resuming campaign %s after %d recipients", campaign_id, progress.offset)
+
+        if progress.creating_since is not None:
+            await self._create_responses(progress, survey, resumed=True)
+            await self._checkpoint(progress, None)
+        if progress.pending:
+            await self._send_batch(progress, text)
+            await self._checkpoint(progress, report)
+
+        position = 0
+        batch: List[Recipient] = []
+        async for recipient in recipients:
+            position += 1
+            if position <= progress.offset:
+                continue
+            batch.append(recipient)
+            if len(batch) >= self.batch_size:
+                await self._process_batch(progress, survey, batch, text, report)
+                batch = []
+        if batch:
+            await self._process_batch(progress, survey, batch, text, report)
+
+        progress.is_complete = True
+        await self._checkpoint(progress, report)
+        logger.info(
+            "Campaign %s done: %d created, %d skipped, %d sent, %d failed",
+            campaign_id,
+            progress.created,
+            progress.skipped,
+            progress.sent,
+            progress.failed,
+        )
+        return progress
+
+    async def _checkpoint(
+        self, progress: CampaignProgress, report: Optional[Callable[[CampaignProgress], None]]
+    ) -> None:
+        progress.updated_at = datetime.now(UTC)
+        await self.campaign_repository.save_progress(progress)
+        if report is not None:
+            report(progress)
+
+    async def _process_batch(
+        self,
+        progress: CampaignProgress,
+        survey: Survey,
+        batch: List[Recipient],
+        text: str,
+        report: Optional[Callable[[CampaignProgress], None]],
+    ) -> None:
+        """Create the responses of a batch of recipients, then message the new ones."""
+        progress.pending = batch
+        progress.offset += len(batch)
+        progress.creating_since = datetime.now(UTC)
+        await self._checkpoint(progress, None)
+
+        await self._create_responses(progress, survey)
+        await self._checkpoint(progress, None)
+
+        await self._send_batch(progress, text)
+        await self._checkpoint(progress, report)
+
+    async def _create_responses(
+        self, progress: CampaignProgress, survey: Survey, resumed: bool = False
+    ) -> None:
+        """Create the responses of the pending recipients, keeping the new ones pending.
+
+        When resuming, responses started since the batch was checkpointed were created by
+        the interrupted insert, so their users are kept too.
+        """
+        batch = progress.pending
+        created = await self.response_repository.insert_many(
+            [
+                SurveyResponse(
+                    survey_id=survey.id,
+                    user_id=recipient.user_id,
+                    current_question_id=survey.first_question_id,
+                )
+                for recipient in batch
+            ]
+        )
+        created_users = {response.user_id for response in created}
+        if resumed:
+            created_users.update(await self._created_since(progress, batch, created_users))
+        progress.pending = [r for r in batch if r.user_id in created_users]
+        progress.created += len(progress.pending)
+        progress.skipped += len(batch) - len(progress.pending)
+        progress.creating_since = None
+        metrics.counter("campaigns.responses_created").inc(len(progress.pending))
+
+    async def _created_since(
+        self, progress: CampaignProgress, batch: List[Recipient], created_users: Set[str]
+    ) -> Set[str]:
+        """Users of a batch whose existing response was started after it was checkpointed."""
+        user_ids = [r.user_id for r in batch if r.user_id not in created_users]
+        if not user_ids:
+            return set()
+        existing = await self.response_repository.find_by_survey_and_users(
+            progress.survey_id, user_ids
+        )
+        since = progress.creating_since
+        return {
+            response.user_id
+            for response in existing
+            if _as_utc(response.started_at) >= _as_utc(since)
+        }
+
+    async def _send_batch(self, progress: CampaignProgress, text: str) -> None:
+        """Message the pending recipients, within the rate limits."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(
+            *(self._send(progress, recipient, text) for recipient in progress.pending)
+        )
+        sent = sum(results)
+        progress.sent += sent
+        progress.failed += len(results) - sent
+        progress.pending = []
+
+    async def _send(self, progress: CampaignProgress, recipient: Recipient, text: str) -> bool:
+        async with self._semaphore:
+            provider_limit = self._provider_limits.get(recipient.provider)
+            if provider_limit is not None:
+                await provider_limit.acquire()
+            await self._rate_limit.acquire()
+            message = OutboundMessage(
+                user_id=recipient.user_id, survey_id=progress.survey_id, text=text
+            )
+            try:
+                await self.gateway.send(
+                    recipient.provider, message, f"{progress.campaign_id}:{recipient.user_id}"
+                )
+            except Exception as e:
+                metrics.counter("campaigns.messages_failed").inc()
+                logger.warning("Failed to message %s: %s", recipient.user_id, str(e))
+                return False
+            metrics.counter("campaigns.messages_sent").inc()
+            return True
@@ -1,14 +1,19 @@
 """Service for handling the chat."""
 
+from typing import List, Optional, Tuple
+
 from .survey_service import SurveyService
 from .session_service import SessionService
 from .response_service import ResponseService
-from ..models.sessions import SessionId
+from ..models.sessions import Session, SessionId
+from ..models.responses import AnswerSubmission, SurveyResponse, processed_message_key
 from ..models.surveys import Question
+from ..core.config import get_settings
 from ..core.logging import get_logger
-from ..core.exceptions import BusinessRuleError
+from ..core.exceptions import BusinessRuleError, ResourceConflictError
 
 logger = get_logger(__name__)
+settings = get_settings()
 
 
 class ChatsService:
@@ -26,10 +31,12 @@ class ChatsService:
 
     async def connect(self, session_id: SessionId) -> Question:
         """Connect to the chat."""
-        if await self.session_service.is_session_active(session_id):
-            raise BusinessRuleError("Session already active")
-        session = await self.session_service.get_active_session(session_id)
+        try:
+            session = await self.session_service.resume_session(session_id)
+        except ResourceConflictError as e:
+            raise BusinessRuleError("Session already active") from e
         if session.response and session.response.is_complete:
+            await self.session_service.delete_session(session_id)
             raise BusinessRuleError("Survey already completed")
         return session.survey.get_question(session.response.current_question_id)
 
@@ -37,26 +44,124 @@ class ChatsService:
         """Disconnect from the chat."""
         await self.session_service.deactivate_session(session_id)
 
-    async def handle_message(self, session_id: SessionId, message: str) -> Question:
-        """Handle a message from the chat."""
+    async def handle_message(
+        self, session_id: SessionId, message: str, message_id: Optional[str] = None
+    ) -> Question:
+        """Handle a message from the chat.
+
+        Messages with a client message id are processed once: resending a recent one
+        replies with the question it was answered with, without storing anything.
+        """
         session = await self.session_service.get_active_session(session_id)
         if not session:
             raise BusinessRuleError("Session not found")
+        answered, question = await self._answer(session, message, message_id)
+        if not answered:
+            return question
+        if question is not None:
+            await self.session_service.update_session(session_id, session)
+        else:
+            # If the survey is complete, delete the session
+            await self.session_service.delete_session(session_id)
+        return question
+
+    async def handle_detached_message(
+        self, session_id: SessionId, message: str, message_id: Optional[str] = None
+    ) -> Question:
+        """Handle a message received without a connection, as from a messaging provider.
+
+        The session is claimed for the message only and parked right after, so it is not
+        held by this worker and can be resumed by a connection later.
+        """
+        try:
+            session = await self.session_service.load_session(session_id)
+        except ResourceConflictError as e:
+            raise BusinessRuleError("Session already active") from e
+        try:
+            _, question = await self._answer(session, message, message_id)
+        finally:
+            if session.response.is_complete:
+                await self.session_service.delete_session(session_id)
+            else:
+                await self.session_service.park_session(session_id, session)
+        return question
+
+    @staticmethod
+    def _processed_reply(session: Session, message_id: str) -> Tuple[bool, Optional[str]]:
+        """Look up the next question id replied to a client message, if it was answered.
+
+        Recent messages are recorded by the session, and all answered messages by the
+        response, which keeps them after the session is deleted with the last answer.
+        """
+        if message_id in session.processed_messages:
+            return True, session.processed_messages[message_id]
+        recorded = session.response.processed_messages
+        key = processed_message_key(message_id)
+        if key in recorded:
+            return True, recorded[key]
+        return False, None
+
+    async def _answer(
+        self, session: Session, message: str, message_id: Optional[str]
+    ) -> Tuple[bool, Optional[Question]]:
+        """Answer the current question of a session.
+
+        Returns whether the message was answered, rather than replayed, and the next
+        question, if any.
+        """
+        if message_id is not None:
+            replied, next_question_id = self._processed_reply(session, message_id)
+            if replied:
+                logger.info("Replaying reply to duplicate message %s", message_id)
+                question = (
+                    session.survey.get_question(next_question_id) if next_question_id else None
+                )
+                return False, question
+        if session.response.is_complete:
+            raise BusinessRuleError("Survey already completed")
 
         # Get the current question
         question = session.survey.get_question(session.response.current_question_id)
 
-        # Add the response to the question
+        # Add the response to the question, indexing it once it is stored
+        answer_index = dict(session.get_answer_index())
         session.response = await self.response_service.add_question_response(
-            session.response.id, question, message
+            session.response.id,
+            question,
+            message,
+            answer_index,
+            message_id=message_id,
         )
-        await self.session_service.update_session(session_id, session)
+        session.answer_index = answer_index
+        if message_id is not None:
+            session.record_message(
+                message_id,
+                session.response.current_question_id,
+                settings.SESSION_PROCESSED_MESSAGES,
+            )
 
         # Return the next question
         if session.response.current_question_id is not None:
-            return session.survey.get_question(session.response.current_question_id)
+            return True, session.survey.get_question(session.response.current_question_id)
+        return True, None
 
-        # If the survey is complete, delete the session
-        await self.session_service.delete_session(session_id)
+    async def submit_answers(
+        self, session_id: SessionId, answers: List[AnswerSubmission]
+    ) -> SurveyResponse:
+        """Apply an ordered batch of answers, as collected by an offline client."""
+        session = await self.session_service.load_session(session_id)
+        try:
+            # The answers are indexed once they are all stored
+            answer_index = dict(session.get_answer_index())
+            session.response = await self.response_service.add_question_responses(
+                session.response, session.survey, answers, answer_index
+            )
+            session.answer_index = answer_index
+        finally:
+            # Release the session, keeping it for resuming unless the survey is complete
+            if session.response.is_complete:
+                await self.session_service.delete_session(session_id)
+            else:
+                await self.session_service.park_session(session_id, session)
 
-        return None
+        return session.response
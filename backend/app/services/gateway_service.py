@@ -0,0 +1,61 @@
+"""Service for handling batches of messages from messaging providers."""
+
+import asyncio
+from typing import List
+
+from .chats_service import ChatsService
+from ..models.messages import InboundMessage, InboundReply
+from ..models.sessions import SessionId
+from ..core.concurrency import KeyedSerialQueue
+from ..core.config import get_settings
+from ..core.exceptions import BusinessRuleError, ResourceNotFoundError, ServiceError
+from ..core.logging import get_logger
+from ..core.resilience import deadline
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+
+class GatewayService:
+    """Service for handling batches of messages from messaging providers.
+
+    Messages of different sessions are handled concurrently, while the messages of a
+    session are handled one at a time, in the order they were received, even across
+    batches.
+    """
+
+    def __init__(self, chats_service: ChatsService, queue: KeyedSerialQueue):
+        self.chats_service = chats_service
+        self.queue = queue
+
+    async def handle_messages(self, messages: List[InboundMessage]) -> List[InboundReply]:
+        """Handle a batch of messages, returning the replies in the same order."""
+        tasks = [
+            self.queue.submit(
+                SessionId(user_id=message.user_id, survey_id=message.survey_id),
+                lambda message=message: self._handle_message(message),
+            )
+            for message in messages
+        ]
+        return await asyncio.gather(*tasks)
+
+    async def _handle_message(self, message: InboundMessage) -> InboundReply:
+        """Handle a single message with the chat semantics."""
+        session_id = SessionId(user_id=message.user_id, survey_id=message.survey_id)
+        try:
+            with deadline(settings.MESSAGE_DEADLINE):
+                question = await self.chats_service.handle_detached_message(
+                    session_id, message.text, message.message_id
+                )
+            return InboundReply(message=message, question=question, is_complete=question is None)
+        except BusinessRuleError as e:
+            return InboundReply(message=message, error=e.message)
+        except ResourceNotFoundError as e:
+            # Messages can name a survey that was deleted or never existed
+            logger.warning("Inbound message for a missing resource: %s", e.message)
+            return InboundReply(message=message, error="This survey is not available")
+        except ServiceError as e:
+            logger.error("Failed to handle inbound message: %s", e.message)
+            return InboundReply(
+                message=message, error="Something went wrong, please try again later"
+            )
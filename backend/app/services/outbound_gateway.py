@@ -0,0 +1,32 @@
+"""Gateway for sending messages to users through messaging providers."""
+
+import asyncio
+from collections import Counter
+from typing import Protocol
+
+from ..models.messages import OutboundMessage
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class OutboundGateway(Protocol):
+    """Interface for sending messages through messaging providers."""
+
+    async def send(self, provider: str, message: OutboundMessage, idempotency_key: str) -> None:
+        """Send a message, which providers deliver once per idempotency key."""
+
+
+class LocalOutboundGateway:
+    """Stand-in for the messaging providers, logging messages after a simulated latency."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.sent: Counter = Counter()
+
+    async def send(self, provider: str, message: OutboundMessage, idempotency_key: str) -> None:
+        """Pretend to send a message through a provider."""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.sent[provider] += 1
+        logger.debug("Sent %s to %s through %s", idempotency_key, message.user_id, provider)
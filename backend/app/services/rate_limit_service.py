@@ -0,0 +1,86 @@
+"""Service for rate limiting chat messages."""
+
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from ..repositories import RateLimitRepository
+from ..core.config import get_settings
+from ..core.exceptions import RateLimitExceededError
+from ..core.metrics import get_metrics
+from ..core.token_bucket import TokenBucket
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+metrics = get_metrics()
+
+
+class RateLimitService:
+    """Service for rate limiting chat messages per user, survey and IP.
+
+    Limits are enforced with token buckets shared by all workers. A local copy of each
+    bucket rejects clients that exceed the limit on this worker alone, without asking
+    the shared store; everything else costs a single atomic call.
+    """
+
+    def __init__(self, repository: RateLimitRepository, max_local_buckets: int):
+        self.repository = repository
+        self.max_local_buckets = max_local_buckets
+        self._local_buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def _limits(
+        self, user_id: str, survey_id: str, ip: Optional[str]
+    ) -> Dict[str, Tuple[float, float]]:
+        """Get the buckets that apply to a message, as key: (rate, capacity)."""
+        limits = {
+            f"user:{user_id}": (settings.RATE_LIMIT_USER_RATE, settings.RATE_LIMIT_USER_BURST),
+            f"survey:{survey_id}": (
+                settings.RATE_LIMIT_SURVEY_RATE,
+                settings.RATE_LIMIT_SURVEY_BURST,
+            ),
+        }
+        if ip:
+            limits[f"ip:{ip}"] = (settings.RATE_LIMIT_IP_RATE, settings.RATE_LIMIT_IP_BURST)
+        return limits
+
+    def _local_bucket(self, key: str, rate: float, capacity: float) -> TokenBucket:
+        """Get the local bucket of a key, evicting the least recently used ones."""
+        bucket = self._local_buckets.get(key)
+        if bucket is None:
+            bucket = self._local_buckets[key] = TokenBucket(rate, capacity)
+            if len(self._local_buckets) > self.max_local_buckets:
+                self._local_buckets.popitem(last=False)
+        else:
+            self._local_buckets.move_to_end(key)
+        return bucket
+
+    def _check_locally(self, limits: Dict[str, Tuple[float, float]]) -> float:
+        """Check the local buckets, returning the seconds to wait if any is empty."""
+        buckets = [self._local_bucket(key, *limit) for key, limit in limits.items()]
+        retry_after = max(bucket.wait_time() for bucket in buckets)
+        if retry_after == 0:
+            for bucket in buckets:
+                bucket.try_acquire()
+        return retry_after
+
+    async def check(self, user_id: str, survey_id: str, ip: Optional[str] = None) -> None:
+        """Take a token for a message, raising if any of its limits is exceeded."""
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+
+        limits = self._limits(user_id, survey_id, ip)
+        retry_after = self._check_locally(limits)
+        if retry_after > 0:
+            metrics.counter("rate_limit.rejected_locally").inc()
+            raise RateLimitExceededError(retry_after)
+
+        try:
+            retry_after = await self.repository.consume(limits)
+        except Exception as e:
+            # Rate limits protect the service, they should not take it down
+            logger.warning("Failed to check rate limits: %s", str(e))
+            return
+
+        if retry_after > 0:
+            metrics.counter("rate_limit.rejected").inc()
+            raise RateLimitExceededError(retry_after)
@@ -0,0 +1,97 @@
+"""Service for sending the reminders of sessions left incomplete."""
+
+import asyncio
+import time
+from typing import Optional
+
+from .outbound_gateway import OutboundGateway
+from ..repositories import ReminderRepository
+from ..models.messages import OutboundMessage
+from ..models.sessions import Reminder
+from ..core.logging import get_logger
+from ..core.metrics import get_metrics
+
+logger = get_logger(__name__)
+metrics = get_metrics()
+
+REMINDER_TEXT = "You left a survey unfinished. Reply to continue where you left off."
+
+
+class ReminderWorker:
+    """Periodically pops the reminders that are due and sends them.
+
+    Every worker polls the same reminders, and each reminder is popped by one of them
+    only. Due reminders are drained in batches, polling again right away while any are
+    left. Reminders are popped before they are sent, so a worker dying in between loses
+    them rather than sending them twice.
+    """
+
+    def __init__(
+        self,
+        repository: ReminderRepository,
+        gateway: OutboundGateway,
+        batch_size: int,
+        interval: float,
+        provider: str = "default",
+    ):
+        self.repository = repository
+        self.gateway = gateway
+        self.batch_size = batch_size
+        self.interval = interval
+        self.provider = provider
+        self._task: Optional[asyncio.Task] = None
+
+    async def poll(self) -> int:
+        """Pop the reminders due now and send them.
+
+        Returns the number of reminders popped.
+        """
+        try:
+            reminders = await self.repository.pop_due(time.time(), self.batch_size)
+        except Exception as e:
+            logger.warning("Failed to pop due reminders: %s", str(e))
+            return 0
+        if reminders:
+            await asyncio.gather(*(self._send(reminder) for reminder in reminders))
+            metrics.histogram("reminders.lag_seconds").observe(
+                time.time() - min(reminder.due_at for reminder in reminders)
+            )
+        return len(reminders)
+
+    async def _send(self, reminder: Reminder) -> None:
+        session_id = reminder.session_id
+        message = OutboundMessage(
+            user_id=session_id.user_id, survey_id=session_id.survey_id, text=REMINDER_TEXT
+        )
+        try:
+            await self.gateway.send(
+                self.provider,
+                message,
+                f"reminder:{session_id.survey_id}:{session_id.user_id}:{reminder.due_at}",
+            )
+        except Exception as e:
+            metrics.counter("reminders.failed").inc()
+            logger.warning("Failed to remind %s: %s", session_id.user_id, str(e))
+            return
+        metrics.counter("reminders.sent").inc()
+
+    async def _run(self) -> None:
+        while True:
+            if not await self.poll():
+                await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start the reminder task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the reminder task."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
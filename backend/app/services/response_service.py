@@ -1,15 +1,33 @@
 """Service for managing survey responses."""
 
-from typing import List, Optional
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
 
-from ..repositories.responses_repository import ResponseRepository
+from ..repositories.responses_repository import (
+    ResponseRepository,
+    decode_response_cursor,
+    encode_response_cursor,
+)
 from ..repositories.surveys_repository import SurveyRepository
-from ..models.responses import SurveyResponse, QuestionResponse
-from ..models.surveys import Question
-from ..core.exceptions import ResourceNotFoundError, ServiceError
+from ..models.responses import (
+    SurveyResponse,
+    QuestionResponse,
+    AnswerSubmission,
+    ResponsePage,
+    ResponseQuery,
+    processed_message_key,
+)
+from ..models.surveys import Question, Survey
+from ..core.exceptions import (
+    BusinessRuleError,
+    InvalidSurveyIdError,
+    RepositoryError,
+    ResourceNotFoundError,
+    ServiceError,
+)
+from ..core.constants import UTC
 from ..core.logging import get_logger
 
-
 logger = get_logger(__name__)
 
 
@@ -46,19 +64,46 @@ class ResponseService:
             logger.error("Failed to create survey response: %s", str(e), exc_info=True)
             raise ServiceError("Failed to create survey response") from e
 
-    async def add_question_response(
-        self, response_id: str, question: Question, response: str
+    def build_question_response(
+        self,
+        question: Question,
+        response: str,
+        answer_index: Optional[Dict[str, Any]] = None,
     ) -> QuestionResponse:
-        """Add a response to a question in an existing survey response."""
+        """Validate a response to a question and resolve the next question.
+
+        The answer index, when given, is updated with the response before routing, so
+        expressions can use it. Callers pass a copy of the index of their session, and keep
+        it once the response is stored.
+        """
         validated_response = question.get_validated_response(response)
         question_response = QuestionResponse(
             question_id=question.id, question_type=question.type, response_value=validated_response
         )
-        next_question_id = question.get_next_question(response)
-        logger.info(
+        if answer_index is not None:
+            answer_index[question.id] = question.index_value(validated_response)
+        next_question_id = question.get_next_question(response, answer_index)
+        logger.debug(
             "Current question id: %s, and Next question id: %s", question.id, next_question_id
         )
         question_response.next_question_id = next_question_id
+        return question_response
+
+    async def add_question_response(
+        self,
+        response_id: str,
+        question: Question,
+        response: str,
+        answer_index: Optional[Dict[str, Any]] = None,
+        message_id: Optional[str] = None,
+    ) -> QuestionResponse:
+        """Add a response to a question in an existing survey response.
+
+        A client message already answered is not stored again, and the stored response
+        is returned instead.
+        """
+        question_response = self.build_question_response(question, response, answer_index)
+        next_question_id = question_response.next_question_id
 
         try:
             # Add response
@@ -67,7 +112,10 @@ class ResponseService:
                 question_response,
                 next_question_id=next_question_id,
                 is_complete=next_question_id is None,
+                message_id=message_id,
             )
+            if not updated and message_id is not None:
+                updated = await self._find_processed(response_id, message_id)
 
             if not updated:
                 raise ServiceError(f"Failed to update response {response_id}")
@@ -75,7 +123,7 @@ class ResponseService:
             logger.info(
                 "Added question response: %s to %s", question_response.question_id, response_id
             )
-            logger.info("Updated: %s", updated)
+            logger.debug("Updated: %s", updated)
             return updated
 
         except Exception as e:
@@ -84,6 +132,76 @@ class ResponseService:
             )
             raise ServiceError(f"Failed to add question response to {response_id}") from e
 
+    async def _find_processed(self, response_id: str, message_id: str) -> Optional[SurveyResponse]:
+        """Find a response that already answered a client message, if it did."""
+        stored = await self.response_repository.find_by_id(response_id)
+        if stored is not None and processed_message_key(message_id) in stored.processed_messages:
+            logger.info("Message %s already answered in %s", message_id, response_id)
+            return stored
+        return None
+
+    def build_question_responses(
+        self,
+        survey: Survey,
+        question_id: Optional[str],
+        answers: List[AnswerSubmission],
+        answer_index: Optional[Dict[str, Any]] = None,
+    ) -> List[QuestionResponse]:
+        """Validate an ordered list of answers against the survey flow, starting at a question."""
+        question_responses = []
+        for position, answer in enumerate(answers, 1):
+            if question_id is None:
+                raise BusinessRuleError(f"Answer {position}: the survey is already complete")
+            if answer.question_id is not None and answer.question_id != question_id:
+                raise BusinessRuleError(
+                    f"Answer {position}: expected an answer to question {question_id}, "
+                    f"got {answer.question_id}"
+                )
+            try:
+                question_response = self.build_question_response(
+                    survey.get_question(question_id), answer.value, answer_index
+                )
+            except BusinessRuleError as e:
+                raise BusinessRuleError(f"Answer {position}: {e.message}") from e
+            question_responses.append(question_response)
+            question_id = question_response.next_question_id
+        return question_responses
+
+    async def add_question_responses(
+        self,
+        response: SurveyResponse,
+        survey: Survey,
+        answers: List[AnswerSubmission],
+        answer_index: Optional[Dict[str, Any]] = None,
+    ) -> SurveyResponse:
+        """Validate an ordered list of answers and add them to a survey response in one update."""
+        if response.is_complete:
+            raise BusinessRuleError("Survey already completed")
+        question_responses = self.build_question_responses(
+            survey, response.current_question_id, answers, answer_index
+        )
+        next_question_id = question_responses[-1].next_question_id
+
+        try:
+            updated = await self.response_repository.add_question_responses(
+                response.id,
+                question_responses,
+                next_question_id=next_question_id,
+                is_complete=next_question_id is None,
+            )
+
+            if not updated:
+                raise ServiceError(f"Failed to update response {response.id}")
+
+            logger.info("Added %d question responses to %s", len(question_responses), response.id)
+            return updated
+
+        except Exception as e:
+            logger.error(
+                "Failed to add question responses to %s: %s", response.id, str(e), exc_info=True
+            )
+            raise ServiceError(f"Failed to add question responses to {response.id}") from e
+
     async def get_survey_responses(self, survey_id: str) -> List[SurveyResponse]:
         """Get all responses for a survey."""
         try:
@@ -102,6 +220,56 @@ class ResponseService:
             )
             raise ServiceError(f"Failed to get responses for survey {survey_id}") from e
 
+    async def query_responses(self, query: ResponseQuery) -> ResponsePage:
+        """Get a page of the responses to a survey matching a query.
+
+        Answers are validated by their question, so they match the stored values. Pages
+        resume after the last response of the previous page, so responses updated while
+        paging may be skipped or repeated, but paging never restarts or slows down.
+        """
+        if query.cursor is not None:
+            try:
+                decode_response_cursor(query.cursor)
+            except ValueError as e:
+                raise BusinessRuleError(str(e)) from e
+        try:
+            query = await self._validate_answer_filter(query)
+
+            # One more response tells whether there is a next page
+            responses = await self.response_repository.find_page(query, query.limit + 1)
+            page = ResponsePage(responses=responses[: query.limit])
+            if len(responses) > query.limit:
+                page.next_cursor = encode_response_cursor(page.responses[-1])
+            return page
+
+        except InvalidSurveyIdError as e:
+            raise BusinessRuleError(e.message) from e
+        except RepositoryError as e:
+            logger.error("Failed to query responses for survey %s: %s", query.survey_id, str(e))
+            raise ServiceError(f"Failed to query responses for survey {query.survey_id}") from e
+
+    async def _validate_answer_filter(self, query: ResponseQuery) -> ResponseQuery:
+        """Check that the survey of a query exists, and validate its answer filter, if any."""
+        survey = await self.survey_repository.find_by_id(query.survey_id)
+        if not survey:
+            raise ResourceNotFoundError(f"Survey {query.survey_id} not found")
+        if query.question_id is None:
+            return query
+        question = survey.questions.get(query.question_id)
+        if question is None:
+            raise BusinessRuleError(f"Question {query.question_id} not found")
+        answer = question.get_validated_response(str(query.answer))
+        return query.model_copy(update={"answer": answer})
+
+    async def get_most_active_surveys(self, window: float, limit: int) -> List[str]:
+        """Get the ids of the surveys with the most responses updated in the last seconds."""
+        try:
+            since = datetime.now(UTC) - timedelta(seconds=window)
+            return await self.response_repository.most_active_surveys(since, limit)
+        except Exception as e:
+            logger.error("Failed to get the most active surveys: %s", str(e), exc_info=True)
+            raise ServiceError("Failed to get the most active surveys") from e
+
     async def get_response(self, response_id: str) -> Optional[SurveyResponse]:
         """Get a specific survey response."""
         try:
@@ -0,0 +1,77 @@
+"""Service for renewing the leases of the sessions owned by a worker."""
+
+import asyncio
+from typing import Dict, Optional
+
+from ..repositories import SessionRepository
+from ..models.sessions import SessionId
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class SessionHeartbeat:
+    """Periodically renews the leases of the sessions held by this worker.
+
+    Active sessions are stored with a short lease. As long as the worker holding the
+    connection is alive, all of its leases are renewed in a single batched call; if the
+    worker dies, its sessions expire after at most one lease.
+    """
+
+    def __init__(self, session_repository: SessionRepository, interval: float):
+        self.session_repository = session_repository
+        self.interval = interval
+        self._leases: Dict[SessionId, int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def track(self, session_id: SessionId, lease_ttl: int) -> None:
+        """Start renewing the lease of a session."""
+        self._leases[session_id] = lease_ttl
+
+    def untrack(self, session_id: SessionId) -> None:
+        """Stop renewing the lease of a session."""
+        self._leases.pop(session_id, None)
+
+    @property
+    def tracked_sessions(self) -> int:
+        """Number of sessions whose lease is being renewed."""
+        return len(self._leases)
+
+    def next_delay(self) -> float:
+        """Get the delay until the next beat, so that no lease expires between beats."""
+        if not self._leases:
+            return self.interval
+        return min(self.interval, min(self._leases.values()) / 3)
+
+    async def beat(self) -> None:
+        """Renew the leases of all tracked sessions."""
+        if not self._leases:
+            return
+        leases = dict(self._leases)
+        try:
+            renewed = await self.session_repository.renew_active_sessions(leases)
+            if renewed < len(leases):
+                logger.debug("Renewed %d of %d session leases", renewed, len(leases))
+        except Exception as e:
+            logger.warning("Failed to renew session leases: %s", str(e))
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.next_delay())
+            await self.beat()
+
+    def start(self) -> None:
+        """Start the heartbeat task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the heartbeat task."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
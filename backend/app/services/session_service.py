@@ -1,12 +1,20 @@
 """Service for managing sessions"""
 
+import asyncio
+import time
+from typing import Optional
+
 from ..services.survey_service import SurveyService
 from ..services.response_service import ResponseService
-from ..repositories import SessionRepository
+from ..services.session_heartbeat import SessionHeartbeat
+from ..repositories import ReminderRepository, SessionRepository
 from ..models.sessions import SessionId, Session
+from ..core.config import get_settings
+from ..core.exceptions import ResourceConflictError
 from ..core.logging import get_logger
 
 logger = get_logger(__name__)
+settings = get_settings()
 
 
 class SessionService:
@@ -17,45 +25,116 @@ class SessionService:
         session_repository: SessionRepository,
         survey_service: SurveyService,
         response_service: ResponseService,
+        heartbeat: Optional[SessionHeartbeat] = None,
+        reminders: Optional[ReminderRepository] = None,
     ):
         self.session_repository = session_repository
         self.survey_service = survey_service
         self.response_service = response_service
+        self.heartbeat = heartbeat
+        self.reminders = reminders
+
+    def _lease_ttl(self, session: Session) -> int:
+        """Get the lease TTL of a session, as configured by its survey."""
+        if session.survey is not None and session.survey.session_lease_ttl:
+            return session.survey.session_lease_ttl
+        return settings.SESSION_LEASE_TTL
 
     async def get_active_session(self, session_id: SessionId) -> Session:
-        """Get the active session for a given session ID."""
-        session = await self.session_repository.get_active_session(session_id)
-        if session is not None:
+        """Get the active session for a given session ID, resuming it if needed."""
+        was_active, session = await self.session_repository.claim_session(
+            session_id, settings.SESSION_LEASE_TTL
+        )
+        if was_active and session is not None:
             return session
+        return await self._activate_session(session_id, session)
+
+    async def resume_session(self, session_id: SessionId) -> Session:
+        """Resume a session for a new connection, failing if it is active elsewhere."""
+        was_active, session = await self.session_repository.claim_session(
+            session_id, settings.SESSION_LEASE_TTL
+        )
+        if was_active:
+            raise ResourceConflictError("Session already active")
+        return await self._activate_session(session_id, session)
+
+    async def _activate_session(self, session_id: SessionId, stored: Optional[Session]) -> Session:
+        """Refresh a claimed session from the stored survey and response, and activate it."""
+        try:
+            session = await self._restore_session(session_id, stored)
+        except Exception:
+            # Release the lease taken by the claim, the session can be restored later
+            await self.session_repository.delete_active_session(session_id)
+            raise
 
-        # Validates if survey exists
-        survey = await self.survey_service.get_survey(session_id.survey_id)
+        lease_ttl = self._lease_ttl(session)
+        await self.session_repository.set_active_session(session_id, session, lease_ttl)
+        if self.heartbeat is not None:
+            self.heartbeat.track(session_id, lease_ttl)
+        await self._cancel_reminder(session_id)
 
-        session = await self.session_repository.get_unactive_session(session_id)
-        if session is not None:
-            await self.session_repository.delete_unactive_session(session_id)
-        else:
-            session = Session(id=session_id)
+        return session
 
-        session.survey = survey
+    async def _schedule_reminder(self, session_id: SessionId, session: Session) -> None:
+        """Schedule the reminder of a session left incomplete."""
+        if self.reminders is None or session.response is None or session.response.is_complete:
+            return
+        try:
+            await self.reminders.schedule(session_id, time.time() + settings.REMINDER_DELAY)
+        except Exception as e:
+            logger.warning("Failed to schedule the reminder of a session: %s", str(e))
+
+    async def _cancel_reminder(self, session_id: SessionId) -> None:
+        """Cancel the reminder of a session that is active again."""
+        if self.reminders is None:
+            return
+        try:
+            await self.reminders.cancel(session_id)
+        except Exception as e:
+            logger.warning("Failed to cancel the reminder of a session: %s", str(e))
+
+    async def load_session(self, session_id: SessionId) -> Session:
+        """Claim a session without a connection, failing if it is active elsewhere.
+
+        The session keeps its lease until it is parked or released, so no connection can
+        resume it and write it meanwhile.
+        """
+        was_active, stored = await self.session_repository.claim_session(
+            session_id, settings.SESSION_LEASE_TTL
+        )
+        if was_active:
+            raise ResourceConflictError("Session already active")
+        try:
+            return await self._restore_session(session_id, stored)
+        except Exception:
+            await self.session_repository.delete_active_session(session_id)
+            raise
 
-        if session.response is None:
-            # Get response by survey and user, to validate if it exists
-            session.response = await self.response_service.get_response_by_survey_and_user(
-                session_id.survey_id, session_id.user_id
-            )
+    async def _restore_session(self, session_id: SessionId, stored: Optional[Session]) -> Session:
+        """Restore a session from its stored copy, if any, and the stored response.
 
-            # If response does not exist, create it
-            if session.response is None:
-                session.response = await self.response_service.create_response(
-                    session_id.survey_id, session_id.user_id
-                )
+        The survey and the response are looked up concurrently.
+        """
+        session = stored if stored is not None else Session(id=session_id)
 
-        elif session.response.id is not None:
+        if session.response is not None and session.response.id is not None:
             # Faster to look up by id than by survey and user
-            session.response = await self.response_service.get_response(session.response.id)
+            response_lookup = self.response_service.get_response(session.response.id)
+        else:
+            response_lookup = self.response_service.get_response_by_survey_and_user(
+                session_id.survey_id, session_id.user_id
+            )
 
-        await self.session_repository.set_active_session(session_id, session)
+        # Validates if survey exists
+        session.survey, session.response = await asyncio.gather(
+            self.survey_service.get_survey(session_id.survey_id), response_lookup
+        )
+
+        # If response does not exist, create it
+        if session.response is None:
+            session.response = await self.response_service.create_response(
+                session_id.survey_id, session_id.user_id
+            )
 
         return session
 
@@ -65,15 +144,29 @@ class SessionService:
 
     async def deactivate_session(self, session_id: SessionId) -> None:
         """Deactivate a session."""
+        if self.heartbeat is not None:
+            self.heartbeat.untrack(session_id)
         session = await self.session_repository.get_active_session(session_id)
         if session is not None:
             await self.session_repository.set_unactive_session(session_id, session)
             await self.session_repository.delete_active_session(session_id)
+            await self._schedule_reminder(session_id, session)
+
+    async def park_session(self, session_id: SessionId, session: Session) -> None:
+        """Store a loaded session so it can be resumed later, releasing its lease."""
+        await self.session_repository.set_unactive_session(session_id, session)
+        await self.session_repository.delete_active_session(session_id)
+        await self._schedule_reminder(session_id, session)
 
     async def update_session(self, session_id: SessionId, session: Session) -> None:
         """Update a session."""
-        await self.session_repository.set_active_session(session_id, session)
+        await self.session_repository.set_active_session(
+            session_id, session, self._lease_ttl(session)
+        )
 
     async def delete_session(self, session_id: SessionId) -> None:
         """Delete a session."""
+        if self.heartbeat is not None:
+            self.heartbeat.untrack(session_id)
         await self.session_repository.delete_active_session(session_id)
+        await self._cancel_reminder(session_id)
@@ -0,0 +1,90 @@
+"""Service for rebuilding the survey catalog of a node."""
+
+import asyncio
+import fcntl
+import os
+import time
+from typing import Optional
+
+from ..repositories.surveys_repository import SurveyRepository
+from ..repositories.survey_catalog import SurveyCatalog, write_survey_catalog
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class SurveyCatalogRefresher:
+    """Periodically rebuilds the survey catalog from the active surveys.
+
+    The workers of a node share a lock file next to the catalog. The worker holding it
+    rebuilds the catalog every interval, and the others keep trying to take it over, so
+    that another worker leads if the leader dies.
+    """
+
+    def __init__(self, repository: SurveyRepository, catalog: SurveyCatalog, interval: float):
+        self.repository = repository
+        self.catalog = catalog
+        self.interval = interval
+        self._lock_fd: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_leader(self) -> bool:
+        """Whether this worker rebuilds the catalog of the node."""
+        return self._lock_fd is not None
+
+    def _try_lead(self) -> bool:
+        if self._lock_fd is None:
+            fd = os.open(f"{self.catalog.path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return False
+            self._lock_fd = fd
+            logger.info("Rebuilding the survey catalog of this node")
+        return True
+
+    async def refresh(self) -> bool:
+        """Rebuild the catalog if this worker leads, returning whether it was rebuilt."""
+        if not self._try_lead():
+            return False
+        started = time.perf_counter()
+        built_at = time.time()
+        try:
+            surveys = await self.repository.find_active()
+            count = await asyncio.to_thread(
+                write_survey_catalog, self.catalog.path, surveys, built_at
+            )
+        except Exception as e:
+            logger.warning("Failed to rebuild the survey catalog: %s", str(e))
+            return False
+        logger.debug(
+            "Rebuilt the survey catalog of %d surveys in %.3fs",
+            count,
+            time.perf_counter() - started,
+        )
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start the refresh task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the refresh task, giving up the lead."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
@@ -1,9 +1,25 @@
 """Service for managing surveys."""
 
-from typing import List
+import asyncio
+import math
+import os
+import time
+import weakref
+from concurrent.futures import Executor
+from typing import AsyncIterable, List, Optional, Tuple, Union
 
+from .survey_validation import ValidatedSurvey, check_survey_json, validate_survey_batch
 from ..repositories.surveys_repository import SurveyRepository
-from ..models.surveys import Survey, SurveyUpdate, SurveyDB
+from ..repositories.survey_catalog import SurveyCatalog
+from ..models.surveys import (
+    Survey,
+    SurveyUpdate,
+    SurveyDB,
+    SurveyDocument,
+    SurveyImportReport,
+    SurveyImportResult,
+)
+from ..models.types import ImportStatus
 from ..core.exceptions import (
     RepositoryError,
     InvalidSurveyIdError,
@@ -11,22 +27,109 @@ from ..core.exceptions import (
     BusinessRuleError,
     ServiceError,
 )
+from ..core.cache import TTLCache
+from ..core.config import get_settings
+from ..core.process_pool import get_process_pool
+from ..core.metrics import get_metrics
 from ..core.logging import get_logger
 
 logger = get_logger(__name__)
+settings = get_settings()
+metrics = get_metrics()
+
+# Bounds the offloaded validations of each event loop of this worker, so large uploads
+# queue here instead of piling up in the process pool.
+_offloaded_validations = weakref.WeakKeyDictionary()  # Semaphores by event loop
+
+
+def _validation_slots() -> asyncio.Semaphore:
+    """Get the slots for offloaded validations of the running loop, creating them once."""
+    loop = asyncio.get_running_loop()
+    slots = _offloaded_validations.get(loop)
+    if slots is None:
+        slots = _offloaded_validations[loop] = asyncio.Semaphore(
+            settings.SURVEY_VALIDATION_MAX_PENDING
+        )
+    return slots
+
+
+def _release_when_done(loop: asyncio.AbstractEventLoop, slots: asyncio.Semaphore):
+    """Build a callback releasing a slot from the process pool, once the validation ends."""
+
+    def release(_: object) -> None:
+        try:
+            loop.call_soon_threadsafe(slots.release)
+        except RuntimeError:
+            # The loop is closed, and its slots with it
+            pass
+
+    return release
 
 
 class SurveyService:
     """Service for managing surveys."""
 
-    def __init__(self, repository: SurveyRepository):
+    def __init__(
+        self,
+        repository: SurveyRepository,
+        process_pool: Optional[Executor] = None,
+        cache: Optional[TTLCache[SurveyDocument]] = None,
+        catalog: Optional[SurveyCatalog] = None,
+    ):
         self.repository = repository
+        self._process_pool = process_pool
+        self.cache = cache
+        self.catalog = catalog
+
+    @property
+    def process_pool(self) -> Executor:
+        """Executor used for CPU-bound validation."""
+        if self._process_pool is None:
+            self._process_pool = get_process_pool()
+        return self._process_pool
+
+    async def _validate_survey(self, survey: Survey) -> None:
+        """Validate the flow of a survey, in the process pool when the survey is large."""
+        if len(survey.questions) < settings.SURVEY_VALIDATION_OFFLOAD_THRESHOLD:
+            survey.validate_survey_flow()
+            return
+
+        loop = asyncio.get_running_loop()
+        slots = _validation_slots()
+        try:
+            async with asyncio.timeout(settings.SURVEY_VALIDATION_TIMEOUT):
+                await slots.acquire()
+                try:
+                    started = time.perf_counter()
+                    payload = survey.model_dump_json()
+                    pool_future = self.process_pool.submit(check_survey_json, payload)
+                except BaseException:
+                    slots.release()
+                    raise
+                # The slot is held until the process is done, even after timing out here,
+                # so timed out validations still count against the pending ones
+                pool_future.add_done_callback(_release_when_done(loop, slots))
+                loop_time = time.perf_counter() - started
+                error, validation_time = await asyncio.wrap_future(pool_future)
+        except TimeoutError as e:
+            metrics.counter("surveys.validation.offloaded_timeouts").inc()
+            logger.warning("Survey validation timed out: %s", survey.title)
+            raise BusinessRuleError("Survey validation timed out") from e
+
+        metrics.histogram("surveys.validation.offloaded_seconds").observe(validation_time)
+        metrics.histogram("surveys.validation.loop_seconds_saved").observe(
+            max(0.0, validation_time - loop_time)
+        )
+        if error is not None:
+            raise BusinessRuleError(error)
 
     async def create_survey(self, survey: Survey) -> Survey:
         """Create a new survey."""
+        await self._validate_survey(survey)
         try:
             logger.info("Creating new survey: %s", survey.title)
-            survey_db = SurveyDB(**survey.model_dump())
+            # The survey is already validated, so avoid validating it again
+            survey_db = SurveyDB.model_construct(**dict(survey), is_active=True)
             created = await self.repository.insert(survey_db)
             return Survey.model_validate(created)
         except RepositoryError as e:
@@ -34,7 +137,13 @@ class SurveyService:
             raise ServiceError("Failed to create survey") from e
 
     async def get_survey(self, survey_id: str) -> Survey:
-        """Get a survey by ID."""
+        """Get a survey by ID, from the survey catalog of the node when possible."""
+        if self.catalog is not None:
+            survey = self.catalog.get_survey(survey_id)
+            if survey is not None:
+                metrics.counter("surveys.catalog.hits").inc()
+                return survey
+            metrics.counter("surveys.catalog.misses").inc()
         try:
             survey = await self.repository.find_by_id(survey_id)
             if not survey:
@@ -49,6 +158,55 @@ class SurveyService:
             logger.error("Failed to get survey: %s", e.message, exc_info=True)
             raise ServiceError("Failed to get survey") from e
 
+    async def get_survey_document(self, survey_id: str) -> SurveyDocument:
+        """Get a survey serialized as JSON, from the cache when possible.
+
+        Updates and deletes through this worker invalidate its cache right away; other
+        workers serve their cached copy for at most SURVEY_CACHE_TTL seconds, or
+        SURVEY_CATALOG_REFRESH_INTERVAL seconds when served from the survey catalog.
+        """
+        if self.catalog is not None:
+            document = self.catalog.get_document(survey_id)
+            if document is not None:
+                metrics.counter("surveys.catalog.hits").inc()
+                return document
+
+        if self.cache is not None:
+            document = self.cache.get(survey_id)
+            if document is not None:
+                metrics.counter("surveys.cache.hits").inc()
+                return document
+            metrics.counter("surveys.cache.misses").inc()
+
+        survey = await self.get_survey(survey_id)
+        document = SurveyDocument.from_survey(survey)
+        if self.cache is not None:
+            self.cache.set(survey_id, document)
+        return document
+
+    async def preload_survey(self, survey_id: str) -> None:
+        """Load a survey into the cache and compile its expressions.
+
+        Compiling warms the caches shared by every copy of the survey, so the first chats
+        do not pay for them. Surveys of the catalog are left as they are, since they are
+        shared by the workers of the node and their questions are loaded on demand.
+        """
+        if self.catalog is not None and self.catalog.get_survey(survey_id) is not None:
+            return
+        survey = await self.get_survey(survey_id)
+        for question_id, question in survey.questions.items():
+            if question.expression_next:
+                survey.get_question(question_id)
+        if self.cache is not None:
+            self.cache.set(survey_id, SurveyDocument.from_survey(survey))
+
+    def _invalidate(self, survey_id: str) -> None:
+        """Drop a survey from the cache and the catalog after it changed."""
+        if self.cache is not None:
+            self.cache.invalidate(survey_id)
+        if self.catalog is not None:
+            self.catalog.invalidate(survey_id)
+
     async def list_surveys(self) -> List[Survey]:
         """List all surveys."""
         try:
@@ -72,14 +230,14 @@ class SurveyService:
                 raise ResourceNotFoundError(msg)
 
             # Validate the update maintains survey integrity
-            if not survey.validate_partial_update(current):
-                msg = "Update would break survey flow integrity"
-                logger.warning("Survey integrity error: %s", msg)
-                raise BusinessRuleError(msg)
+            merged = survey.merge_questions(current)
+            if merged is not None:
+                await self._validate_survey(merged)
 
             # Prepare and perform update
             update_dict = survey.model_dump(exclude_unset=True)
             updated = await self.repository.update(survey_id, update_dict)
+            self._invalidate(survey_id)
             if not updated:
                 msg = f"Survey not found: {survey_id}"
                 logger.debug(msg)
@@ -99,6 +257,7 @@ class SurveyService:
         try:
             logger.info("Deleting survey: %s", survey_id)
             deleted = await self.repository.soft_delete(survey_id)
+            self._invalidate(survey_id)
             if not deleted:
                 msg = f"Survey not found: {survey_id}"
                 logger.debug(msg)
@@ -110,3 +269,87 @@ class SurveyService:
         except RepositoryError as e:
             logger.error("Failed to delete survey: %s", e.message, exc_info=True)
             raise ServiceError("Failed to delete survey") from e
+
+    async def import_surveys(self, lines: AsyncIterable[Union[str, bytes]]) -> SurveyImportReport:
+        """Import surveys from NDJSON lines, validating them in parallel and inserting in bulk.
+
+        Lines may be left undecoded, so that invalid UTF-8 is reported as an invalid line.
+        """
+        report = SurveyImportReport()
+        batch: List[Tuple[int, Union[str, bytes]]] = []
+        line_number = 0
+
+        async for line in lines:
+            line_number += 1
+            if not line.strip():
+                continue
+            batch.append((line_number, line))
+            if len(batch) >= settings.SURVEY_IMPORT_BATCH_SIZE:
+                await self._import_batch(batch, report)
+                batch = []
+
+        if batch:
+            await self._import_batch(batch, report)
+
+        report.results.sort(key=lambda result: result.line)
+        logger.info(
+            "Imported surveys: %d created, %d invalid, %d failed",
+            report.created,
+            report.invalid,
+            report.failed,
+        )
+        return report
+
+    async def _validate_batch(self, raws: List[Union[str, bytes]]) -> List[ValidatedSurvey]:
+        """Validate surveys across the process pool, one chunk per worker."""
+        workers = settings.PROCESS_POOL_WORKERS or os.cpu_count() or 1
+        chunk_size = math.ceil(len(raws) / workers)
+        loop = asyncio.get_running_loop()
+        chunks = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    self.process_pool, validate_survey_batch, raws[i : i + chunk_size]
+                )
+                for i in range(0, len(raws), chunk_size)
+            )
+        )
+        return [validated for chunk in chunks for validated in chunk]
+
+    async def _import_batch(
+        self, batch: List[Tuple[int, Union[str, bytes]]], report: SurveyImportReport
+    ) -> None:
+        """Validate and insert a batch of surveys, adding their results to the report."""
+        validated = await self._validate_batch([raw for _, raw in batch])
+
+        valid: List[Tuple[int, SurveyDB]] = []
+        for (line_number, _), (survey, error) in zip(batch, validated):
+            if survey is None:
+                report.add(
+                    SurveyImportResult(line=line_number, status=ImportStatus.INVALID, error=error)
+                )
+            else:
+                valid.append((line_number, survey))
+
+        if not valid:
+            return
+
+        try:
+            created = await self.repository.insert_many([survey for _, survey in valid])
+        except RepositoryError as e:
+            logger.error("Failed to insert survey batch: %s", e.message, exc_info=True)
+            for line_number, _ in valid:
+                report.add(
+                    SurveyImportResult(
+                        line=line_number,
+                        status=ImportStatus.FAILED,
+                        error="Failed to insert survey",
+                    )
+                )
+            return
+
+        for (line_number, _), survey in zip(valid, created):
+            report.add(
+                SurveyImportResult(
+                    line=line_number, status=ImportStatus.CREATED, survey_id=survey.id
+                )
+            )
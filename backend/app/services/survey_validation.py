@@ -0,0 +1,59 @@
+"""Survey validation functions, runnable in worker processes."""
+
+import time
+from typing import List, Optional, Tuple, Union
+
+from pydantic import ValidationError as PydanticValidationError
+
+from ..models.surveys import Survey, SurveyDB
+from ..core.exceptions import BusinessRuleError
+
+ValidatedSurvey = Tuple[Optional[SurveyDB], Optional[str]]
+
+
+def _format_validation_error(error: PydanticValidationError) -> str:
+    """Summarize a pydantic validation error in a single line."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc']) or 'survey'}: {err['msg']}"
+        for err in error.errors()
+    )
+
+
+def _parse_and_validate(raw: Union[str, bytes]) -> Survey:
+    """Parse a JSON survey, decoding it from UTF-8 if needed, and validate its flow."""
+    if isinstance(raw, bytes):
+        try:
+            raw = raw.decode()
+        except UnicodeDecodeError as e:
+            raise BusinessRuleError(f"survey: invalid UTF-8 at byte {e.start}") from e
+    try:
+        survey = Survey.model_validate_json(raw)
+    except PydanticValidationError as e:
+        raise BusinessRuleError(_format_validation_error(e)) from e
+    survey.validate_survey_flow()
+    return survey
+
+
+def validate_survey_json(raw: Union[str, bytes]) -> ValidatedSurvey:
+    """Parse and validate a JSON survey, returning the survey or the validation error."""
+    try:
+        survey = _parse_and_validate(raw)
+    except BusinessRuleError as e:
+        return None, e.message
+    return SurveyDB(**survey.model_dump()), None
+
+
+def check_survey_json(raw: str) -> Tuple[Optional[str], float]:
+    """Validate a JSON survey, returning the validation error, if any, and the time it took."""
+    started = time.perf_counter()
+    try:
+        _parse_and_validate(raw)
+        error = None
+    except BusinessRuleError as e:
+        error = e.message
+    return error, time.perf_counter() - started
+
+
+def validate_survey_batch(raws: List[Union[str, bytes]]) -> List[ValidatedSurvey]:
+    """Validate a batch of JSON surveys, to amortize the cost of a worker round trip."""
+    return [validate_survey_json(raw) for raw in raws]
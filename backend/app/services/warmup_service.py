@@ -0,0 +1,90 @@
+"""Service for warming a new worker up before it reports ready."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Mapping, Optional
+
+from .response_service import ResponseService
+from .survey_service import SurveyService
+from ..core.logging import get_logger
+from ..core.startup import Startup
+
+logger = get_logger(__name__)
+
+
+class WarmupService:
+    """Opens the connection pools and preloads the busiest surveys of a new worker.
+
+    Every backing store is pinged, so its pool has a connection ready, then the surveys
+    with the most recent responses are loaded and compiled. Each step is timed as a
+    startup phase. Failed steps are logged and skipped: the worker reports ready once
+    warmup is over, or after the timeout, since the first chats then pay the cold cost.
+    """
+
+    def __init__(
+        self,
+        survey_service: SurveyService,
+        response_service: ResponseService,
+        pings: Mapping[str, Callable[[], Awaitable[Any]]],
+        startup: Startup,
+        surveys: int,
+        activity_window: float,
+        timeout: float,
+    ):
+        self.survey_service = survey_service
+        self.response_service = response_service
+        self.pings = pings
+        self.startup = startup
+        self.surveys = surveys
+        self.activity_window = activity_window
+        self.timeout = timeout
+        self._task: Optional[asyncio.Task] = None
+
+    async def _ping(self, name: str, ping: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            with self.startup.phase(f"ping_{name}"):
+                await ping()
+        except Exception as e:
+            logger.warning("Warmup ping of %s failed: %s", name, str(e))
+
+    async def _preload_surveys(self) -> None:
+        try:
+            with self.startup.phase("preload_surveys"):
+                survey_ids = await self.response_service.get_most_active_surveys(
+                    self.activity_window, self.surveys
+                )
+                results = await asyncio.gather(
+                    *(self.survey_service.preload_survey(survey_id) for survey_id in survey_ids),
+                    return_exceptions=True,
+                )
+        except Exception as e:
+            logger.warning("Warmup preload of surveys failed: %s", str(e))
+            return
+        failed = sum(isinstance(result, Exception) for result in results)
+        logger.info("Preloaded %d surveys, %d failed", len(results) - failed, failed)
+
+    async def run(self) -> None:
+        """Warm the worker up, then report it as ready."""
+        try:
+            async with asyncio.timeout(self.timeout):
+                await asyncio.gather(*(self._ping(name, ping) for name, ping in self.pings.items()))
+                if self.surveys > 0:
+                    await self._preload_surveys()
+        except TimeoutError:
+            logger.warning("Warmup did not finish in %.1fs", self.timeout)
+        self.startup.mark_ready()
+
+    def start(self) -> None:
+        """Start warming up in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stop warming up, if still running."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
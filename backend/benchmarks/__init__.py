@@ -0,0 +1 @@
+"""Benchmarks of hot paths, run as modules from the backend directory."""
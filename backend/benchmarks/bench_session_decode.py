@@ -0,0 +1,89 @@
+"""Benchmark of reading a session back from Redis, once per message.
+
+Compares the full validation of the session JSON with the trusted load of sessions
+encoded with checksums, on a survey of --questions questions with --answers answers.
+
+Usage, from the backend directory:
+
+    python -m benchmarks.bench_session_decode --questions 50 --answers 20 --runs 2000
+"""
+
+import argparse
+import json
+import time
+
+from app.core.cache import TTLCache
+from app.models.responses import QuestionResponse, SurveyResponse
+from app.models.sessions import Session, SessionId
+from app.models.surveys import Question, QuestionOption, Survey
+from app.models.types import QuestionType
+from app.repositories.redis.session_codec import SessionCodec
+
+
+def _session(questions: int, answers: int) -> Session:
+    survey = Survey(
+        _id="survey1",
+        title="Benchmark",
+        description="Session decode benchmark",
+        first_question_id="q0",
+        questions={
+            f"q{i}": Question(
+                id=f"q{i}",
+                type=QuestionType.MULTIPLE_CHOICE,
+                text=f"Question {i}?",
+                options=[QuestionOption(id=f"o{j}", text=f"Option {j}") for j in range(5)],
+                default_next_question_id=f"q{i + 1}" if i + 1 < questions else None,
+                is_terminal=i + 1 == questions,
+            )
+            for i in range(questions)
+        },
+    )
+    response = SurveyResponse(
+        _id="response1",
+        survey_id="survey1",
+        user_id="user1",
+        current_question_id=f"q{answers}",
+        answers={
+            f"q{i}": QuestionResponse(
+                question_id=f"q{i}",
+                question_type=QuestionType.MULTIPLE_CHOICE,
+                response_value="o1",
+                next_question_id=f"q{i + 1}",
+            )
+            for i in range(answers)
+        },
+    )
+    return Session(
+        id=SessionId(user_id="user1", survey_id="survey1"), survey=survey, response=response
+    )
+
+
+def _measure(decode, data: str, runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        decode(data)
+    return (time.perf_counter() - start) / runs * 1e6
+
+
+def main(questions: int, answers: int, runs: int) -> None:
+    """Measure and report decoding a session with and without the codec."""
+    session = _session(questions, answers)
+    codec = SessionCodec(TTLCache(16, float("inf")))
+    plain = json.dumps(session.model_dump(mode="json", exclude_none=True))
+    encoded = codec.encode(session)
+
+    before = _measure(lambda data: Session.model_validate(json.loads(data)), plain, runs)
+    after = _measure(codec.decode, encoded, runs)
+
+    print(f"Session decode, {questions} questions, {answers} answers, {runs} runs")
+    print(f"{'validated':<12} {before:8.1f} us")
+    print(f"{'trusted':<12} {after:8.1f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--questions", type=int, default=50, help="Questions of the survey")
+    parser.add_argument("--answers", type=int, default=20, help="Answers of the response")
+    parser.add_argument("--runs", type=int, default=2000, help="Decodes to measure")
+    args = parser.parse_args()
+    main(args.questions, args.answers, args.runs)
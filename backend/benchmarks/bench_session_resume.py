@@ -0,0 +1,199 @@
+"""Benchmark of the session resume path on reconnect.
+
+Compares the previous sequential resume (Redis GET active, Mongo survey find, Redis GET
+inactive, Redis DEL inactive, Mongo response find, Redis SETEX) with the current one
+(one Redis claim, concurrent Mongo lookups, one Redis SETEX), using in-memory stand-ins
+that sleep for a configurable round trip time.
+
+Usage, from the backend directory:
+
+    python -m benchmarks.bench_session_resume --redis-rtt 0.5 --mongo-rtt 2 --runs 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, Optional, Tuple
+
+from app.models.responses import SurveyResponse
+from app.models.sessions import Session, SessionId
+from app.models.surveys import Question, Survey
+from app.models.types import QuestionType
+from app.services.session_service import SessionService
+
+
+class LatencyRedisSessions:
+    """Session repository stand-in where every call costs one Redis round trip."""
+
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+        self.active: Dict[SessionId, Session] = {}
+        self.inactive: Dict[SessionId, Session] = {}
+
+    async def _round_trip(self) -> None:
+        await asyncio.sleep(self.rtt)
+
+    async def claim_session(
+        self, session_id: SessionId, ttl: Optional[int] = None
+    ) -> Tuple[bool, Optional[Session]]:
+        """Claim a session, moving its inactive copy to the active ones."""
+        await self._round_trip()
+        if session_id in self.active:
+            return True, self.active[session_id]
+        session = self.inactive.pop(session_id, None)
+        if session is not None:
+            self.active[session_id] = session
+        return False, session
+
+    async def get_active_session(self, session_id: SessionId) -> Optional[Session]:
+        """Get an active session by ID."""
+        await self._round_trip()
+        return self.active.get(session_id)
+
+    async def get_unactive_session(self, session_id: SessionId) -> Optional[Session]:
+        """Get an inactive session by ID."""
+        await self._round_trip()
+        return self.inactive.get(session_id)
+
+    async def delete_unactive_session(self, session_id: SessionId) -> None:
+        """Delete an inactive session."""
+        await self._round_trip()
+        self.inactive.pop(session_id, None)
+
+    async def set_active_session(
+        self, session_id: SessionId, session: Session, ttl: Optional[int] = None
+    ) -> None:
+        """Set a session as active."""
+        await self._round_trip()
+        self.active[session_id] = session
+
+    async def delete_active_session(self, session_id: SessionId) -> None:
+        """Delete an active session."""
+        await self._round_trip()
+        self.active.pop(session_id, None)
+
+
+class LatencySurveys:
+    """Survey service stand-in where every lookup costs one Mongo round trip."""
+
+    def __init__(self, rtt: float, survey: Survey):
+        self.rtt = rtt
+        self.survey = survey
+
+    async def get_survey(self, survey_id: str) -> Survey:
+        """Get the benchmark survey."""
+        await asyncio.sleep(self.rtt)
+        return self.survey
+
+
+class LatencyResponses:
+    """Response service stand-in where every lookup costs one Mongo round trip."""
+
+    def __init__(self, rtt: float, response: SurveyResponse):
+        self.rtt = rtt
+        self.response = response
+
+    async def get_response(self, response_id: str) -> SurveyResponse:
+        """Get the benchmark response by its id."""
+        await asyncio.sleep(self.rtt)
+        return self.response
+
+    async def get_response_by_survey_and_user(
+        self, survey_id: str, user_id: str
+    ) -> Optional[SurveyResponse]:
+        """Get the benchmark response by its survey and user."""
+        await asyncio.sleep(self.rtt)
+        return self.response
+
+
+async def sequential_resume(
+    sessions: LatencyRedisSessions,
+    surveys: LatencySurveys,
+    responses: LatencyResponses,
+    session_id: SessionId,
+) -> Session:
+    """The resume path as it was before claims and concurrent lookups."""
+    session = await sessions.get_active_session(session_id)
+    if session is not None:
+        return session
+    survey = await surveys.get_survey(session_id.survey_id)
+    session = await sessions.get_unactive_session(session_id)
+    if session is not None:
+        await sessions.delete_unactive_session(session_id)
+    else:
+        session = Session(id=session_id)
+    session.survey = survey
+    if session.response is not None and session.response.id is not None:
+        session.response = await responses.get_response(session.response.id)
+    else:
+        session.response = await responses.get_response_by_survey_and_user(
+            session_id.survey_id, session_id.user_id
+        )
+    await sessions.set_active_session(session_id, session)
+    return session
+
+
+def _fixtures() -> Tuple[Survey, SurveyResponse]:
+    survey = Survey(
+        _id="survey1",
+        title="Benchmark",
+        description="Session resume benchmark",
+        first_question_id="q1",
+        questions={"q1": Question(id="q1", type=QuestionType.TEXT, text="Hi", is_terminal=True)},
+    )
+    response = SurveyResponse(
+        _id="response1", survey_id="survey1", user_id="user1", current_question_id="q1"
+    )
+    return survey, response
+
+
+async def _measure(resume, sessions: LatencyRedisSessions, runs: int) -> list:
+    survey, response = _fixtures()
+    session_id = SessionId(user_id="user1", survey_id="survey1")
+    timings = []
+    for _ in range(runs):
+        # Every run reconnects a session parked by a previous connection
+        sessions.active.clear()
+        sessions.inactive[session_id] = Session(id=session_id, survey=survey, response=response)
+        start = time.perf_counter()
+        await resume(session_id)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _report(name: str, timings: list) -> None:
+    timings = sorted(timings)
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(f"{name:<12} mean {statistics.mean(timings):7.2f} ms   p99 {p99:7.2f} ms")
+
+
+async def main(redis_rtt: float, mongo_rtt: float, runs: int) -> None:
+    """Measure and report both resume paths."""
+    survey, response = _fixtures()
+    surveys = LatencySurveys(mongo_rtt / 1000, survey)
+    responses = LatencyResponses(mongo_rtt / 1000, response)
+
+    before_sessions = LatencyRedisSessions(redis_rtt / 1000)
+    before = await _measure(
+        lambda session_id: sequential_resume(before_sessions, surveys, responses, session_id),
+        before_sessions,
+        runs,
+    )
+
+    after_sessions = LatencyRedisSessions(redis_rtt / 1000)
+    service = SessionService(after_sessions, surveys, responses)
+    after = await _measure(service.get_active_session, after_sessions, runs)
+
+    print(f"Reconnect latency, Redis RTT {redis_rtt} ms, Mongo RTT {mongo_rtt} ms, {runs} runs")
+    _report("before", before)
+    _report("after", after)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--redis-rtt", type=float, default=0.5, help="Redis round trip, in ms")
+    parser.add_argument("--mongo-rtt", type=float, default=2.0, help="Mongo round trip, in ms")
+    parser.add_argument("--runs", type=int, default=200, help="Reconnects to measure")
+    args = parser.parse_args()
+    asyncio.run(main(args.redis_rtt, args.mongo_rtt, args.runs))
@@ -0,0 +1,81 @@
+"""Tests for the wire formats of the chat websocket"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.core.exceptions import BusinessRuleError
+from app.core.chat_protocols import (
+    MSGPACK_SUBPROTOCOL,
+    QUESTION,
+    MsgpackChatProtocol,
+    TextChatProtocol,
+    select_protocol,
+)
+from app.models.surveys import Question, QuestionOption
+from app.models.types import QuestionType
+
+msgpack = pytest.importorskip("msgpack")
+
+
+@pytest.fixture
+def websocket():
+    """Mock websocket offering the msgpack subprotocol."""
+    socket = MagicMock()
+    socket.scope = {"subprotocols": ["chat.v0", MSGPACK_SUBPROTOCOL]}
+    socket.send_bytes = AsyncMock()
+    socket.send_text = AsyncMock()
+    return socket
+
+
+@pytest.fixture
+def question():
+    """Multiple choice question."""
+    return Question(
+        id="q1",
+        type=QuestionType.MULTIPLE_CHOICE,
+        text="What is your favorite color?",
+        options=[QuestionOption(id="red", text="Red"), QuestionOption(id="blue", text="Blue")],
+    )
+
+
+def test_msgpack_is_negotiated_only_when_offered(websocket):
+    """Test that clients get msgpack frames only if they offer the subprotocol."""
+    assert isinstance(select_protocol(websocket), MsgpackChatProtocol)
+
+    websocket.scope = {"subprotocols": []}
+    assert isinstance(select_protocol(websocket), TextChatProtocol)
+
+
+async def test_question_frames_are_structured(websocket, question):
+    """Test that questions are sent with their id, type and options, replying to the answer."""
+    # Setup
+    protocol = MsgpackChatProtocol()
+
+    # Execute
+    await protocol.send(websocket, QUESTION, question=question, reply_to="m1")
+
+    # Assert
+    frame = msgpack.unpackb(websocket.send_bytes.call_args.args[0])
+    assert frame == {
+        "k": "question",
+        "i": 1,
+        "r": "m1",
+        "q": {
+            "i": "q1",
+            "t": "multiple_choice",
+            "x": "What is your favorite color?",
+            "o": [["red", "Red"], ["blue", "Blue"]],
+        },
+    }
+
+
+def test_answer_frames_are_parsed():
+    """Test that answers carry their client message id, and malformed frames are rejected."""
+    protocol = MsgpackChatProtocol()
+
+    assert protocol.parse(msgpack.packb({"text": "red", "message_id": "m1"})) == ("red", "m1")
+    with pytest.raises(BusinessRuleError):
+        protocol.parse(b"\xc1")
+    with pytest.raises(BusinessRuleError):
+        protocol.parse(msgpack.packb(["red"]))
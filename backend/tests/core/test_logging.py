@@ -0,0 +1,78 @@
+"""Tests for the logging pipeline."""
+
+import sys
+import json
+import queue
+import logging
+
+from app.core.logging import (
+    JsonFormatter,
+    NonBlockingQueueHandler,
+    RateLimitFilter,
+    SamplingFilter,
+    get_dropped_records,
+)
+
+
+def _record(name: str = "app.services.chats_service", level: int = logging.INFO):
+    return logging.LogRecord(name, level, __file__, 1, "Message %s", ("arg",), None)
+
+
+def test_json_formatter():
+    """Test that records are formatted as JSON objects."""
+    entry = json.loads(JsonFormatter().format(_record()))
+
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "app.services.chats_service"
+    assert entry["message"] == "Message arg"
+
+
+def test_rate_limit_filter_limits_matching_loggers():
+    """Test that the rate limit applies to the loggers under the configured prefix."""
+    rate_filter = RateLimitFilter({"app.services": 0.0}, burst=2)
+
+    assert [rate_filter.filter(_record()) for _ in range(3)] == [True, True, False]
+    assert rate_filter.filter(_record(name="app.routers.chats_router"))
+    assert rate_filter.filter(_record(level=logging.ERROR))
+
+
+def test_sampling_filter():
+    """Test that sampled out records are dropped, but never warnings."""
+    sampling_filter = SamplingFilter({"app": 0.0})
+
+    assert not sampling_filter.filter(_record())
+    assert sampling_filter.filter(_record(level=logging.WARNING))
+    assert sampling_filter.filter(_record(name="uvicorn.access"))
+
+
+def test_queue_handler_drops_records_when_full():
+    """Test that a full queue drops records instead of blocking."""
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    dropped = get_dropped_records()
+
+    handler.handle(_record())
+    handler.handle(_record())
+
+    assert handler.queue.qsize() == 1
+    assert get_dropped_records() == dropped + 1
+
+
+def test_queue_handler_prepares_records_without_arguments_or_tracebacks():
+    """Test that queued records keep their message and traceback, but not their references."""
+    handler = NonBlockingQueueHandler(queue.Queue())
+    args = ["before"]
+    try:
+        raise ValueError("Failed")
+    except ValueError:
+        record = logging.LogRecord(
+            "app", logging.ERROR, __file__, 1, "Value %s", (args,), sys.exc_info()
+        )
+
+    handler.handle(record)
+    args[0] = "after"
+    prepared = handler.queue.get_nowait()
+    entry = json.loads(JsonFormatter().format(prepared))
+
+    assert prepared.args is None and prepared.exc_info is None
+    assert entry["message"] == "Value ['before']"
+    assert "ValueError: Failed" in entry["exception"]
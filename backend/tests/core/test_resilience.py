@@ -0,0 +1,148 @@
+"""Tests for deadlines, retries and circuit breakers"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.core.exceptions import TemporarilyUnavailableError, ResourceNotFoundError
+from app.core.metrics import get_metrics
+from app.core.resilience import (
+    CircuitBreaker,
+    ResilientRepository,
+    RetryPolicy,
+    deadline,
+)
+
+
+class FaultyStore:
+    """Repository stand-in failing or stalling its next calls as instructed."""
+
+    def __init__(self):
+        self.faults = []
+        self.calls = 0
+
+    async def _serve(self, value):
+        self.calls += 1
+        fault = self.faults.pop(0) if self.faults else None
+        if isinstance(fault, float):
+            await asyncio.sleep(fault)
+        elif fault is not None:
+            raise fault
+        return value
+
+    async def find(self, key):
+        """Find a key, as instructed by the next fault."""
+        return await self._serve(key)
+
+    async def insert(self, key):
+        """Insert a key, as instructed by the next fault."""
+        return await self._serve(key)
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        """Get the current time."""
+        return self.now
+
+
+@pytest.fixture
+def store():
+    """Create a faulty store."""
+    return FaultyStore()
+
+
+@pytest.fixture
+def clock():
+    """Create a fake clock."""
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(request, clock):
+    """Create a circuit breaker named after the test."""
+    return CircuitBreaker(request.node.name, failure_threshold=2, reset_timeout=10, clock=clock)
+
+
+@pytest.fixture
+def repository(store, breaker):
+    """Wrap the faulty store."""
+    return ResilientRepository(
+        store,
+        breaker,
+        timeout=0.05,
+        retry=RetryPolicy(attempts=3, base_delay=0.001, max_delay=0.002),
+        idempotent={"find"},
+        transient_errors=(ConnectionError,),
+    )
+
+
+async def test_idempotent_calls_are_retried(repository, store, breaker):
+    """Test that transient errors and timeouts of idempotent calls are retried."""
+    store.faults = [ConnectionError("failover"), 1.0]
+
+    assert await repository.find("survey1") == "survey1"
+    assert store.calls == 3
+    assert get_metrics().counter(f"resilience.{breaker.name}.retries").value == 2
+
+
+async def test_other_calls_are_not_retried(repository, store):
+    """Test that non-idempotent calls fail after a single attempt."""
+    store.faults = [ConnectionError("failover")]
+
+    with pytest.raises(TemporarilyUnavailableError):
+        await repository.insert("survey1")
+    assert store.calls == 1
+
+
+async def test_application_errors_are_raised_unchanged(repository, store, breaker):
+    """Test that errors from a responsive store are neither retried nor counted."""
+    store.faults = [ResourceNotFoundError("missing")]
+
+    with pytest.raises(ResourceNotFoundError):
+        await repository.find("survey1")
+    assert store.calls == 1
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+async def test_breaker_fails_fast_then_probes(repository, store, breaker, clock):
+    """Test that the breaker opens after failed calls, then lets a single probe through."""
+    store.faults = [ConnectionError("down")] * 2
+
+    for _ in range(2):
+        with pytest.raises(TemporarilyUnavailableError):
+            await repository.insert("survey1")
+    assert breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(TemporarilyUnavailableError, match="unavailable"):
+        await repository.find("survey1")
+    assert store.calls == 2
+    assert get_metrics().gauge(f"resilience.{breaker.name}.breaker_state").value == 2
+
+    clock.now += 10
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert await repository.find("survey1") == "survey1"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+async def test_deadline_bounds_all_attempts(store, breaker):
+    """Test that retries stop when the message budget is spent."""
+    repository = ResilientRepository(
+        store,
+        breaker,
+        timeout=1.0,
+        retry=RetryPolicy(attempts=5, base_delay=0.001, max_delay=0.002),
+        idempotent={"find"},
+    )
+    store.faults = [1.0] * 5
+
+    start = time.monotonic()
+    with deadline(0.1):
+        with pytest.raises(TemporarilyUnavailableError):
+            await repository.find("survey1")
+    assert time.monotonic() - start < 0.5
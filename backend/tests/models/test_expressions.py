@@ -0,0 +1,137 @@
+"""Test cases for the routing expression language."""
+
+import pytest
+
+from app.models.expressions import (
+    AnswerTypes,
+    compile_expression,
+    NUMBER,
+    TEXT,
+    DATE,
+    BOOLEAN,
+)
+from app.models.sessions import Session, SessionId
+from app.models.responses import SurveyResponse, QuestionResponse
+from app.models.surveys import Survey, Question, ExpressionCondition
+from app.models.types import QuestionType
+from app.core.exceptions import BusinessRuleError
+
+ANSWER_TYPES = {"q1": BOOLEAN, "q2": TEXT, "q3": NUMBER, "q4": DATE}
+
+
+def test_expressions_combine_earlier_answers():
+    """Test boolean operators, comparisons and membership over the answer index."""
+    evaluate = compile_expression(
+        'q3 > 5 and q1 == "yes" or not (q2 in ["a", "b"]) and q4 < "2000-01-01"',
+        ANSWER_TYPES,
+    )
+
+    assert evaluate({"q1": True, "q3": 6.0})
+    assert not evaluate({"q1": False, "q3": 6.0, "q2": "a"})
+    assert evaluate({"q2": "c", "q4": "1999-12-31"})
+    assert not evaluate({"q2": "c", "q4": "2000-01-01"})
+
+
+def test_unanswered_questions_make_comparisons_false():
+    """Test that missing answers never match a comparison."""
+    assert not compile_expression("q3 != 5", ANSWER_TYPES)({})
+    assert compile_expression("not q3 == 5", ANSWER_TYPES)({})
+    assert not compile_expression("q1", ANSWER_TYPES)({})
+
+
+def test_compiled_expressions_are_cached():
+    """Test that the same expression over the same answer types compiles once."""
+    assert compile_expression("q3 >= 1", ANSWER_TYPES) is compile_expression(
+        "q3 >= 1", dict(ANSWER_TYPES)
+    )
+    assert compile_expression("q3 >= 1", AnswerTypes(ANSWER_TYPES)) is compile_expression(
+        "q3 >= 1", ANSWER_TYPES
+    )
+
+
+@pytest.mark.parametrize(
+    "source, error",
+    [
+        ("q3 > ", "unexpected end"),
+        ("q3 > 5 5", "unexpected '5'"),
+        ("q9 == 1", "question q9 not found"),
+        ('q3 == "five"', "cannot compare a number answer"),
+        ('q2 > "a"', "only support == and !="),
+        ('q4 == "yesterday"', "invalid date"),
+        ("q3", "expected a condition"),
+        ("q3 in [1, q3]", "'in' lists must contain number literals"),
+        ("q3 @ 1", "unexpected character"),
+        ("(" * 300 + "q1" + ")" * 300, "nested too deeply"),
+        ("not " * 200 + "q1", "nested too deeply"),
+    ],
+)
+def test_invalid_expressions_are_rejected(source, error):
+    """Test that syntax and type errors are reported at compile time."""
+    with pytest.raises(BusinessRuleError, match=error):
+        compile_expression(source, ANSWER_TYPES)
+
+
+def test_nesting_up_to_the_limit_is_accepted():
+    """Test that expressions nested within the limit, or long but flat, compile."""
+    assert compile_expression("(" * 16 + "not q1" + ")" * 16, ANSWER_TYPES)({"q1": False})
+    assert compile_expression(" or ".join(["q1"] * 200), ANSWER_TYPES)({"q1": True})
+
+
+def _survey(when: str) -> Survey:
+    return Survey(
+        title="Expressions",
+        description="Routing on earlier answers",
+        first_question_id="q1",
+        questions={
+            "q1": Question(
+                id="q1", type=QuestionType.BOOLEAN, text="Member?", default_next_question_id="q3"
+            ),
+            "q3": Question(
+                id="q3",
+                type=QuestionType.NUMBER,
+                text="Visits?",
+                default_next_question_id="regular",
+                expression_next=[ExpressionCondition(when=when, next_question_id="vip")],
+            ),
+            "regular": Question(id="regular", type=QuestionType.TEXT, text="Hi", is_terminal=True),
+            "vip": Question(id="vip", type=QuestionType.TEXT, text="Welcome", is_terminal=True),
+        },
+    )
+
+
+def test_expressions_are_type_checked_with_the_survey_flow():
+    """Test that survey validation rejects expressions that do not type-check."""
+    assert _survey('q3 > 5 and q1 == "yes"').validate_survey_flow()
+    with pytest.raises(BusinessRuleError, match="cannot compare a boolean answer"):
+        _survey("q1 == 5").validate_survey_flow()
+
+
+def test_expression_next_is_evaluated_before_default():
+    """Test that expressions route with the answer index, including the current answer."""
+    survey = _survey('q3 > 5 and q1 == "yes"')
+    question = survey.get_question("q3")
+
+    assert question.get_next_question("6", {"q1": True, "q3": 6.0}) == "vip"
+    assert question.get_next_question("6", {"q1": False, "q3": 6.0}) == "regular"
+    assert question.get_next_question("6") == "regular"
+
+
+def test_session_answer_index_is_built_from_stored_answers():
+    """Test that the index holds normalized answers, rebuilt from the response once."""
+    session = Session(
+        id=SessionId(user_id="user123", survey_id="survey123"),
+        survey=_survey("q3 > 5"),
+        response=SurveyResponse(
+            survey_id="survey123",
+            answers=[
+                QuestionResponse(
+                    question_id="q1", question_type=QuestionType.BOOLEAN, response_value=True
+                ),
+                QuestionResponse(
+                    question_id="q3", question_type=QuestionType.NUMBER, response_value="7"
+                ),
+            ],
+        ),
+    )
+
+    assert session.get_answer_index() == {"q1": True, "q3": 7.0}
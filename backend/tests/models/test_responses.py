@@ -0,0 +1,64 @@
+"""Test cases for survey response models."""
+
+import pytest
+
+from app.models.responses import SurveyResponse, QuestionResponse, processed_message_key
+from app.models.types import QuestionType
+from app.repositories.responses_repository import build_answers_filter, build_answers_update
+
+
+def test_answer_lists_are_keyed_by_question_id():
+    """Test that responses stored with an answers list keep the latest answer per question."""
+    response = SurveyResponse.model_validate({
+        "_id": "response123",
+        "survey_id": "survey123",
+        "answers": [
+            {"question_id": "q1", "question_type": "text", "response_value": "Jon"},
+            {"question_id": "q2", "question_type": "number", "response_value": 30},
+            {"question_id": "q1", "question_type": "text", "response_value": "John"},
+        ],
+    })
+
+    assert response.answers["q1"].response_value == "John"
+    assert response.answer_path == ["q1", "q2"]
+
+
+def test_answers_update_sets_answers_by_question_id():
+    """Test that the update replaces answers by question id and grows the path once."""
+    answer = QuestionResponse(
+        question_id="q1", question_type=QuestionType.TEXT, response_value="John",
+        next_question_id="q2"
+    )
+
+    update = build_answers_update([answer, answer], next_question_id="q2")
+
+    assert update["$set"]["answers.q1"]["response_value"] == "John"
+    assert update["$set"]["current_question_id"] == "q2"
+    assert "completed_at" not in update["$set"]
+    assert update["$addToSet"] == {"answer_path": {"$each": ["q1"]}}
+
+
+@pytest.mark.parametrize("question_id", ["q1.value", "$where", "answers.$"])
+def test_answers_update_rejects_question_ids_read_as_paths(question_id):
+    """Test that question ids MongoDB would read as paths or operators are rejected."""
+    answer = QuestionResponse(
+        question_id=question_id, question_type=QuestionType.TEXT, response_value="John"
+    )
+
+    with pytest.raises(ValueError):
+        build_answers_update([answer])
+
+
+def test_answers_update_records_the_message_its_filter_excludes():
+    """Test that a client message is recorded by the update that answers it, and only once."""
+    answer = QuestionResponse(
+        question_id="q1", question_type=QuestionType.TEXT, response_value="John"
+    )
+    field = f"processed_messages.{processed_message_key('wamid.HBgL.1')}"
+
+    update = build_answers_update([answer], next_question_id="q2", message_id="wamid.HBgL.1")
+    conditions = build_answers_filter("response123", "wamid.HBgL.1")
+
+    assert update["$set"][field] == "q2"
+    assert conditions == {"_id": "response123", field: {"$exists": False}}
+    assert build_answers_filter("response123") == {"_id": "response123"}
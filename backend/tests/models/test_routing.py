@@ -0,0 +1,123 @@
+"""Test cases for compiled question routing."""
+
+import pytest
+
+from app.models.surveys import Question, QuestionOption, NextQuestionCondition
+from app.models.types import QuestionType, ConditionOperator
+from app.core.exceptions import BusinessRuleError
+
+
+def _question(question_type: QuestionType, *conditions, **kwargs) -> Question:
+    return Question(
+        id="q1",
+        type=question_type,
+        text="Routed question",
+        conditional_next=[
+            NextQuestionCondition(operator=operator, value=value, next_question_id=target)
+            for operator, value, target in conditions
+        ],
+        **kwargs,
+    )
+
+
+def test_number_ranges_route_by_interval():
+    """Test that numeric answers are routed to the interval containing them."""
+    question = _question(
+        QuestionType.NUMBER,
+        (ConditionOperator.LESS_THAN, 18, "minor"),
+        (ConditionOperator.BETWEEN, [18, 64], "adult"),
+        (ConditionOperator.GREATER_THAN, 64, "senior"),
+    )
+    question.compile_routing()
+
+    assert question.get_next_question("17.5") == "minor"
+    assert question.get_next_question("18") == "adult"
+    assert question.get_next_question("64") == "adult"
+    assert question.get_next_question("64.5") == "senior"
+
+
+def test_number_ranges_with_shared_exclusive_bound():
+    """Test that an exclusive bound leaves the shared value to the inclusive interval."""
+    question = _question(
+        QuestionType.NUMBER,
+        (ConditionOperator.LESS_THAN_OR_EQUALS, 5, "low"),
+        (ConditionOperator.GREATER_THAN, 5, "high"),
+    )
+    assert question.get_next_question("5") == "low"
+    assert question.get_next_question("5.01") == "high"
+
+
+def test_overlapping_ranges_are_rejected():
+    """Test that ambiguous conditions are rejected at compile time."""
+    question = _question(
+        QuestionType.NUMBER,
+        (ConditionOperator.GREATER_THAN_OR_EQUALS, 10, "a"),
+        (ConditionOperator.BETWEEN, [0, 10], "b"),
+    )
+
+    with pytest.raises(BusinessRuleError, match="overlap"):
+        question.compile_routing()
+
+    question = _question(
+        QuestionType.NUMBER,
+        (ConditionOperator.GREATER_THAN, 5, "high"),
+        (ConditionOperator.IN, [1, 100], "listed"),
+    )
+
+    with pytest.raises(BusinessRuleError, match="overlap"):
+        question.compile_routing()
+
+
+def test_invalid_condition_values_are_rejected():
+    """Test that conditions with values outside the question domain are rejected."""
+    with pytest.raises(BusinessRuleError, match="between"):
+        _question(QuestionType.NUMBER, (ConditionOperator.BETWEEN, [5, 1], "a")).compile_routing()
+    with pytest.raises(BusinessRuleError, match="not supported"):
+        _question(QuestionType.DATE, (ConditionOperator.REGEX, "^2", "a")).compile_routing()
+    with pytest.raises(BusinessRuleError, match="Invalid regex"):
+        _question(QuestionType.TEXT, (ConditionOperator.REGEX, "(", "a")).compile_routing()
+
+
+def test_date_ranges_route_by_interval():
+    """Test that date answers are compared as dates."""
+    question = _question(
+        QuestionType.DATE,
+        (ConditionOperator.LESS_THAN, "2000-01-01", "old"),
+        (ConditionOperator.GREATER_THAN_OR_EQUALS, "2000-01-01", "new"),
+    )
+
+    assert question.get_next_question("1999-12-31") == "old"
+    assert question.get_next_question("2000-01-01") == "new"
+
+
+def test_text_routes_exact_values_before_patterns():
+    """Test that exact matches win over regex and contains conditions, in order."""
+    question = _question(
+        QuestionType.TEXT,
+        (ConditionOperator.CONTAINS, "help", "support"),
+        (ConditionOperator.REGEX, r"^\d+$", "digits"),
+        (ConditionOperator.IN, ["help", "menu"], "menu"),
+    )
+
+    assert question.get_next_question("help") == "menu"
+    assert question.get_next_question("I need HELP") == "support"
+    assert question.get_next_question("123") == "digits"
+    assert question.get_next_question("bye") is None
+
+
+def test_rating_options_fall_back_to_value_conditions():
+    """Test that ratings without an option next question are routed by value."""
+    question = _question(
+        QuestionType.RATING,
+        (ConditionOperator.LESS_THAN_OR_EQUALS, 2, "detractor"),
+        (ConditionOperator.GREATER_THAN_OR_EQUALS, 4, "promoter"),
+        options=[
+            QuestionOption(id=str(i), text=str(i), next_question_id="neutral" if i == 3 else None)
+            for i in range(1, 6)
+        ],
+    )
+
+    assert question.get_next_question("1") == "detractor"
+    assert question.get_next_question("3") == "neutral"
+    assert question.get_next_question("5") == "promoter"
+    assert question.get_next_question("6") is None
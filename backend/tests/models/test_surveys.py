@@ -1,6 +1,7 @@
 """Test cases for survey models."""
 
 import pytest
+from pydantic import ValidationError
 
 from app.models.surveys import Survey, Question, QuestionOption, NextQuestionCondition
 from app.models.types import QuestionType, ConditionOperator
@@ -333,3 +334,49 @@ def test_validate_next_questions():
             is_terminal=False,
         )
         question.validate_next_questions(available_questions)
+
+
+def test_option_replies_match_by_id_position_or_text():
+    """Test that choice replies resolve by option id, 1-based position or text."""
+    question = Question(
+        id="q1",
+        type=QuestionType.MULTIPLE_CHOICE,
+        text="Favourite flavour?",
+        options=[
+            QuestionOption(id="van", text="Vanilla", next_question_id="q2"),
+            QuestionOption(id="choc", text="Dark  Chocolate", next_question_id="q3"),
+            QuestionOption(id="1", text="Strawberry", next_question_id="q4"),
+        ],
+    )
+
+    assert question.get_validated_response("choc") == "choc"
+    assert question.get_validated_response("2") == "choc"
+    assert question.get_validated_response(" dark chocolate ") == "choc"
+    # Positions win over ids
+    assert question.get_validated_response("1") == "van"
+    assert question.get_next_question("VANILLA") == "q2"
+    assert question.get_next_question("3") == "q4"
+    with pytest.raises(BusinessRuleError, match="Invalid option"):
+        question.get_validated_response("4")
+
+
+def test_option_positions_win_over_colliding_ids():
+    """Test that a reply matching both a position and another option's id picks the position."""
+    question = Question(
+        id="q1",
+        type=QuestionType.RATING,
+        text="How likely are you to recommend us?",
+        options=[QuestionOption(id=str(score), text=str(score)) for score in range(11)],
+    )
+
+    # The prompt shows "1. 0", "2. 1", ... so "2" is the second line, the score 1
+    assert question.get_validated_response("2") == "1"
+    assert question.get_validated_response("11") == "10"
+    assert question.get_validated_response("0") == "0"
+
+
+@pytest.mark.parametrize("question_id", ["q1.text", "$q1"])
+def test_question_ids_cannot_be_read_as_paths(question_id):
+    """Test that question ids with dots or a leading dollar sign are rejected."""
+    with pytest.raises(ValidationError):
+        Question(id=question_id, type=QuestionType.TEXT, text="What is your name?")
@@ -0,0 +1,70 @@
+"""Tests for client profiles and connection pool routing"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.metrics import get_metrics
+from app.dependencies.database import OLTP, REPORTING, PoolMetricsListener
+from app.repositories.pools import PoolRoutedRepository
+
+
+class ProfileRepository:
+    """Repository stand-in answering with its profile."""
+
+    def __init__(self, profile):
+        self.profile = profile
+
+    async def find_by_id(self, response_id):
+        """Answer with the profile."""
+        return self.profile
+
+    async def find_by_survey(self, survey_id):
+        """Answer with the profile."""
+        return self.profile
+
+
+async def test_methods_are_routed_to_their_profile():
+    """Test that reporting methods use the reporting pool and the rest the OLTP pool."""
+    # Setup
+    repository = PoolRoutedRepository(
+        {OLTP: ProfileRepository(OLTP), REPORTING: ProfileRepository(REPORTING)},
+        {"find_by_survey": REPORTING},
+        default=OLTP,
+    )
+
+    # Execute & Assert
+    assert await repository.find_by_id("response123") == OLTP
+    assert await repository.find_by_survey("survey123") == REPORTING
+
+
+def test_routes_need_a_repository_per_profile():
+    """Test that routing to a profile without a repository is rejected."""
+    with pytest.raises(ValueError, match="reporting"):
+        PoolRoutedRepository({OLTP: ProfileRepository(OLTP)}, {"find_by_survey": REPORTING}, OLTP)
+
+
+def test_pool_listener_exports_utilization():
+    """Test that connection pool events update the gauges of the profile."""
+    # Setup
+    listener = PoolMetricsListener("test_pool", max_pool_size=4)
+    event = SimpleNamespace(duration=0.002)
+    metrics = get_metrics()
+
+    # Execute
+    listener.pool_created(event)
+    for _ in range(3):
+        listener.connection_created(event)
+        listener.connection_check_out_started(event)
+        listener.connection_checked_out(event)
+    listener.connection_checked_in(event)
+    listener.connection_check_out_started(event)
+    listener.connection_check_out_failed(event)
+
+    # Assert
+    assert metrics.gauge("mongo.test_pool.connections_open").value == 3
+    assert metrics.gauge("mongo.test_pool.connections_in_use").value == 2
+    assert metrics.gauge("mongo.test_pool.checkouts_waiting").value == 0
+    assert metrics.gauge("mongo.test_pool.utilization").value == 0.5
+    assert metrics.counter("mongo.test_pool.checkout_failed").value == 1
+    assert metrics.histogram("mongo.test_pool.checkout_wait_ms").count == 3
@@ -0,0 +1,49 @@
+"""Tests for the Redis Cluster key layout"""
+
+from unittest.mock import AsyncMock, MagicMock
+import pytest
+from redis.crc import key_slot
+
+from app.repositories.redis import RedisSessionRepository, RedisRateLimitRepository
+from app.repositories.redis.cluster import group_by_slot
+from tests.utils.mock_fixtures import session_id
+
+
+@pytest.fixture
+def redis_client():
+    """Mock Redis client, whose scripts are mocks too."""
+    client = MagicMock()
+    client.register_script.side_effect = lambda script: AsyncMock(return_value="0")
+    return client
+
+
+def test_session_keys_share_a_slot_in_cluster_mode(redis_client, session_id):
+    """Test that the active and inactive keys of a session are stored on the same slot."""
+    repository = RedisSessionRepository(redis_client, cluster_mode=True)
+
+    active = repository._get_active_key(session_id)
+    inactive = repository._get_inactive_key(session_id)
+
+    assert active == "active_session:{user123:survey123}"
+    assert key_slot(active.encode()) == key_slot(inactive.encode())
+
+
+def test_session_keys_are_unchanged_on_a_single_node(redis_client, session_id):
+    """Test that the single node layout keeps the keys it always used."""
+    repository = RedisSessionRepository(redis_client, cluster_mode=False)
+
+    assert repository._get_active_key(session_id) == "active_session:user123:survey123"
+
+
+async def test_rate_limit_script_runs_once_per_slot(redis_client):
+    """Test that buckets on different slots are consumed with separate script calls."""
+    repository = RedisRateLimitRepository(redis_client, cluster_mode=True)
+    buckets = {"user:u1": (1.0, 10), "survey:s1": (100.0, 200), "ip:1.2.3.4": (20.0, 100)}
+    slots = group_by_slot(f"rate_limit:{key}" for key in buckets)
+
+    await repository.consume(buckets)
+
+    assert repository._script.call_count == len(slots)
+    calls = repository._script.call_args_list
+    called_keys = sorted(key for call in calls for key in call.kwargs["keys"])
+    assert called_keys == sorted(f"rate_limit:{key}" for key in buckets)
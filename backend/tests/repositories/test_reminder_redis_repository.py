@@ -0,0 +1,60 @@
+"""Tests for RedisReminderRepository"""
+
+import pytest
+
+from app.models.sessions import SessionId
+from app.repositories.redis.reminder_redis_repository import RedisReminderRepository
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def reminder_repository():
+    """Create a reminder repository on a fake Redis with four shards."""
+    return RedisReminderRepository(fakeredis.FakeAsyncRedis(decode_responses=True), shards=4)
+
+
+async def test_pop_due_removes_only_due_reminders(reminder_repository):
+    """Test that due reminders are returned once and later ones are kept."""
+    # Setup
+    for i in range(10):
+        await reminder_repository.schedule(SessionId(user_id=f"user{i}", survey_id="s1"), i)
+
+    # Execute
+    popped = await reminder_repository.pop_due(4.5, limit=100)
+    popped_again = await reminder_repository.pop_due(4.5, limit=100)
+
+    # Assert
+    assert sorted(r.session_id.user_id for r in popped) == [f"user{i}" for i in range(5)]
+    assert popped_again == []
+    assert await reminder_repository.count_pending() == 5
+
+
+async def test_schedule_replaces_and_cancel_removes_reminder(reminder_repository):
+    """Test that a session has at most one reminder, which cancelling removes."""
+    # Setup
+    session_id = SessionId(user_id="user:1", survey_id="s1")
+    await reminder_repository.schedule(session_id, 10)
+    await reminder_repository.schedule(session_id, 20)
+
+    # Execute
+    not_due = await reminder_repository.pop_due(15, limit=100)
+    await reminder_repository.cancel(session_id)
+
+    # Assert
+    assert not_due == []
+    assert await reminder_repository.count_pending() == 0
+
+
+async def test_pop_due_limits_each_shard(reminder_repository):
+    """Test that at most limit reminders are popped from each shard."""
+    # Setup
+    for i in range(40):
+        await reminder_repository.schedule(SessionId(user_id=f"user{i}", survey_id="s1"), i)
+
+    # Execute
+    popped = await reminder_repository.pop_due(100, limit=2)
+
+    # Assert
+    assert len(popped) == 8
+    assert await reminder_repository.count_pending() == 32
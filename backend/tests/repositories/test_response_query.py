@@ -0,0 +1,159 @@
+"""Tests for the response query builders and indexes"""
+
+import itertools
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from pydantic import ValidationError
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from app.core.config import get_settings
+from app.models.responses import ResponseQuery, SurveyResponse
+from app.repositories.responses_repository import (
+    RESPONSE_INDEXES,
+    RESPONSE_QUERY_SORT,
+    build_response_query,
+    decode_response_cursor,
+    encode_response_cursor,
+)
+
+START = datetime(2024, 1, 1)
+END = datetime(2024, 2, 1)
+
+# Every supported filter, to be combined with the others
+FILTERS = {
+    "is_complete": {"is_complete": True},
+    "started": {"started_from": START, "started_until": END},
+    "completed": {"completed_from": START, "completed_until": END},
+    "answer": {"question_id": "q1", "answer": "John"},
+}
+
+
+def test_build_response_query_filters_every_field():
+    """Test that every filter of a query is part of the MongoDB filter."""
+    # Setup
+    fields = {key: value for values in FILTERS.values() for key, value in values.items()}
+    query = ResponseQuery(survey_id="survey123", **fields)
+
+    # Execute
+    conditions = build_response_query(query)
+
+    # Assert
+    assert conditions == {
+        "survey_id": "survey123",
+        "is_complete": True,
+        "started_at": {"$gte": START, "$lt": END},
+        "completed_at": {"$gte": START, "$lt": END},
+        "answers.q1.response_value": "John",
+    }
+
+
+def test_build_response_query_resumes_after_cursor():
+    """Test that the cursor of a response resumes after its last update and id."""
+    # Setup
+    response_id = str(ObjectId())
+    response = SurveyResponse(
+        id=response_id, survey_id="survey123", user_id="user123", last_updated_at=START
+    )
+    query = ResponseQuery(survey_id="survey123", cursor=encode_response_cursor(response))
+
+    # Execute
+    conditions = build_response_query(query)
+
+    # Assert
+    assert conditions["$or"] == [
+        {"last_updated_at": {"$lt": START}},
+        {"last_updated_at": START, "_id": {"$lt": ObjectId(response_id)}},
+    ]
+
+
+def test_decode_response_cursor_rejects_invalid_cursors():
+    """Test that cursors that were not encoded by the API are rejected."""
+    for cursor in ["not a cursor", "W10=", "WzEsIDJd"]:
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            decode_response_cursor(cursor)
+
+
+def test_response_queries_reject_question_ids_read_as_paths():
+    """Test that answer filters on question ids MongoDB would misread are rejected."""
+    for question_id in ["q1.response_value", "$where"]:
+        with pytest.raises(ValidationError):
+            ResponseQuery(survey_id="survey123", question_id=question_id, answer="John")
+        # Queries built without validation are rejected by the builder too
+        query = ResponseQuery.model_construct(
+            survey_id="survey123", question_id=question_id, answer="John", cursor=None,
+            is_complete=None, started_from=None, started_until=None, completed_from=None,
+            completed_until=None,
+        )
+        with pytest.raises(ValueError, match="Invalid question id"):
+            build_response_query(query)
+
+
+@pytest.fixture(scope="module")
+def responses_collection():
+    """Collection of responses on the configured MongoDB, with the indexes of a deploy."""
+    client = MongoClient(get_settings().MONGODB_URL, serverSelectionTimeoutMS=500)
+    try:
+        client.admin.command("ping")
+    except PyMongoError:
+        pytest.skip("MongoDB is not reachable, the query plans are not checked")
+    collection = client["survey_api_query_tests"]["responses"]
+    collection.drop()
+    collection.create_indexes(RESPONSE_INDEXES)
+    collection.insert_many([
+        {
+            "survey_id": f"survey{i % 10}",
+            "user_id": f"user{i}",
+            "is_complete": i % 2 == 0,
+            "started_at": START + timedelta(hours=i),
+            "completed_at": START + timedelta(hours=i + 1) if i % 2 == 0 else None,
+            "last_updated_at": START + timedelta(hours=i + 1),
+            "answers": {"q1": {"question_id": "q1", "response_value": f"answer{i % 3}"}},
+        }
+        for i in range(1000)
+    ])
+    yield collection
+    client.drop_database("survey_api_query_tests")
+    client.close()
+
+
+def _stages(plan):
+    """Names of all the stages of a query plan."""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from _stages(value)
+
+
+def test_supported_filters_are_served_by_indexes(responses_collection):
+    """Test that no combination of filters scans the collection or sorts in memory."""
+    cursor = encode_response_cursor(
+        SurveyResponse(
+            id=str(ObjectId()), survey_id="survey1", user_id="user1", last_updated_at=END
+        )
+    )
+    for size in range(len(FILTERS) + 1):
+        for names in itertools.combinations(FILTERS, size):
+            fields = {key: value for name in names for key, value in FILTERS[name].items()}
+            for page_cursor in [None, cursor]:
+                # Setup
+                query = ResponseQuery(survey_id="survey1", cursor=page_cursor, **fields)
+
+                # Execute
+                explain = (
+                    responses_collection.find(build_response_query(query))
+                    .sort(RESPONSE_QUERY_SORT)
+                    .limit(query.limit + 1)
+                    .explain()
+                )
+
+                # Assert
+                stages = set(_stages(explain["queryPlanner"]["winningPlan"]))
+                assert "COLLSCAN" not in stages, (names, page_cursor)
+                assert "SORT" not in stages, (names, page_cursor)
@@ -0,0 +1,78 @@
+"""Tests for SessionCodec"""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from app.core.cache import TTLCache
+from app.models.sessions import Session
+from app.repositories.redis.session_codec import SessionCodec
+from tests.utils.mock_fixtures import (
+    mock_question,
+    mock_next_question,
+    mock_survey,
+    mock_survey_response,
+    session_id,
+)
+
+
+@pytest.fixture
+def codec():
+    """Create a session codec."""
+    return SessionCodec(TTLCache(16, float("inf")))
+
+
+@pytest.fixture
+def session(session_id, mock_survey, mock_survey_response):
+    """Create a session with a survey and a response."""
+    return Session(
+        id=session_id,
+        survey=mock_survey,
+        response=mock_survey_response,
+        processed_messages={"m1": "q2"},
+    )
+
+
+def test_trusted_load_shares_the_validated_survey(codec, session):
+    """Test that sessions with matching checksums reuse the cached survey."""
+    # Setup
+    data = codec.encode(session)
+    codec.surveys.clear()
+
+    # Execute
+    first = codec.decode(data)
+    second = codec.decode(data)
+
+    # Assert
+    assert first.survey is second.survey
+    assert first.model_dump() == session.model_dump()
+    assert isinstance(first.response.started_at, datetime)
+
+
+def test_checksum_mismatch_falls_back_to_validation(codec, session):
+    """Test that a session altered after encoding is fully validated."""
+    # Setup
+    data = codec.encode(session).replace('"Test Survey"', '"Best Survey"')
+
+    # Execute
+    decoded = codec.decode(data)
+
+    # Assert
+    assert decoded.survey.title == "Best Survey"
+    assert decoded.survey is not session.survey
+
+
+def test_invalid_altered_session_is_rejected(codec, session):
+    """Test that an altered session failing validation is not loaded."""
+    data = codec.encode(session).replace('"first_question_id":"q1"', '"first_question_id":1')
+
+    with pytest.raises(ValueError):
+        codec.decode(data)
+
+
+def test_plain_json_sessions_are_still_read(codec, session):
+    """Test that sessions stored before the envelope are validated from JSON."""
+    data = json.dumps(session.model_dump(mode="json", exclude_none=True))
+
+    assert codec.decode(data).model_dump() == session.model_dump()
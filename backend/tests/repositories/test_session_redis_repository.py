@@ -0,0 +1,47 @@
+"""Tests for RedisSessionRepository"""
+
+import asyncio
+
+import pytest
+
+from app.models.sessions import Session
+from app.repositories.redis import RedisSessionRepository
+
+# Fixtures, found by pytest through their names
+from tests.utils.mock_fixtures import session_id  # noqa: F401
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def session_repository():
+    """Create a session repository on a fake Redis."""
+    return RedisSessionRepository(fakeredis.FakeAsyncRedis(decode_responses=True))
+
+
+async def test_concurrent_claims_of_a_new_session_grant_one_lease(session_repository, session_id):
+    """Test that only one of concurrent claims of a session without any copy gets it."""
+    # Execute
+    claims = await asyncio.gather(
+        *(session_repository.claim_session(session_id) for _ in range(10))
+    )
+
+    # Assert
+    assert sorted(was_active for was_active, _ in claims) == [False] + [True] * 9
+    assert all(session is None for _, session in claims)
+
+
+async def test_claimed_session_has_no_active_copy_until_set(session_repository, session_id):
+    """Test that the claim placeholder is not read as a session and is overwritten by set."""
+    # Setup
+    await session_repository.claim_session(session_id, ttl=30)
+
+    # Execute
+    placeholder = await session_repository.get_active_session(session_id)
+    await session_repository.set_active_session(session_id, Session(id=session_id))
+    stored = await session_repository.get_active_session(session_id)
+
+    # Assert
+    assert placeholder is None
+    assert stored is not None and stored.id == session_id
+    assert 0 < await session_repository.redis.ttl(session_repository._get_active_key(session_id))
@@ -0,0 +1,119 @@
+"""Tests for the survey catalog"""
+
+import mmap
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.core.cache import TTLCache
+from app.models.sessions import Session, SessionId
+from app.models.surveys import SurveyDocument
+from app.repositories.redis.session_codec import SessionCodec
+from app.repositories.survey_catalog import CatalogQuestions, SurveyCatalog, write_survey_catalog
+
+# Fixtures, found by pytest through their names
+from tests.utils.mock_fixtures import mock_question, mock_next_question, mock_survey  # noqa: F401
+
+
+@pytest.fixture
+def catalog_path(tmp_path):
+    """Path of a catalog file."""
+    return str(tmp_path / "surveys.catalog")
+
+
+@pytest.fixture
+def catalog(catalog_path):
+    """Create a catalog reader checking for a new file on every read."""
+    return SurveyCatalog(catalog_path, check_interval=0)
+
+
+def test_questions_are_loaded_on_demand(catalog, catalog_path, mock_survey):
+    """Test that catalog surveys validate only the questions they are asked for."""
+    # Setup
+    write_survey_catalog(catalog_path, [mock_survey])
+
+    # Execute
+    survey = catalog.get_survey("survey123")
+
+    # Assert
+    assert isinstance(survey.questions, CatalogQuestions)
+    assert survey.get_question("q1") == mock_survey.questions["q1"]
+    assert list(survey.questions._questions) == ["q1"]
+    assert survey.model_dump() == mock_survey.model_dump()
+    assert catalog.get_document("survey123") == SurveyDocument.from_survey(mock_survey)
+    assert catalog.get_survey("missing") is None
+
+
+def test_replaced_catalog_is_picked_up(catalog, catalog_path, mock_survey):
+    """Test that readers switch to a catalog swapped in after they mapped the previous one."""
+    # Setup
+    write_survey_catalog(catalog_path, [])
+    assert catalog.get_survey("survey123") is None
+
+    # Execute
+    write_survey_catalog(catalog_path, [mock_survey])
+
+    # Assert
+    assert catalog.get_survey("survey123").title == "Test Survey"
+
+
+def test_invalidated_surveys_wait_for_a_newer_catalog(catalog, catalog_path, mock_survey):
+    """Test that a survey changed by this worker is not served from an older catalog."""
+    # Setup
+    write_survey_catalog(catalog_path, [mock_survey])
+
+    # Execute
+    catalog.invalidate("survey123")
+
+    # Assert
+    assert catalog.get_survey("survey123") is None
+    write_survey_catalog(catalog_path, [mock_survey])
+    assert catalog.get_survey("survey123") is not None
+
+
+def test_catalogs_read_before_an_invalidation_keep_it(catalog, catalog_path, mock_survey):
+    """Test that a catalog built from surveys read before a change does not serve them."""
+    # Setup
+    built_at = time.time()
+    catalog.invalidate("survey123")
+
+    # Execute
+    write_survey_catalog(catalog_path, [mock_survey], built_at)
+
+    # Assert
+    assert catalog.get_survey("survey123") is None
+    assert catalog.built_at == built_at
+
+
+def test_invalid_catalog_is_mapped_once(catalog, catalog_path):
+    """Test that an invalid file is ignored and not mapped again until it is replaced."""
+    # Setup
+    with open(catalog_path, "wb") as file:
+        file.write(b"not a catalog")
+
+    # Execute
+    with patch("mmap.mmap", wraps=mmap.mmap) as mapped:
+        assert catalog.get_survey("survey123") is None
+        assert catalog.get_survey("survey123") is None
+
+    # Assert
+    assert mapped.call_count == 1
+    assert catalog._buffer is None
+
+
+def test_catalog_surveys_are_encoded_without_loading_questions(catalog, catalog_path, mock_survey):
+    """Test that sessions store catalog surveys from their document, as they were written."""
+    # Setup
+    write_survey_catalog(catalog_path, [mock_survey])
+    survey = catalog.get_survey("survey123")
+    codec = SessionCodec(TTLCache(4, float("inf")))
+    session = Session(id=SessionId(user_id="user123", survey_id="survey123"))
+    session.survey = survey
+
+    # Execute
+    decoded = codec.decode(codec.encode(session))
+
+    # Assert
+    assert survey.questions._questions == {}
+    assert decoded.survey.model_dump() == mock_survey.model_dump()
@@ -0,0 +1,70 @@
+"""Tests for the chats router"""
+
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.core.chat_protocols import IDLE, MESSAGES, WELCOME
+from app.core.exceptions import BusinessRuleError
+
+# The router needs the service dependencies, which import the Mongo repositories
+chats_router = pytest.importorskip("app.routers.chats_router")
+services = pytest.importorskip("app.dependencies.services")
+
+from tests.utils.mock_fixtures import mock_question  # noqa: E402, F401
+
+URL = "/respond/survey/survey123/user/user123"
+
+
+@pytest.fixture
+def chats_service():
+    """Mock chats service."""
+    return AsyncMock()
+
+
+@pytest.fixture
+def client(chats_service):
+    """Test client of an app with the chats router and mocked services."""
+    app = FastAPI()
+    app.include_router(chats_router.chats_router)
+    app.dependency_overrides[services.get_chats_service] = lambda: chats_service
+    app.dependency_overrides[services.get_rate_limit_service] = lambda: AsyncMock()
+    return TestClient(app)
+
+
+def test_idle_connection_is_closed(client, chats_service, mock_question, monkeypatch):
+    """Test that an idle connection gets the idle frame, is closed and deactivated."""
+    # Setup
+    monkeypatch.setattr(chats_router.settings, "WS_IDLE_TIMEOUT", 0.05)
+    chats_service.connect.return_value = mock_question
+
+    # Execute
+    with client.websocket_connect(URL) as websocket:
+        frames = [websocket.receive_text() for _ in range(3)]
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_text()
+
+    # Assert
+    assert frames[0] == MESSAGES[WELCOME]
+    assert mock_question.text in frames[1]
+    assert frames[2] == MESSAGES[IDLE]
+    assert closed.value.code == 1000
+    chats_service.disconnect.assert_awaited_once()
+
+
+def test_rejected_connection_keeps_active_session(client, chats_service):
+    """Test that a second connection to an active session does not deactivate it."""
+    # Setup
+    chats_service.connect.side_effect = BusinessRuleError("Session already active")
+
+    # Execute
+    with pytest.raises(WebSocketDisconnect) as rejected:
+        with client.websocket_connect(URL) as websocket:
+            websocket.receive_text()
+
+    # Assert
+    assert rejected.value.code == 1008
+    chats_service.disconnect.assert_not_called()
@@ -0,0 +1,33 @@
+"""Tests for the surveys router"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+# The router needs the service dependencies, which import the Mongo repositories
+surveys_router = pytest.importorskip("app.routers.surveys_router")
+
+
+async def _lines_of(*chunks):
+    request = MagicMock()
+
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    request.stream = stream
+    return [line async for line in surveys_router._iter_lines(request)]
+
+
+async def test_import_lines_are_split_across_chunks_and_left_undecoded():
+    """Test that lines spanning chunks are joined, and bytes are not decoded."""
+    lines = await _lines_of(b'{"a"', b": 1}\n\xff\n", b"", b"last", b" line")
+
+    assert lines == [b'{"a": 1}', b"\xff", b"last line"]
+
+
+async def test_long_import_lines_are_read_in_one_piece():
+    """Test that a line of many chunks without line ends is yielded once."""
+    lines = await _lines_of(*([b"x" * 1024] * 1000), b"\n")
+
+    assert lines == [b"x" * 1024 * 1000]
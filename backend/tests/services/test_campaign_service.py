@@ -0,0 +1,203 @@
+"""Tests for CampaignService"""
+
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.core.constants import UTC
+from app.models.campaigns import CampaignProgress, Recipient
+from app.models.responses import SurveyResponse
+from app.services.campaign_service import CampaignService
+
+# Fixtures, found by pytest through their names
+from tests.utils.mock_fixtures import (  # noqa: F401
+    response_repository,
+    mock_question,
+    mock_next_question,
+    mock_survey,
+)
+
+
+class MemoryCampaignRepository:
+    """Campaign repository keeping checkpoints in memory."""
+
+    def __init__(self):
+        self.checkpoints = {}
+
+    async def get_progress(self, campaign_id):
+        """Get a copy of the last checkpoint."""
+        progress = self.checkpoints.get(campaign_id)
+        return progress.model_copy(deep=True) if progress else None
+
+    async def save_progress(self, progress):
+        """Keep a copy of a checkpoint."""
+        self.checkpoints[progress.campaign_id] = progress.model_copy(deep=True)
+
+
+async def _recipients(*user_ids):
+    for user_id in user_ids:
+        yield Recipient(user_id=user_id, provider="sms" if user_id.endswith("s") else "default")
+
+
+@pytest.fixture
+def campaign_repository():
+    """In-memory campaign repository."""
+    return MemoryCampaignRepository()
+
+
+@pytest.fixture
+def gateway():
+    """Mock outbound gateway."""
+    return AsyncMock()
+
+
+@pytest.fixture
+def campaign_service(mock_survey, response_repository, campaign_repository, gateway):
+    """Create a campaign service with batches of two recipients."""
+    survey_service = AsyncMock()
+    survey_service.get_survey.return_value = mock_survey
+    # Users whose id starts with "old" already have a response
+    response_repository.insert_many.side_effect = lambda responses: [
+        response for response in responses if not response.user_id.startswith("old")
+    ]
+    return CampaignService(
+        survey_service, response_repository, campaign_repository, gateway,
+        rate=1000, provider_rates={"sms": 1000}, batch_size=2, concurrency=4,
+    )
+
+
+async def test_campaign_creates_responses_in_batches_and_messages_new_users(
+    campaign_service, response_repository, gateway
+):
+    """Test that responses are bulk inserted and only users without one are messaged."""
+    # Execute
+    progress = await campaign_service.run(
+        "campaign1", "survey123", _recipients("u1", "old2", "u3s")
+    )
+
+    # Assert
+    assert response_repository.insert_many.await_count == 2
+    assert (progress.offset, progress.created, progress.skipped) == (3, 2, 1)
+    assert (progress.sent, progress.failed) == (2, 0)
+    assert progress.is_complete
+    sent = {call.args[2]: call.args[0] for call in gateway.send.await_args_list}
+    assert sent == {"campaign1:u1": "default", "campaign1:u3s": "sms"}
+    assert "What is your name?" in gateway.send.await_args_list[0].args[1].text
+
+
+async def test_campaign_resumes_from_its_checkpoint(
+    campaign_service, campaign_repository, response_repository, gateway
+):
+    """Test that a resumed campaign messages its pending users and skips read recipients."""
+    # Setup
+    campaign_repository.checkpoints["campaign1"] = CampaignProgress(
+        campaign_id="campaign1", survey_id="survey123", offset=2, created=2,
+        pending=[Recipient(user_id="u2")],
+    )
+
+    # Execute
+    progress = await campaign_service.run(
+        "campaign1", "survey123", _recipients("u1", "u2", "u3")
+    )
+
+    # Assert
+    inserted = response_repository.insert_many.await_args.args[0]
+    assert [response.user_id for response in inserted] == ["u3"]
+    assert [call.args[2] for call in gateway.send.await_args_list] == [
+        "campaign1:u2", "campaign1:u3"
+    ]
+    assert (progress.offset, progress.created, progress.sent) == (3, 3, 2)
+
+
+async def test_failed_messages_are_counted(campaign_service, gateway):
+    """Test that a failed message does not stop the campaign."""
+    gateway.send.side_effect = [ConnectionError("provider down"), None]
+
+    progress = await campaign_service.run("campaign1", "survey123", _recipients("u1", "u2"))
+
+    assert (progress.sent, progress.failed) == (1, 1)
+
+
+async def test_campaign_checkpoints_batches_before_creating_their_responses(
+    campaign_service, campaign_repository, response_repository
+):
+    """Test that a batch is checkpointed as pending before its responses are created."""
+    # Setup
+    checkpoints = []
+
+    def insert_many(responses):
+        checkpoints.append(campaign_repository.checkpoints["campaign1"])
+        return responses
+
+    response_repository.insert_many.side_effect = insert_many
+
+    # Execute
+    await campaign_service.run("campaign1", "survey123", _recipients("u1", "u2"))
+
+    # Assert
+    assert [r.user_id for r in checkpoints[0].pending] == ["u1", "u2"]
+    assert checkpoints[0].creating_since is not None
+    assert campaign_repository.checkpoints["campaign1"].creating_since is None
+
+
+async def test_campaign_resumed_after_insert_messages_the_users_it_created(
+    campaign_service, campaign_repository, response_repository, gateway
+):
+    """Test that users whose response was created right before a crash are messaged."""
+    # Setup
+    since = datetime.now(UTC) - timedelta(minutes=1)
+    campaign_repository.checkpoints["campaign1"] = CampaignProgress(
+        campaign_id="campaign1", survey_id="survey123", offset=3,
+        pending=[Recipient(user_id=user_id) for user_id in ["u1", "old2", "old3"]],
+        creating_since=since,
+    )
+    # The insert created u1 and old3, old2 having a response from before the campaign
+    response_repository.insert_many.side_effect = lambda responses: []
+    response_repository.find_by_survey_and_users.return_value = [
+        SurveyResponse(survey_id="survey123", user_id="u1", started_at=since.replace(tzinfo=None)),
+        SurveyResponse(
+            survey_id="survey123", user_id="old2", started_at=since - timedelta(days=1)
+        ),
+        SurveyResponse(survey_id="survey123", user_id="old3"),
+    ]
+
+    # Execute
+    progress = await campaign_service.run(
+        "campaign1", "survey123", _recipients("u1", "old2", "old3")
+    )
+
+    # Assert
+    assert [call.args[2] for call in gateway.send.await_args_list] == [
+        "campaign1:u1", "campaign1:old3"
+    ]
+    assert (progress.offset, progress.created, progress.skipped, progress.sent) == (3, 2, 1, 2)
+
+
+async def test_campaign_rates_below_one_message_per_second_send(
+    campaign_repository, response_repository, gateway, mock_survey
+):
+    """Test that a fractional rate still lets a message through, and other rates fail."""
+    # Setup
+    survey_service = AsyncMock()
+    survey_service.get_survey.return_value = mock_survey
+    response_repository.insert_many.side_effect = lambda responses: responses
+    service = CampaignService(
+        survey_service, response_repository, campaign_repository, gateway,
+        rate=0.5, provider_rates={"sms": 0.2}, batch_size=2, concurrency=4,
+    )
+
+    # Execute
+    progress = await asyncio.wait_for(
+        service.run("campaign1", "survey123", _recipients("u1s")), timeout=1
+    )
+
+    # Assert
+    assert progress.sent == 1
+    for rate, provider_rates in [(0, {}), (-1, {}), (1, {"sms": 0})]:
+        with pytest.raises(ValueError, match="must be positive"):
+            CampaignService(
+                survey_service, response_repository, campaign_repository, gateway,
+                rate=rate, provider_rates=provider_rates, batch_size=2, concurrency=4,
+            )
@@ -4,9 +4,10 @@ from unittest.mock import AsyncMock
 import pytest
 
 from app.services.chats_service import ChatsService
+from app.services.response_service import ResponseService
 from app.models.sessions import Session
-from app.models.responses import SurveyResponse
-from app.core.exceptions import BusinessRuleError
+from app.models.responses import SurveyResponse, AnswerSubmission, processed_message_key
+from app.core.exceptions import BusinessRuleError, ServiceError
 from tests.utils.mock_fixtures import (
     response_repository,
     survey_repository,
@@ -81,7 +82,9 @@ async def test_handle_message_success(
     response_service.add_question_response.assert_called_once_with(
         mock_session.response.id,
         mock_question,
-        "John"
+        "John",
+        mock_session.answer_index,
+        message_id=None,
     )
     session_service.update_session.assert_called_once()
 
@@ -143,3 +146,220 @@ async def test_handle_message_session_not_found(
     # Execute and Assert
     with pytest.raises(BusinessRuleError, match="Session not found"):
         await chats_service.handle_message(session_id, "test")
+
+
+async def test_submit_answers_parks_incomplete_session(
+    chats_service,
+    session_id,
+    mock_session,
+    session_service,
+    response_service
+):
+    """Test that a batch is applied with one update and the session is stored once."""
+    # Setup
+    session_service.load_session.return_value = mock_session
+    updated = SurveyResponse(
+        id="response123",
+        survey_id="survey123",
+        user_id="user123",
+        current_question_id="q2",
+    )
+    response_service.add_question_responses.return_value = updated
+    answers = [AnswerSubmission(value="John")]
+    original_response = mock_session.response
+
+    # Execute
+    result = await chats_service.submit_answers(session_id, answers)
+
+    # Assert
+    assert result == updated
+    response_service.add_question_responses.assert_called_once_with(
+        original_response, mock_session.survey, answers, mock_session.answer_index
+    )
+    session_service.park_session.assert_called_once_with(session_id, mock_session)
+    session_service.update_session.assert_not_called()
+
+
+async def test_handle_message_replays_duplicate_message_ids(
+    chats_service,
+    session_id,
+    mock_session,
+    session_service,
+    response_service
+):
+    """Test that a resent message gets the same reply and is stored once."""
+    # Setup
+    session_service.get_active_session.return_value = mock_session
+    response_service.add_question_response.return_value = SurveyResponse(
+        id="response123",
+        survey_id="survey123",
+        user_id="user123",
+        current_question_id="q2",
+    )
+
+    # Execute
+    first = await chats_service.handle_message(session_id, "John", "msg-1")
+    second = await chats_service.handle_message(session_id, "John", "msg-1")
+
+    # Assert
+    assert first.id == second.id == "q2"
+    assert mock_session.processed_messages == {"msg-1": "q2"}
+    response_service.add_question_response.assert_called_once()
+    session_service.update_session.assert_called_once()
+
+
+async def test_submit_answers_parks_session_when_batch_fails(
+    chats_service,
+    session_id,
+    mock_session,
+    session_service,
+    response_service
+):
+    """Test that a failed batch still releases the session it loaded."""
+    # Setup
+    session_service.load_session.return_value = mock_session
+    response_service.add_question_responses.side_effect = BusinessRuleError("Invalid option")
+
+    # Execute and Assert
+    with pytest.raises(BusinessRuleError, match="Invalid option"):
+        await chats_service.submit_answers(session_id, [AnswerSubmission(value="John")])
+    session_service.park_session.assert_called_once_with(session_id, mock_session)
+
+
+class MemoryResponses:
+    """Response repository stand-in that answers a client message once, as its filter does."""
+
+    def __init__(self, response: SurveyResponse):
+        self.response = response
+        self.updates = 0
+
+    async def add_question_response(
+        self, response_id, question_response, next_question_id=None, is_complete=False,
+        message_id=None,
+    ):
+        """Set an answer unless the message was already answered."""
+        key = processed_message_key(message_id)
+        if key in self.response.processed_messages:
+            return None
+        self.updates += 1
+        self.response = self.response.model_copy(update={
+            "current_question_id": next_question_id,
+            "is_complete": is_complete,
+            "processed_messages": {**self.response.processed_messages, key: next_question_id},
+        })
+        return self.response
+
+    async def find_by_id(self, response_id):
+        """Find the stored response."""
+        return self.response
+
+
+async def test_handle_message_answers_once_when_session_write_failed(
+    survey_service,
+    session_service,
+    session_id,
+    mock_survey,
+    mock_survey_response,
+):
+    """Test that a message resent after its answer was stored, but not its session, is replayed."""
+    # Setup
+    responses = MemoryResponses(mock_survey_response)
+    chats_service = ChatsService(
+        survey_service, ResponseService(responses, AsyncMock()), session_service
+    )
+    # Every message reads the session as it was before the first answer
+    session_service.get_active_session.side_effect = lambda _: Session(
+        id=session_id, survey=mock_survey, response=mock_survey_response
+    )
+    session_service.update_session.side_effect = [ConnectionError("Redis is down"), None]
+    with pytest.raises(ConnectionError):
+        await chats_service.handle_message(session_id, "John", "msg-1")
+
+    # Execute
+    question = await chats_service.handle_message(session_id, "John", "msg-1")
+
+    # Assert
+    assert question.id == "q2"
+    assert responses.updates == 1
+
+
+async def test_handle_detached_message_replays_the_final_answer(
+    chats_service,
+    session_id,
+    mock_session,
+    session_service,
+    response_service,
+):
+    """Test that the last answer resent after its session was deleted gets the same reply."""
+    # Setup
+    mock_session.response = mock_session.response.model_copy(update={
+        "current_question_id": None,
+        "is_complete": True,
+        "processed_messages": {processed_message_key("msg-9"): None},
+    })
+    session_service.load_session.return_value = mock_session
+
+    # Execute
+    question = await chats_service.handle_detached_message(session_id, "42", "msg-9")
+
+    # Assert
+    assert question is None
+    response_service.add_question_response.assert_not_called()
+    session_service.delete_session.assert_called_once_with(session_id)
+
+
+async def test_submit_answers_keeps_answer_index_of_stored_answers(
+    chats_service,
+    session_id,
+    mock_session,
+    session_service,
+    response_service
+):
+    """Test that answers of a failed batch are not indexed in the parked session."""
+    # Setup
+    mock_session.answer_index = {"q0": "stored"}
+    session_service.load_session.return_value = mock_session
+
+    async def add_question_responses(response, survey, answers, answer_index):
+        answer_index["q1"] = "John"
+        raise BusinessRuleError("Answer 2: Invalid option")
+
+    response_service.add_question_responses.side_effect = add_question_responses
+
+    # Execute
+    with pytest.raises(BusinessRuleError):
+        await chats_service.submit_answers(session_id, [AnswerSubmission(value="John")])
+
+    # Assert
+    assert mock_session.answer_index == {"q0": "stored"}
+    session_service.park_session.assert_called_once_with(session_id, mock_session)
+
+
+async def test_handle_detached_message_indexes_answer_once_stored(
+    chats_service,
+    session_id,
+    mock_session,
+    session_service,
+    response_service
+):
+    """Test that an answer whose write failed is not indexed, and a stored one is."""
+    # Setup
+    session_service.load_session.return_value = mock_session
+
+    async def add_question_response(response_id, question, message, answer_index, **kwargs):
+        answer_index[question.id] = message
+        if message == "fail":
+            raise ServiceError("Failed to add question response")
+        return mock_session.response.model_copy(update={"current_question_id": "q2"})
+
+    response_service.add_question_response.side_effect = add_question_response
+
+    # Execute
+    with pytest.raises(ServiceError):
+        await chats_service.handle_detached_message(session_id, "fail")
+    failed_index = dict(mock_session.answer_index)
+    await chats_service.handle_detached_message(session_id, "John")
+
+    # Assert
+    assert failed_index == {}
+    assert mock_session.answer_index == {"q1": "John"}
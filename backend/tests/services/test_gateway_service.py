@@ -0,0 +1,153 @@
+"""Tests for GatewayService"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.services.gateway_service import GatewayService
+from app.services.chats_service import ChatsService
+from app.services.session_heartbeat import SessionHeartbeat
+from app.services.session_service import SessionService
+from app.models.messages import InboundMessage
+from app.models.responses import SurveyResponse
+from app.core.concurrency import KeyedSerialQueue
+from app.core.exceptions import BusinessRuleError, ResourceNotFoundError
+
+# Fixtures, found by pytest through their names
+from tests.utils.mock_fixtures import (  # noqa: F401
+    mock_question,
+    mock_next_question,
+    mock_survey,
+    mock_survey_response,
+)
+
+
+@pytest.fixture
+def chats_service():
+    """Mock chats service."""
+    return AsyncMock()
+
+
+@pytest.fixture
+def gateway_service(chats_service):
+    """Create a gateway service."""
+    return GatewayService(chats_service, KeyedSerialQueue(max_concurrency=10))
+
+
+async def test_handle_messages_keeps_order_within_session(gateway_service, chats_service):
+    """Test that messages of a session are handled serially while sessions run concurrently."""
+    # Setup
+    handled = []
+    running = set()
+    max_running = 0
+
+    async def handle_message(session_id, text, message_id=None):
+        nonlocal max_running
+        assert session_id not in running
+        running.add(session_id)
+        max_running = max(max_running, len(running))
+        # Later messages of a session finish faster, so any reordering would show up
+        await asyncio.sleep(0.01 / int(text))
+        handled.append((session_id.user_id, text))
+        running.remove(session_id)
+
+    chats_service.handle_detached_message.side_effect = handle_message
+    messages = [
+        InboundMessage(user_id=user_id, survey_id="survey123", text=str(i))
+        for i in range(1, 4)
+        for user_id in ("user1", "user2")
+    ]
+
+    # Execute
+    await gateway_service.handle_messages(messages)
+
+    # Assert
+    assert [text for user_id, text in handled if user_id == "user1"] == ["1", "2", "3"]
+    assert [text for user_id, text in handled if user_id == "user2"] == ["1", "2", "3"]
+    assert max_running == 2
+    assert gateway_service.queue.pending_keys == 0
+
+
+async def test_handle_messages_returns_replies_in_order(
+    gateway_service,
+    chats_service,
+    mock_question
+):
+    """Test that replies follow the order of the messages, including errors."""
+    # Setup
+    chats_service.handle_detached_message.side_effect = [
+        mock_question,
+        BusinessRuleError("Invalid option"),
+        None,
+    ]
+    messages = [
+        InboundMessage(user_id="user1", survey_id="survey123", text="a", message_id="m1"),
+        InboundMessage(user_id="user1", survey_id="survey123", text="b", message_id="m2"),
+        InboundMessage(user_id="user1", survey_id="survey123", text="c", message_id="m3"),
+    ]
+
+    # Execute
+    replies = await gateway_service.handle_messages(messages)
+
+    # Assert
+    assert [reply.message.message_id for reply in replies] == ["m1", "m2", "m3"]
+    assert replies[0].question == mock_question
+    assert replies[1].error == "Invalid option"
+    assert replies[2].is_complete
+
+
+async def test_handle_messages_reports_missing_surveys(gateway_service, chats_service):
+    """Test that a message for a missing survey is told so instead of getting a server error."""
+    # Setup
+    chats_service.handle_detached_message.side_effect = ResourceNotFoundError(
+        "Survey survey404 not found"
+    )
+    message = InboundMessage(user_id="user1", survey_id="survey404", text="a")
+
+    # Execute
+    replies = await gateway_service.handle_messages([message])
+
+    # Assert
+    assert replies[0].error == "This survey is not available"
+    assert not replies[0].is_complete
+
+
+async def test_handle_messages_releases_sessions_after_each_message(
+    mock_survey,
+    mock_survey_response
+):
+    """Test that provider sessions are parked after a batch instead of held by the worker."""
+    # Setup
+    session_repository = AsyncMock()
+    session_repository.claim_session.return_value = (False, None)
+    survey_service = AsyncMock()
+    survey_service.get_survey.return_value = mock_survey
+    response_service = AsyncMock()
+    response_service.get_response_by_survey_and_user.return_value = mock_survey_response
+    response_service.add_question_response.return_value = SurveyResponse(
+        id="response123", survey_id="survey123", user_id="user123", current_question_id="q2"
+    )
+    heartbeat = SessionHeartbeat(session_repository, interval=10)
+    reminders = AsyncMock()
+    session_service = SessionService(
+        session_repository, survey_service, response_service, heartbeat, reminders=reminders
+    )
+    gateway_service = GatewayService(
+        ChatsService(survey_service, response_service, session_service),
+        KeyedSerialQueue(max_concurrency=10),
+    )
+    messages = [
+        InboundMessage(user_id=f"user{i}", survey_id="survey123", text="John")
+        for i in range(3)
+    ]
+
+    # Execute
+    replies = await gateway_service.handle_messages(messages)
+
+    # Assert
+    assert [reply.question.id for reply in replies] == ["q2", "q2", "q2"]
+    assert heartbeat.tracked_sessions == 0
+    assert session_repository.set_unactive_session.call_count == 3
+    assert session_repository.delete_active_session.call_count == 3
+    assert reminders.schedule.call_count == 3
@@ -0,0 +1,71 @@
+"""Tests for RateLimitService"""
+
+from unittest.mock import AsyncMock
+import pytest
+
+from app.services.rate_limit_service import RateLimitService, settings
+from app.core.exceptions import RateLimitExceededError
+
+
+@pytest.fixture
+def rate_limit_repository():
+    """Mock rate limit repository."""
+    repository = AsyncMock()
+    repository.consume.return_value = 0.0
+    return repository
+
+
+@pytest.fixture
+def rate_limit_service(rate_limit_repository, monkeypatch):
+    """Create a rate limit service allowing a burst of two messages per user."""
+    monkeypatch.setattr(settings, "RATE_LIMIT_USER_RATE", 0.5)
+    monkeypatch.setattr(settings, "RATE_LIMIT_USER_BURST", 2)
+    return RateLimitService(rate_limit_repository, max_local_buckets=100)
+
+
+async def test_check_consumes_all_buckets_in_one_call(
+    rate_limit_service,
+    rate_limit_repository
+):
+    """Test that user, survey and IP buckets are checked with a single repository call."""
+    await rate_limit_service.check("user123", "survey123", "10.0.0.1")
+
+    rate_limit_repository.consume.assert_called_once()
+    buckets = rate_limit_repository.consume.call_args[0][0]
+    assert set(buckets) == {"user:user123", "survey:survey123", "ip:10.0.0.1"}
+    assert buckets["user:user123"] == (0.5, 2)
+
+
+async def test_check_rejects_locally_without_calling_repository(
+    rate_limit_service,
+    rate_limit_repository
+):
+    """Test that the local pre-filter rejects clients that exceed the limit on this worker."""
+    await rate_limit_service.check("user123", "survey123")
+    await rate_limit_service.check("user123", "survey123")
+
+    with pytest.raises(RateLimitExceededError, match="Too many messages"):
+        await rate_limit_service.check("user123", "survey123")
+    assert rate_limit_repository.consume.call_count == 2
+
+
+async def test_check_rejects_when_shared_bucket_is_empty(
+    rate_limit_service,
+    rate_limit_repository
+):
+    """Test that the shared buckets reject clients spread across workers."""
+    rate_limit_repository.consume.return_value = 1.5
+
+    with pytest.raises(RateLimitExceededError) as exc_info:
+        await rate_limit_service.check("user123", "survey123")
+    assert exc_info.value.retry_after == 1.5
+
+
+async def test_check_allows_messages_when_store_is_down(
+    rate_limit_service,
+    rate_limit_repository
+):
+    """Test that rate limiting fails open."""
+    rate_limit_repository.consume.side_effect = ConnectionError("redis down")
+
+    await rate_limit_service.check("user123", "survey123")
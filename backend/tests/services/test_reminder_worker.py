@@ -0,0 +1,61 @@
+"""Tests for ReminderWorker"""
+
+from unittest.mock import AsyncMock
+import pytest
+
+from app.models.sessions import Reminder, SessionId
+from app.services.reminder_worker import ReminderWorker
+
+
+@pytest.fixture
+def reminder_repository():
+    """Mock reminder repository."""
+    return AsyncMock()
+
+
+@pytest.fixture
+def gateway():
+    """Mock outbound gateway."""
+    return AsyncMock()
+
+
+@pytest.fixture
+def reminder_worker(reminder_repository, gateway):
+    """Create a reminder worker."""
+    return ReminderWorker(reminder_repository, gateway, batch_size=100, interval=1.0)
+
+
+async def test_poll_sends_due_reminders(reminder_worker, reminder_repository, gateway):
+    """Test that popped reminders are sent with a key unique to each reminder."""
+    # Setup
+    reminder_repository.pop_due.return_value = [
+        Reminder(session_id=SessionId(user_id="user123", survey_id="survey123"), due_at=10.0)
+    ]
+
+    # Execute
+    popped = await reminder_worker.poll()
+
+    # Assert
+    assert popped == 1
+    assert reminder_repository.pop_due.call_args[0][1] == 100
+    provider, message, key = gateway.send.call_args[0]
+    assert provider == "default"
+    assert (message.user_id, message.survey_id) == ("user123", "survey123")
+    assert key == "reminder:survey123:user123:10.0"
+
+
+async def test_poll_survives_failures(reminder_worker, reminder_repository, gateway):
+    """Test that failing to pop or send a reminder does not stop the worker."""
+    # Setup
+    reminder_repository.pop_due.side_effect = [
+        ConnectionError("Redis down"),
+        [Reminder(session_id=SessionId(user_id="user123", survey_id="survey123"), due_at=1.0)],
+    ]
+    gateway.send.side_effect = ConnectionError("Provider down")
+
+    # Execute
+    first = await reminder_worker.poll()
+    second = await reminder_worker.poll()
+
+    # Assert
+    assert (first, second) == (0, 1)
@@ -3,13 +3,16 @@
 import pytest
 
 from app.services.response_service import ResponseService
-from app.models.responses import SurveyResponse
+from app.models.responses import SurveyResponse, AnswerSubmission, ResponseQuery
+from app.repositories.responses_repository import decode_response_cursor
 from app.models.types import QuestionType
 from app.core.exceptions import ServiceError, BusinessRuleError
 from tests.utils.mock_fixtures import (
     response_repository,
     survey_repository,
     mock_question,
+    mock_next_question,
+    mock_survey,
     mock_survey_response
 )
 
@@ -124,4 +127,117 @@ async def test_add_question_response_repository_error(
             "response123",
             mock_question,
             "John Doe"
-        )
\ No newline at end of file
+        )
+
+
+async def test_add_question_responses_applies_batch_in_one_update(
+    response_service,
+    response_repository,
+    mock_survey,
+    mock_survey_response
+):
+    """Test that a batch of answers is validated along the survey flow and stored at once."""
+    # Setup
+    response_repository.add_question_responses.return_value = SurveyResponse(
+        id="response123",
+        survey_id="survey123",
+        user_id="user123",
+        current_question_id="q3",
+    )
+    answers = [
+        AnswerSubmission(question_id="q1", value="John"),
+        AnswerSubmission(value="42"),
+    ]
+
+    # Execute
+    result = await response_service.add_question_responses(
+        mock_survey_response, mock_survey, answers
+    )
+
+    # Assert
+    assert result.current_question_id == "q3"
+    response_repository.add_question_responses.assert_called_once()
+    question_responses = response_repository.add_question_responses.call_args[0][1]
+    assert [qr.question_id for qr in question_responses] == ["q1", "q2"]
+    assert question_responses[1].response_value == 42.0
+    kwargs = response_repository.add_question_responses.call_args[1]
+    assert kwargs["next_question_id"] == "q3"
+    assert kwargs["is_complete"] is False
+
+
+async def test_add_question_responses_rejects_whole_batch_on_invalid_answer(
+    response_service,
+    response_repository,
+    mock_survey,
+    mock_survey_response
+):
+    """Test that an invalid answer rejects the batch before anything is stored."""
+    answers = [AnswerSubmission(value="John"), AnswerSubmission(value="not a number")]
+
+    with pytest.raises(BusinessRuleError, match="Answer 2: Number must be"):
+        await response_service.add_question_responses(mock_survey_response, mock_survey, answers)
+    response_repository.add_question_responses.assert_not_called()
+
+
+async def test_add_question_responses_rejects_unexpected_question(
+    response_service,
+    mock_survey,
+    mock_survey_response
+):
+    """Test that answers for a different question than the current one are rejected."""
+    answers = [AnswerSubmission(question_id="q2", value="42")]
+
+    with pytest.raises(BusinessRuleError, match="expected an answer to question q1"):
+        await response_service.add_question_responses(mock_survey_response, mock_survey, answers)
+
+
+async def test_query_responses_pages_with_cursor(
+    response_service,
+    response_repository,
+    survey_repository,
+    mock_survey
+):
+    """Test that a page gets the cursor of its last response when more responses match."""
+    # Setup
+    survey_repository.find_by_id.return_value = mock_survey
+    response_repository.find_page.return_value = [
+        SurveyResponse(id=f"response{i}", survey_id="survey123", user_id=f"user{i}")
+        for i in range(3)
+    ]
+
+    # Execute
+    page = await response_service.query_responses(ResponseQuery(survey_id="survey123", limit=2))
+
+    # Assert
+    assert response_repository.find_page.call_args[0][1] == 3
+    assert [response.id for response in page.responses] == ["response0", "response1"]
+    assert decode_response_cursor(page.next_cursor)[1] == "response1"
+
+
+async def test_query_responses_validates_answer_by_question(
+    response_service,
+    response_repository,
+    survey_repository,
+    mock_survey
+):
+    """Test that answer filters are validated by their question, and unknown ones rejected."""
+    # Setup
+    survey_repository.find_by_id.return_value = mock_survey
+    response_repository.find_page.return_value = []
+
+    # Execute
+    page = await response_service.query_responses(
+        ResponseQuery(survey_id="survey123", question_id="q1", answer="John")
+    )
+
+    # Assert
+    assert page.next_cursor is None
+    assert response_repository.find_page.call_args[0][0].answer == "John"
+    with pytest.raises(BusinessRuleError, match="Question q9 not found"):
+        await response_service.query_responses(
+            ResponseQuery(survey_id="survey123", question_id="q9", answer="John")
+        )
+    with pytest.raises(BusinessRuleError, match="Invalid cursor"):
+        await response_service.query_responses(
+            ResponseQuery(survey_id="survey123", cursor="not a cursor")
+        )
@@ -0,0 +1,61 @@
+"""Tests for SessionHeartbeat"""
+
+from unittest.mock import AsyncMock
+import pytest
+
+from app.services.session_heartbeat import SessionHeartbeat
+from app.models.sessions import SessionId
+
+
+@pytest.fixture
+def session_repository():
+    """Mock session repository."""
+    return AsyncMock()
+
+
+@pytest.fixture
+def heartbeat(session_repository):
+    """Create a session heartbeat."""
+    return SessionHeartbeat(session_repository, interval=10.0)
+
+
+async def test_beat_renews_all_tracked_sessions_in_one_call(heartbeat, session_repository):
+    """Test that all tracked leases are renewed with a single repository call."""
+    first = SessionId(user_id="user1", survey_id="survey1")
+    second = SessionId(user_id="user2", survey_id="survey1")
+    heartbeat.track(first, 30)
+    heartbeat.track(second, 15)
+    session_repository.renew_active_sessions.return_value = 2
+
+    await heartbeat.beat()
+
+    session_repository.renew_active_sessions.assert_called_once_with({first: 30, second: 15})
+
+
+async def test_beat_skips_untracked_sessions(heartbeat, session_repository):
+    """Test that untracked sessions are no longer renewed."""
+    session_id = SessionId(user_id="user1", survey_id="survey1")
+    heartbeat.track(session_id, 30)
+    heartbeat.untrack(session_id)
+
+    await heartbeat.beat()
+
+    session_repository.renew_active_sessions.assert_not_called()
+    assert heartbeat.tracked_sessions == 0
+
+
+async def test_beat_survives_repository_errors(heartbeat, session_repository):
+    """Test that a failed renewal does not stop the heartbeat."""
+    heartbeat.track(SessionId(user_id="user1", survey_id="survey1"), 30)
+    session_repository.renew_active_sessions.side_effect = ConnectionError("redis down")
+
+    await heartbeat.beat()
+
+
+def test_next_delay_is_shorter_than_shortest_lease(heartbeat):
+    """Test that the heartbeat beats often enough for short leases."""
+    assert heartbeat.next_delay() == 10.0
+
+    heartbeat.track(SessionId(user_id="user1", survey_id="survey1"), 6)
+
+    assert heartbeat.next_delay() == 2.0
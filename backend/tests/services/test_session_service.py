@@ -0,0 +1,205 @@
+"""Tests for SessionService"""
+
+import asyncio
+from unittest.mock import AsyncMock
+import pytest
+
+from app.services.session_service import SessionService
+from app.models.sessions import Session
+from app.core.exceptions import ResourceConflictError, ResourceNotFoundError
+from tests.utils.mock_fixtures import (
+    mock_question,
+    mock_next_question,
+    mock_survey,
+    mock_survey_response,
+    session_id
+)
+
+
+@pytest.fixture
+def session_repository():
+    """Mock session repository."""
+    return AsyncMock()
+
+
+@pytest.fixture
+def survey_service():
+    """Mock survey service."""
+    return AsyncMock()
+
+
+@pytest.fixture
+def response_service():
+    """Mock response service."""
+    return AsyncMock()
+
+
+@pytest.fixture
+def session_service(session_repository, survey_service, response_service):
+    """Create a session service."""
+    return SessionService(session_repository, survey_service, response_service)
+
+
+async def test_resume_session_looks_up_survey_and_response_concurrently(
+    session_service,
+    session_repository,
+    survey_service,
+    response_service,
+    session_id,
+    mock_survey,
+    mock_survey_response
+):
+    """Test that resuming claims once and runs the Mongo lookups at the same time."""
+    # Setup
+    stored = Session(id=session_id, response=mock_survey_response)
+    session_repository.claim_session.return_value = (False, stored)
+    response_started = asyncio.Event()
+
+    async def get_survey(survey_id):
+        # Only completes if the response lookup started without waiting for the survey
+        await asyncio.wait_for(response_started.wait(), timeout=1)
+        return mock_survey
+
+    async def get_response(response_id):
+        response_started.set()
+        return mock_survey_response
+
+    survey_service.get_survey.side_effect = get_survey
+    response_service.get_response.side_effect = get_response
+
+    # Execute
+    session = await session_service.resume_session(session_id)
+
+    # Assert
+    assert session.survey == mock_survey
+    assert session.response == mock_survey_response
+    session_repository.claim_session.assert_called_once()
+    response_service.get_response_by_survey_and_user.assert_not_called()
+    session_repository.set_active_session.assert_called_once()
+
+
+async def test_resume_session_rejects_active_sessions(
+    session_service,
+    session_repository,
+    survey_service,
+    session_id
+):
+    """Test that a session active elsewhere cannot be resumed."""
+    # Setup
+    session_repository.claim_session.return_value = (True, Session(id=session_id))
+
+    # Execute and Assert
+    with pytest.raises(ResourceConflictError, match="Session already active"):
+        await session_service.resume_session(session_id)
+    survey_service.get_survey.assert_not_called()
+
+
+async def test_resume_session_releases_lease_on_failure(
+    session_service,
+    session_repository,
+    survey_service,
+    response_service,
+    session_id
+):
+    """Test that the claimed lease is released when the session cannot be restored."""
+    # Setup
+    session_repository.claim_session.return_value = (False, None)
+    survey_service.get_survey.side_effect = ResourceNotFoundError("Survey not found")
+    response_service.get_response_by_survey_and_user.return_value = None
+
+    # Execute and Assert
+    with pytest.raises(ResourceNotFoundError):
+        await session_service.resume_session(session_id)
+    session_repository.delete_active_session.assert_called_once_with(session_id)
+    session_repository.set_active_session.assert_not_called()
+
+
+async def test_deactivate_session_schedules_reminder_of_incomplete_session(
+    session_repository,
+    survey_service,
+    response_service,
+    session_id,
+    mock_survey_response
+):
+    """Test that a session left incomplete is reminded after the configured delay."""
+    # Setup
+    reminders = AsyncMock()
+    session_service = SessionService(
+        session_repository, survey_service, response_service, reminders=reminders
+    )
+    session_repository.get_active_session.return_value = Session(
+        id=session_id, response=mock_survey_response
+    )
+
+    # Execute
+    await session_service.deactivate_session(session_id)
+
+    # Assert
+    reminders.schedule.assert_called_once()
+    assert reminders.schedule.call_args[0][0] == session_id
+
+
+async def test_resume_session_cancels_reminder(
+    session_repository,
+    survey_service,
+    response_service,
+    session_id,
+    mock_survey,
+    mock_survey_response
+):
+    """Test that resuming a session cancels its reminder."""
+    # Setup
+    reminders = AsyncMock()
+    session_service = SessionService(
+        session_repository, survey_service, response_service, reminders=reminders
+    )
+    session_repository.claim_session.return_value = (False, None)
+    survey_service.get_survey.return_value = mock_survey
+    response_service.get_response_by_survey_and_user.return_value = mock_survey_response
+
+    # Execute
+    await session_service.resume_session(session_id)
+
+    # Assert
+    reminders.cancel.assert_called_once_with(session_id)
+
+
+async def test_load_session_claims_lease_and_park_releases_it(
+    session_service,
+    session_repository,
+    survey_service,
+    response_service,
+    session_id,
+    mock_survey,
+    mock_survey_response
+):
+    """Test that a loaded session is held until it is parked, so no connection resumes it."""
+    # Setup
+    session_repository.claim_session.return_value = (False, None)
+    survey_service.get_survey.return_value = mock_survey
+    response_service.get_response_by_survey_and_user.return_value = mock_survey_response
+
+    # Execute
+    session = await session_service.load_session(session_id)
+    session_repository.delete_active_session.assert_not_called()
+    await session_service.park_session(session_id, session)
+
+    # Assert
+    session_repository.claim_session.assert_called_once()
+    session_repository.set_unactive_session.assert_called_once_with(session_id, session)
+    session_repository.delete_active_session.assert_called_once_with(session_id)
+
+
+async def test_load_session_rejects_active_sessions(
+    session_service,
+    session_repository,
+    session_id
+):
+    """Test that sessions held by a connection cannot be loaded."""
+    # Setup
+    session_repository.claim_session.return_value = (True, Session(id=session_id))
+
+    # Execute and Assert
+    with pytest.raises(ResourceConflictError, match="Session already active"):
+        await session_service.load_session(session_id)
+    session_repository.delete_active_session.assert_not_called()
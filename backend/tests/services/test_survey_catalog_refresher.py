@@ -0,0 +1,30 @@
+"""Tests for SurveyCatalogRefresher"""
+
+from app.repositories.survey_catalog import SurveyCatalog
+from app.services.survey_catalog_refresher import SurveyCatalogRefresher
+
+# Fixtures, found by pytest through their names
+from tests.utils.mock_fixtures import (  # noqa: F401
+    survey_repository,
+    mock_question,
+    mock_next_question,
+    mock_survey,
+)
+
+
+async def test_one_worker_per_node_rebuilds_the_catalog(tmp_path, survey_repository, mock_survey):
+    """Test that only the worker holding the lock rebuilds, until it stops."""
+    # Setup
+    path = str(tmp_path / "surveys.catalog")
+    survey_repository.find_active.return_value = [mock_survey]
+    leader = SurveyCatalogRefresher(survey_repository, SurveyCatalog(path, 0), interval=30)
+    follower = SurveyCatalogRefresher(survey_repository, SurveyCatalog(path, 0), interval=30)
+
+    # Execute & Assert
+    assert await leader.refresh()
+    assert not await follower.refresh()
+    assert follower.catalog.get_survey("survey123").title == "Test Survey"
+
+    await leader.stop()
+    assert await follower.refresh()
+    await follower.stop()
@@ -0,0 +1,286 @@
+"""Tests for SurveyService"""
+
+import asyncio
+import json
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+
+import pytest
+
+from app.services.survey_service import SurveyService, _validation_slots, settings
+from app.models.surveys import ExpressionCondition, Survey, SurveyUpdate
+from app.repositories.survey_catalog import SurveyCatalog, write_survey_catalog
+from app.models.types import ImportStatus
+from app.core.exceptions import BusinessRuleError, RepositoryError
+from app.core.cache import TTLCache
+from app.core.metrics import get_metrics
+
+# Fixtures, found by pytest through their names
+from tests.utils.mock_fixtures import (  # noqa: F401
+    survey_repository,
+    mock_question,
+    mock_next_question,
+    mock_survey
+)
+
+
+@pytest.fixture(scope="module")
+def process_pool():
+    """Process pool shared by the tests."""
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        yield pool
+
+
+@pytest.fixture
+def survey_service(survey_repository, process_pool):
+    """Create a survey service."""
+    return SurveyService(survey_repository, process_pool)
+
+
+def _survey_line(title: str, first_question_id: str = "q1") -> str:
+    return json.dumps({
+        "title": title,
+        "description": "Imported survey",
+        "first_question_id": first_question_id,
+        "questions": {
+            "q1": {"id": "q1", "type": "text", "text": "Name?", "is_terminal": True},
+        },
+    })
+
+
+async def _lines(*lines):
+    for line in lines:
+        yield line
+
+
+async def test_import_surveys_inserts_valid_surveys_in_one_batch(
+    survey_service,
+    survey_repository
+):
+    """Test that valid surveys are inserted together and invalid ones are reported."""
+    # Setup
+    async def insert_many(surveys):
+        for i, survey in enumerate(surveys):
+            survey.id = f"survey{i}"
+        return surveys
+
+    survey_repository.insert_many.side_effect = insert_many
+
+    # Execute
+    report = await survey_service.import_surveys(_lines(
+        _survey_line("First"),
+        "",
+        _survey_line("Broken", first_question_id="missing"),
+        "not json",
+        _survey_line("Second"),
+    ))
+
+    # Assert
+    survey_repository.insert_many.assert_called_once()
+    assert [s.title for s in survey_repository.insert_many.call_args[0][0]] == ["First", "Second"]
+    assert (report.total, report.created, report.invalid, report.failed) == (4, 2, 2, 0)
+    assert [(r.line, r.status) for r in report.results] == [
+        (1, ImportStatus.CREATED),
+        (3, ImportStatus.INVALID),
+        (4, ImportStatus.INVALID),
+        (5, ImportStatus.CREATED),
+    ]
+    assert report.results[0].survey_id == "survey0"
+    assert report.results[1].error == "First question not found in questions list"
+
+
+async def test_import_surveys_reports_failed_inserts(survey_service, survey_repository):
+    """Test that repository errors mark the batch as failed."""
+    # Setup
+    survey_repository.insert_many.side_effect = RepositoryError("Mongo unavailable")
+
+    # Execute
+    report = await survey_service.import_surveys(_lines(_survey_line("First")))
+
+    # Assert
+    assert report.failed == 1
+    assert report.results[0].status == ImportStatus.FAILED
+
+
+async def test_import_surveys_reports_lines_of_invalid_utf8(survey_service, survey_repository):
+    """Test that undecoded lines are decoded with their survey, invalid UTF-8 being invalid."""
+    # Setup
+    survey_repository.insert_many.side_effect = lambda surveys: surveys
+
+    # Execute
+    report = await survey_service.import_surveys(_lines(
+        _survey_line("First").encode(),
+        b'{"title": "\xff"}',
+    ))
+
+    # Assert
+    assert (report.created, report.invalid) == (1, 1)
+    assert "invalid UTF-8 at byte 11" in report.results[1].error
+
+
+@pytest.fixture
+def offload_all_validations(monkeypatch):
+    """Offload the validation of every survey to the process pool."""
+    monkeypatch.setattr(settings, "SURVEY_VALIDATION_OFFLOAD_THRESHOLD", 0)
+
+
+async def test_create_survey_validates_large_surveys_in_process_pool(
+    survey_service,
+    survey_repository,
+    offload_all_validations
+):
+    """Test that large surveys are validated off the event loop."""
+    # Setup
+    survey = Survey.model_validate_json(_survey_line("Large"))
+    survey_repository.insert.side_effect = lambda survey_db: survey_db
+    offloaded = get_metrics().histogram("surveys.validation.offloaded_seconds").count
+
+    # Execute
+    created = await survey_service.create_survey(survey)
+
+    # Assert
+    assert created.title == "Large"
+    assert get_metrics().histogram("surveys.validation.offloaded_seconds").count == offloaded + 1
+
+
+async def test_create_survey_rejects_invalid_large_surveys(
+    survey_service,
+    survey_repository,
+    offload_all_validations
+):
+    """Test that errors found in the process pool are raised as business rule errors."""
+    # Setup
+    survey = Survey.model_validate_json(_survey_line("Large", first_question_id="missing"))
+
+    # Execute and Assert
+    with pytest.raises(BusinessRuleError, match="First question not found"):
+        await survey_service.create_survey(survey)
+    survey_repository.insert.assert_not_called()
+
+
+@pytest.fixture
+def cached_survey_service(survey_repository):
+    """Create a survey service with a cache of serialized surveys."""
+    return SurveyService(survey_repository, cache=TTLCache(max_size=10, ttl=60))
+
+
+async def test_get_survey_document_serves_cache_hits_without_repository(
+    cached_survey_service,
+    survey_repository,
+    mock_survey
+):
+    """Test that cached surveys are served without reading the repository."""
+    # Setup
+    survey_repository.find_by_id.return_value = mock_survey
+
+    # Execute
+    first = await cached_survey_service.get_survey_document("survey123")
+    second = await cached_survey_service.get_survey_document("survey123")
+
+    # Assert
+    assert second is first
+    assert json.loads(first.content)["_id"] == "survey123"
+    survey_repository.find_by_id.assert_called_once_with("survey123")
+
+
+async def test_get_survey_document_etag_follows_content(
+    cached_survey_service,
+    survey_repository,
+    mock_survey
+):
+    """Test that updates invalidate the cache and change the entity tag."""
+    # Setup
+    survey_repository.find_by_id.return_value = mock_survey
+    before = await cached_survey_service.get_survey_document("survey123")
+    updated = mock_survey.model_copy(update={"title": "Updated"})
+    survey_repository.update.return_value = updated
+
+    # Execute
+    await cached_survey_service.update_survey("survey123", SurveyUpdate(title="Updated"))
+    survey_repository.find_by_id.return_value = updated
+    after = await cached_survey_service.get_survey_document("survey123")
+
+    # Assert
+    assert after.etag != before.etag
+    assert json.loads(after.content)["title"] == "Updated"
+
+
+class HeldExecutor(Executor):
+    """Executor whose submitted calls keep running until they are finished by the test."""
+
+    def __init__(self):
+        self.futures = []
+
+    def submit(self, fn, *args, **kwargs):
+        """Start a call that never finishes by itself."""
+        future = Future()
+        future.set_running_or_notify_cancel()
+        self.futures.append(future)
+        return future
+
+
+async def test_timed_out_validation_holds_its_slot_until_done(
+    survey_repository,
+    offload_all_validations,
+    monkeypatch
+):
+    """Test that a validation still running in the pool after timing out keeps its slot."""
+    # Setup
+    monkeypatch.setattr(settings, "SURVEY_VALIDATION_MAX_PENDING", 1)
+    monkeypatch.setattr(settings, "SURVEY_VALIDATION_TIMEOUT", 0.01)
+    executor = HeldExecutor()
+    survey_service = SurveyService(survey_repository, executor)
+    survey = Survey.model_validate_json(_survey_line("Large"))
+
+    # Execute
+    with pytest.raises(BusinessRuleError, match="timed out"):
+        await survey_service.create_survey(survey)
+    with pytest.raises(BusinessRuleError, match="timed out"):
+        await survey_service.create_survey(survey)
+    held = len(executor.futures)
+    executor.futures[0].set_result((None, 0.0))
+    await asyncio.sleep(0)
+
+    # Assert
+    assert held == 1
+    assert not _validation_slots().locked()
+
+
+async def test_preload_survey_compiles_expressions_and_caches_the_document(
+    cached_survey_service,
+    survey_repository,
+    mock_survey
+):
+    """Test that a preloaded survey has its expressions compiled and its document cached."""
+    # Setup
+    mock_survey.questions["q2"].expression_next = [
+        ExpressionCondition(when='q1 == "John"', next_question_id="q1")
+    ]
+    survey_repository.find_by_id.return_value = mock_survey
+
+    # Execute
+    await cached_survey_service.preload_survey("survey123")
+
+    # Assert
+    assert mock_survey.questions["q2"]._expressions is not None
+    assert cached_survey_service.cache.get("survey123") is not None
+
+
+async def test_preload_survey_leaves_catalog_surveys_shared(
+    tmp_path,
+    survey_repository,
+    mock_survey
+):
+    """Test that catalog surveys are not copied into the cache nor fully loaded."""
+    # Setup
+    path = str(tmp_path / "surveys.catalog")
+    write_survey_catalog(path, [mock_survey])
+    catalog = SurveyCatalog(path, check_interval=0)
+    service = SurveyService(survey_repository, cache=TTLCache(max_size=10, ttl=60), catalog=catalog)
+
+    # Execute
+    await service.preload_survey("survey123")
+
+    # Assert
+    assert catalog.get_survey("survey123").questions._questions == {}
+    assert service.cache.get("survey123") is None
+    survey_repository.find_by_id.assert_not_called()
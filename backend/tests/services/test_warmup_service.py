@@ -0,0 +1,88 @@
+"""Tests for WarmupService"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.core.exceptions import ResourceNotFoundError
+from app.core.startup import Startup
+from app.services.warmup_service import WarmupService
+
+
+@pytest.fixture
+def survey_service():
+    """Mock survey service."""
+    return AsyncMock()
+
+
+@pytest.fixture
+def response_service():
+    """Mock response service."""
+    service = AsyncMock()
+    service.get_most_active_surveys.return_value = ["survey1", "survey2"]
+    return service
+
+
+@pytest.fixture
+def startup():
+    """Create a startup state."""
+    return Startup()
+
+
+def build_warmup(survey_service, response_service, startup, pings, timeout=1.0):
+    """Create a warmup service."""
+    return WarmupService(
+        survey_service, response_service, pings, startup,
+        surveys=2, activity_window=3600, timeout=timeout,
+    )
+
+
+async def test_warmup_pings_and_preloads_before_ready(survey_service, response_service, startup):
+    """Test that the worker is ready once stores are pinged and busy surveys preloaded."""
+    # Setup
+    ping = AsyncMock()
+    warmup = build_warmup(survey_service, response_service, startup, {"redis": ping})
+
+    # Execute
+    assert not startup.ready
+    await warmup.run()
+
+    # Assert
+    ping.assert_awaited_once()
+    response_service.get_most_active_surveys.assert_awaited_once_with(3600, 2)
+    assert survey_service.preload_survey.await_count == 2
+    assert startup.ready
+    assert set(startup.snapshot()["phases"]) == {"ping_redis", "preload_surveys", "total"}
+
+
+async def test_failed_steps_do_not_block_readiness(survey_service, response_service, startup):
+    """Test that failed pings and preloads are recorded, and the worker still gets ready."""
+    # Setup
+    ping = AsyncMock(side_effect=ConnectionError("refused"))
+    survey_service.preload_survey.side_effect = [None, ResourceNotFoundError("gone")]
+    warmup = build_warmup(survey_service, response_service, startup, {"mongo_oltp": ping})
+
+    # Execute
+    await warmup.run()
+
+    # Assert
+    assert startup.phases["ping_mongo_oltp"]["ok"] is False
+    assert startup.phases["preload_surveys"]["ok"] is True
+    assert startup.ready
+
+
+async def test_warmup_is_bounded_by_timeout(survey_service, response_service, startup):
+    """Test that a stalled store does not keep the worker from getting ready."""
+    # Setup
+    async def stall():
+        await asyncio.sleep(10)
+
+    warmup = build_warmup(survey_service, response_service, startup, {"redis": stall}, 0.05)
+
+    # Execute
+    await warmup.run()
+
+    # Assert
+    assert startup.ready
+    survey_service.preload_survey.assert_not_awaited()